@@ -0,0 +1,335 @@
+"""Stand-in for `winget` / `choco` used by the benchmarks (see run_benchmarks.py).
+
+Invoked as ``python fake_manager.py winget|choco <args>``. It prints output
+in the same shape as the real tools for the subcommands the app uses and is
+tuned through environment variables:
+
+    FAKE_PM_DELAY          startup delay in seconds (default 0.05)
+    FAKE_PM_RESULTS        rows returned per search (default 50)
+    FAKE_PM_CATALOG        rows returned by a full catalog listing (default 2000)
+    FAKE_PM_ROW_DELAY      delay between streamed search rows in seconds (default 0)
+    FAKE_PM_INSTALL_TIME   seconds spent per package install (default 0.1)
+    FAKE_PM_DOWNLOAD_TIME  seconds spent downloading each package before its install,
+                           skipped when installing from `download` output (default 0.1)
+    FAKE_PM_FAIL_RATE      fraction of package IDs whose install fails (default 0)
+    FAKE_PM_LOCK           lock file; when set, installs hold it exclusively,
+                           like winget's machine-wide install mutex
+    FAKE_PM_STATE          JSON file of installed packages, so `list` reflects installs
+    FAKE_PM_OFFLINE        when set, anything that needs the network fails
+    FAKE_PM_OUTDATED       fraction of installed 1.0.0 packages with 2.0.0 available (default 0);
+                           `winget upgrade` / `choco outdated` list them, upgrading installs 2.0.0
+
+`winget download` writes a manifest plus an installer script that runs
+``fake_manager.py installer winget <id>``; `choco download` writes a nupkg
+that `choco install --source <dir>` then installs without downloading.
+"""
+import json
+import os
+import stat
+import sys
+import time
+import zlib
+from contextlib import contextmanager
+
+
+def _env(name, default, cast=float):
+    try:
+        return cast(os.environ.get(name, default))
+    except ValueError:
+        return cast(default)
+
+
+DELAY = _env('FAKE_PM_DELAY', 0.05)
+RESULTS = _env('FAKE_PM_RESULTS', 50, int)
+CATALOG = _env('FAKE_PM_CATALOG', 2000, int)
+ROW_DELAY = _env('FAKE_PM_ROW_DELAY', 0)
+INSTALL_TIME = _env('FAKE_PM_INSTALL_TIME', 0.1)
+DOWNLOAD_TIME = _env('FAKE_PM_DOWNLOAD_TIME', 0.1)
+FAIL_RATE = _env('FAKE_PM_FAIL_RATE', 0)
+LOCK = os.environ.get('FAKE_PM_LOCK')
+STATE = os.environ.get('FAKE_PM_STATE')
+OFFLINE = bool(os.environ.get('FAKE_PM_OFFLINE'))
+OUTDATED = _env('FAKE_PM_OUTDATED', 0)
+LATEST = "2.0.0"
+
+
+def should_fail(pkgid):
+    """Deterministic per package, so repeated runs fail the same packages."""
+    return (zlib.crc32(pkgid.lower().encode()) % 10000) / 10000.0 < FAIL_RATE
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive lock on ``path`` (no-op when ``path`` is empty)."""
+    if not path:
+        yield
+        return
+    with open(path, "a+") as f:
+        if os.name == 'nt':
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def install_lock():
+    return file_lock(LOCK)
+
+
+def _load_state():
+    if not STATE:
+        return {}
+    try:
+        with open(STATE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def _outdated(installed):
+    """``[(id, version)]`` of installed packages that have LATEST available."""
+    return [(p, v) for p, v in sorted(installed.items())
+            if v != LATEST and (zlib.crc32(b'outdated:' + p.lower().encode()) % 10000) / 10000.0 < OUTDATED]
+
+
+def _mark_installed(manager, pkgid, version="1.0.0"):
+    if not STATE:
+        return
+    with file_lock(STATE + '.lock'):
+        state = _load_state()
+        state.setdefault(manager, {})[pkgid] = version
+        tmp = f"{STATE}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, STATE)
+
+
+def install_one(manager, pkgid, version="1.0.0"):
+    time.sleep(INSTALL_TIME)
+    if should_fail(pkgid):
+        return False
+    _mark_installed(manager, pkgid, version)
+    return True
+
+
+def download(count=1):
+    """Network time, spent outside the install lock; exits like a failed download when offline."""
+    if OFFLINE and count:
+        _emit("An unexpected error occurred while executing the command: 0x80072ee7 : The server name or address could not be resolved")
+        sys.stdout.flush()
+        sys.exit(1)
+    time.sleep(DOWNLOAD_TIME * count)
+
+
+def _rows(query, count):
+    stem = ''.join(ch for ch in query.title() if ch.isalnum()) or 'Package'
+    return [(f"{stem} App {i}", f"Bench.{stem}{i}", f"1.{i % 10}.{i}") for i in range(count)]
+
+
+def _emit(line):
+    sys.stdout.write(line + "\n")
+    if ROW_DELAY:
+        sys.stdout.flush()
+        time.sleep(ROW_DELAY)
+
+
+def _winget_table(headers, rows):
+    widths = [max([len(h)] + [len(r[i]) for r in rows]) + 1 for i, h in enumerate(headers)]
+    _emit(''.join(h.ljust(w) for h, w in zip(headers, widths)).rstrip())
+    _emit('-' * sum(widths))
+    for row in rows:
+        _emit(''.join(v.ljust(w) for v, w in zip(row, widths)).rstrip())
+
+
+def _option(args, name):
+    if name in args:
+        i = args.index(name)
+        if i + 1 < len(args):
+            return args[i + 1]
+    return None
+
+
+def winget(args):
+    command, rest = args[0], args[1:]
+    if command == 'search':
+        query = _option(rest, '--query')
+        if query is None:
+            query = rest[0] if rest else ''
+        rows = _rows(query or 'catalog', RESULTS if query else CATALOG)
+        _winget_table(['Name', 'Id', 'Version', 'Match', 'Source'], [(n, i, v, '', 'winget') for n, i, v in rows])
+        return 0
+    if command == 'show':
+        if OFFLINE:
+            download()
+        _emit(f"Found {_option(rest, '--id')} [{_option(rest, '--id')}]")
+        _emit("Version: 1.0.0")
+        return 0
+    if command == 'list':
+        installed = _load_state().get('winget', {})
+        pkgid = _option(rest, '--id')
+        available = dict(_outdated(installed))
+        rows = [(p, p, v, LATEST if p in available else '', 'winget') for p, v in sorted(installed.items())
+                if pkgid is None or p.lower() == pkgid.lower()]
+        if pkgid and not rows:
+            _emit("No installed package found matching input criteria.")
+            return 1
+        _winget_table(['Name', 'Id', 'Version', 'Available', 'Source'], rows)
+        return 0
+    if command == 'upgrade':
+        pkgid = _option(rest, '--id')
+        installed = _load_state().get('winget', {})
+        if pkgid is None:
+            rows = [(p, p, v, LATEST, 'winget') for p, v in _outdated(installed)]
+            if not rows:
+                _emit("No installed package found matching input criteria.")
+                return 1
+            _winget_table(['Name', 'Id', 'Version', 'Available', 'Source'], rows)
+            _emit(f"{len(rows)} upgrades available.")
+            return 0
+        if pkgid not in dict(_outdated(installed)):
+            _emit("No available upgrade found.")
+            return 1
+        download()
+        with install_lock():
+            ok = install_one('winget', pkgid, LATEST)
+        _emit("Successfully installed" if ok else "Installer failed with exit code: 1603")
+        return 0 if ok else 1
+    if command == 'download':
+        pkgid = _option(rest, '--id')
+        directory = _option(rest, '--download-directory')
+        download()
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"{pkgid}_1.0.0_Machine_X64_exe_en-US.yaml"), "w", encoding="utf-8") as f:
+            f.write(f"PackageIdentifier: {pkgid}\nPackageVersion: 1.0.0\nInstallers:\n"
+                    f"- Architecture: x64\n  InstallerType: exe\n  InstallerSwitches:\n    Silent: /S\n")
+        installer = os.path.join(directory, f"{pkgid}_1.0.0.exe")
+        with open(installer, "w", encoding="utf-8") as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{os.path.abspath(__file__)}" installer winget {pkgid}\n')
+        os.chmod(installer, os.stat(installer).st_mode | stat.S_IXUSR)
+        _emit(f"Installer downloaded: {installer}")
+        return 0
+    if command == 'install':
+        pkgid = _option(rest, '--id')
+        download()
+        with install_lock():
+            ok = install_one('winget', pkgid)
+        _emit("Successfully installed" if ok else "Installer failed with exit code: 1603")
+        return 0 if ok else 1
+    if command == 'import':
+        with open(_option(rest, '-i'), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        ok_all = True
+        download(sum(len(source.get("Packages", [])) for source in manifest.get("Sources", [])))
+        with install_lock():
+            for source in manifest.get("Sources", []):
+                for package in source.get("Packages", []):
+                    pkgid = package["PackageIdentifier"]
+                    _emit(f"Found {pkgid} [{pkgid}] Version 1.0.0")
+                    ok = install_one('winget', pkgid)
+                    ok_all = ok_all and ok
+                    _emit("Successfully installed" if ok else "Installer failed with exit code: 1603")
+        return 0 if ok_all else 1
+    _emit(f"Unrecognized command: '{command}'")
+    return 1
+
+
+def choco(args):
+    command, rest = args[0], args[1:]
+    if command == 'search':
+        query = next((a for a in rest if not a.startswith('-')), '')
+        if '--exact' in rest:
+            if OFFLINE:
+                download()
+            _emit(f"{query}|1.0.0")
+            return 0
+        for name, pkgid, version in _rows(query or 'catalog', RESULTS if query else CATALOG):
+            _emit(f"{pkgid.lower()}|{version}")
+        return 0
+    if command == 'list':
+        installed = _load_state().get('chocolatey', {})
+        pkgid = next((a for a in rest if not a.startswith('-')), None)
+        for p, v in sorted(installed.items()):
+            if pkgid is None or p.lower() == pkgid.lower():
+                _emit(f"{p}|{v}")
+        return 0
+    if command == 'outdated':
+        for p, v in _outdated(_load_state().get('chocolatey', {})):
+            _emit(f"{p}|{v}|{LATEST}|false")
+        return 0
+    if command == 'upgrade':
+        pkgid = rest[0]
+        download()
+        with install_lock():
+            ok = install_one('chocolatey', pkgid, LATEST)
+        _emit(f" The upgrade of {pkgid} was successful." if ok else f" - {pkgid} (exited 1603) - Error while running installer")
+        return 0 if ok else 1
+    if command == 'download':
+        pkgid = rest[0]
+        directory = _option(rest, '--outputdirectory') or '.'
+        download()
+        os.makedirs(directory, exist_ok=True)
+        open(os.path.join(directory, f"{pkgid.lower()}.1.0.0.nupkg"), "wb").close()
+        _emit(f"Successfully downloaded {pkgid}")
+        return 0
+    if command == 'install':
+        source = _option(rest, '--source') or _option(rest, '-s') or ''
+        packages = [a for a in rest if not a.startswith('-') and a != source]
+        local = set()
+        for directory in source.split(';'):
+            if os.path.isdir(directory):
+                local.update(name.lower().split('.1.0.0')[0] for name in os.listdir(directory) if name.endswith('.nupkg'))
+        failures = []
+        download(sum(1 for p in packages if p.lower() not in local))
+        with install_lock():
+            for pkgid in packages:
+                if install_one('chocolatey', pkgid):
+                    _emit(f" The install of {pkgid} was successful.")
+                else:
+                    failures.append(pkgid)
+        _emit(f"Chocolatey installed {len(packages) - len(failures)}/{len(packages)} packages.")
+        if failures:
+            _emit("Failures")
+            for pkgid in failures:
+                _emit(f" - {pkgid} (exited 1603) - Error while running installer")
+        return 1 if failures else 0
+    _emit(f"Unknown command {command}")
+    return 1
+
+
+def installer(args):
+    """The installer `winget download` left behind, run silently."""
+    manager, pkgid = args[0], args[1]
+    with install_lock():
+        return 0 if install_one(manager, pkgid) else 1603
+
+
+def main(argv):
+    time.sleep(DELAY)
+    if len(argv) < 2:
+        return 1
+    manager, args = argv[0], argv[1:]
+    if manager == 'installer':
+        return installer(args)
+    code = choco(args) if manager == 'choco' else winget(args)
+    sys.stdout.flush()
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
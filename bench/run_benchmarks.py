@@ -0,0 +1,358 @@
+"""Benchmark search latency, install throughput and UI responsiveness.
+
+Puts fake ``winget`` / ``choco`` executables (bench/fake_manager.py) first on
+PATH and drives the same engine the GUI and CLI use, so it runs on a plain
+Linux box without either package manager::
+
+    python bench/run_benchmarks.py
+    python bench/run_benchmarks.py --delay 0.3 --fail-rate 0.1 --lock --output bench.json
+    python bench/run_benchmarks.py --scenarios search_single,install_all
+
+Results are printed (or written) as JSON: p50/p95/max latencies in
+milliseconds per scenario and jobs/minute for installs. The Tk scenarios
+(large_render, theme_switch) need a display (e.g. ``xvfb-run``) and are
+reported as skipped without one.
+"""
+import argparse
+import json
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from engine import Engine, Profile, PackageRecord  # noqa: E402
+
+FAKE_MANAGER = Path(__file__).resolve().parent / 'fake_manager.py'
+SCENARIOS = ('search_single', 'search_repeated', 'search_all', 'large_render',
+             'install_all', 'install_all_batch', 'install_pipelined', 'install_repeat', 'upgrade_all', 'install_profile', 'theme_switch')
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values`` (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(samples_ms):
+    return {
+        "n": len(samples_ms),
+        "p50_ms": round(percentile(samples_ms, 50), 2),
+        "p95_ms": round(percentile(samples_ms, 95), 2),
+        "max_ms": round(max(samples_ms), 2) if samples_ms else 0.0,
+    }
+
+
+class FakeManagers:
+    """Temp directory with `winget`/`choco` wrappers prepended to PATH."""
+
+    def __init__(self, delay, results, install_time, fail_rate, lock, row_delay=0.0, catalog=2000, download_time=0.1):
+        self.dir = Path(tempfile.mkdtemp(prefix='winget-bench-'))
+        self.env = {
+            'FAKE_PM_DELAY': str(delay),
+            'FAKE_PM_RESULTS': str(results),
+            'FAKE_PM_CATALOG': str(catalog),
+            'FAKE_PM_ROW_DELAY': str(row_delay),
+            'FAKE_PM_INSTALL_TIME': str(install_time),
+            'FAKE_PM_DOWNLOAD_TIME': str(download_time),
+            'FAKE_PM_FAIL_RATE': str(fail_rate),
+            'FAKE_PM_LOCK': str(self.dir / 'install.lock') if lock else '',
+            'FAKE_PM_STATE': str(self.dir / 'installed.json'),
+        }
+        self._saved = {}
+
+    def __enter__(self):
+        bin_dir = self.dir / 'bin'
+        bin_dir.mkdir()
+        for name in ('winget', 'choco'):
+            path = bin_dir / name
+            path.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_MANAGER}" {name} "$@"\n')
+            path.chmod(path.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+        env = dict(self.env, PATH=str(bin_dir) + os.pathsep + os.environ.get('PATH', ''))
+        for key, value in env.items():
+            self._saved[key] = os.environ.get(key)
+            os.environ[key] = value
+        return self
+
+    def __exit__(self, *exc):
+        for key, value in self._saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def reset_installed(self):
+        try:
+            os.remove(self.env['FAKE_PM_STATE'])
+        except OSError:
+            pass
+
+    def new_engine(self, limits=None):
+        """Engine with a fresh config dir, so no cache/index/inventory carries over."""
+        config_dir = Path(tempfile.mkdtemp(prefix='config-', dir=self.dir))
+        return Engine(config_dir, limits)
+
+
+def bench_search_single(fakes, args):
+    """Cold CLI search, a new query each time: time to first row and to completion."""
+    engine = fakes.new_engine()
+    first, total = [], []
+    for i in range(args.iterations):
+        started = time.perf_counter()
+        first_row = []
+        engine.search('winget', f'query{i}', refresh=True,
+                      on_records=lambda records: first_row or first_row.append(time.perf_counter()))
+        total.append((time.perf_counter() - started) * 1000)
+        if first_row:
+            first.append((first_row[0] - started) * 1000)
+    return {"total": summarize(total), "first_row": summarize(first)}
+
+
+def bench_search_repeated(fakes, args):
+    """The same query repeatedly: one cold run, then cache hits and prefix refinements."""
+    engine = fakes.new_engine()
+    started = time.perf_counter()
+    engine.search('winget', 'browser')
+    cold = (time.perf_counter() - started) * 1000
+    cached, refined = [], []
+    for i in range(args.iterations):
+        started = time.perf_counter()
+        engine.search('winget', 'browser')
+        cached.append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        engine.search('winget', 'browser app ' + str(i % 10))
+        refined.append((time.perf_counter() - started) * 1000)
+    return {"cold_ms": round(cold, 2), "cached": summarize(cached), "refined": summarize(refined)}
+
+
+def bench_search_all(fakes, args):
+    """Both managers concurrently, merged (the "All" mode)."""
+    engine = fakes.new_engine()
+    total = []
+    for i in range(args.iterations):
+        started = time.perf_counter()
+        engine.search_all(f'query{i}', refresh=True)
+        total.append((time.perf_counter() - started) * 1000)
+    return {"total": summarize(total)}
+
+
+def _install_run(fakes, args, submit, engine=None):
+    fakes.reset_installed()
+    engine = engine or fakes.new_engine({'chocolatey': args.choco_jobs})
+    packages = [f"Bench.Pkg{i}" for i in range(args.packages)]
+    started = time.perf_counter()
+    outcomes = submit(engine, packages)
+    elapsed = time.perf_counter() - started
+    failed = [p for p, state in outcomes.items() if state not in ('succeeded', 'already installed')]
+    return {
+        "packages": len(packages),
+        "seconds": round(elapsed, 3),
+        "jobs_per_minute": round(len(packages) / elapsed * 60, 1) if elapsed else 0.0,
+        "failed": len(failed),
+    }
+
+
+def _install_many(engine, packages, manager, batch, pipeline=False):
+    jobs, skipped = engine.install_many(packages, manager, batch=batch, pipeline=pipeline)
+    engine.wait(jobs)
+    outcomes = {p: 'already installed' for p in skipped}
+    for job in jobs:
+        for pkgid in job.packages:
+            outcomes[pkgid] = job.package_state(pkgid)
+    return outcomes
+
+
+def bench_install_all(fakes, args):
+    """Category "Install All": one job per package, per manager."""
+    return {manager: _install_run(fakes, args, lambda e, p, m=manager: _install_many(e, p, m, False))
+            for manager in ('winget', 'chocolatey')}
+
+
+def bench_install_all_batch(fakes, args):
+    """Category "Install All" with batch installs (one manager process per category)."""
+    return {manager: _install_run(fakes, args, lambda e, p, m=manager: _install_many(e, p, m, True))
+            for manager in ('winget', 'chocolatey')}
+
+
+def bench_install_pipelined(fakes, args):
+    """Category "Install All" in pipelined mode (parallel downloads, one install at a time)."""
+    return {manager: _install_run(fakes, args, lambda e, p, m=manager: _install_many(e, p, m, False, True))
+            for manager in ('winget', 'chocolatey')}
+
+
+def bench_install_repeat(fakes, args):
+    """The same category on a second machine: first run fills the installer cache, second runs offline from it."""
+    results = {}
+    for manager in ('winget', 'chocolatey'):
+        engine = fakes.new_engine({'chocolatey': args.choco_jobs})
+        engine.artifact_cache.enabled = True  # opt-in, see README
+        first = _install_run(fakes, args, lambda e, p, m=manager: _install_many(e, p, m, False), engine)
+        # A fresh config dir (another machine) pointed at the same cache folder
+        other = fakes.new_engine({'chocolatey': args.choco_jobs})
+        other.artifact_cache.root = engine.artifact_cache.root
+        other.artifact_cache.enabled = True
+        os.environ['FAKE_PM_OFFLINE'] = '1'
+        try:
+            second = _install_run(fakes, args, lambda e, p, m=manager: _install_many(e, p, m, False), other)
+        finally:
+            os.environ.pop('FAKE_PM_OFFLINE', None)
+        results[manager] = {"first": first, "offline_repeat": second}
+    return results
+
+
+def bench_upgrade_all(fakes, args):
+    """Full machine refresh: plan from one outdated listing per manager, then upgrade what is needed."""
+    fakes.reset_installed()
+    installed = {'winget': {f"Bench.Pkg{i}": "1.0.0" for i in range(args.packages * 4)},
+                 'chocolatey': {f"bench-pkg{i}": "1.0.0" for i in range(args.packages * 4)}}
+    Path(fakes.env['FAKE_PM_STATE']).write_text(json.dumps(installed), encoding='utf-8')
+    os.environ['FAKE_PM_OUTDATED'] = '0.25'
+    try:
+        engine = fakes.new_engine({'chocolatey': args.choco_jobs})
+        started = time.perf_counter()
+        plan = engine.plan_upgrades()
+        planned = time.perf_counter() - started
+        jobs = engine.submit_upgrades(plan)
+        engine.wait(jobs)
+        elapsed = time.perf_counter() - started
+        calls = {}
+        for entry in engine.command_log.recent(1000):
+            calls[entry["operation"]] = calls.get(entry["operation"], 0) + 1
+        return {
+            "installed": sum(len(p) for p in installed.values()),
+            "upgrades": len(plan),
+            "plan_ms": round(planned * 1000, 1),
+            "seconds": round(elapsed, 3),
+            "failed": sum(1 for job in jobs if job.state != 'succeeded'),
+            "manager_calls": calls,
+            "still_outdated": len(engine.plan_upgrades(refresh=True)),
+        }
+    finally:
+        os.environ.pop('FAKE_PM_OUTDATED', None)
+
+
+def bench_install_profile(fakes, args):
+    """A profile of independent chains (depth 3) on Chocolatey through the DAG executor."""
+    def submit(engine, packages):
+        entries = [{"id": pkgid, "manager": "chocolatey",
+                    "depends_on": [packages[i - 1]] if i % 3 else []} for i, pkgid in enumerate(packages)]
+        executor = engine.apply_profile(Profile.from_dict({"packages": entries}))
+        executor.wait()
+        return executor.outcomes
+    return _install_run(fakes, args, submit)
+
+
+def _tk_root():
+    import tkinter as tk
+    root = tk.Tk()
+    root.withdraw()
+    return root
+
+
+def bench_large_render(fakes, args):
+    """Fill, sort and scroll the virtualized results view with many rows."""
+    from main import VirtualTreeview
+    root = _tk_root()
+    try:
+        view = VirtualTreeview(root, columns=[('name', 'Name', 260), ('id', 'Id', 260), ('version', 'Version', 120),
+                                              ('match', 'Match', 160), ('source', 'Source', 90)])
+        view.pack()
+        records = [PackageRecord(f"Package {i}", f"Bench.Pkg{i}", f"1.{i % 10}.{i}", '', 'winget')
+                   for i in range(args.rows)]
+        fill, sort, scroll = [], [], []
+        for _ in range(args.iterations):
+            started = time.perf_counter()
+            view.set_records(records)
+            root.update_idletasks()
+            fill.append((time.perf_counter() - started) * 1000)
+            started = time.perf_counter()
+            view.sort_by('version')
+            root.update_idletasks()
+            sort.append((time.perf_counter() - started) * 1000)
+            started = time.perf_counter()
+            view.scroll(1, 'pages')
+            root.update_idletasks()
+            scroll.append((time.perf_counter() - started) * 1000)
+        return {"rows": args.rows, "fill": summarize(fill), "sort": summarize(sort), "scroll": summarize(scroll)}
+    finally:
+        root.destroy()
+
+
+def bench_theme_switch(fakes, args):
+    """Light/dark switch including the redraw, on the full main window."""
+    import tkinter as tk
+    from main import WinGetGUI
+    root = tk.Tk()
+    try:
+        app = WinGetGUI(root)
+        root.update()
+        return app.benchmark_theme_switch(args.iterations)
+    finally:
+        root.destroy()
+
+
+BENCHMARKS = {name: globals()['bench_' + name] for name in SCENARIOS}
+
+
+def run(args):
+    report = {
+        "config": {key: getattr(args, key) for key in
+                   ('delay', 'results', 'install_time', 'download_time', 'fail_rate', 'lock', 'iterations', 'packages', 'rows', 'choco_jobs')},
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "scenarios": {},
+    }
+    selected = [s.strip() for s in args.scenarios.split(',')] if args.scenarios else list(SCENARIOS)
+    with FakeManagers(args.delay, args.results, args.install_time, args.fail_rate, args.lock,
+                      download_time=args.download_time) as fakes:
+        for name in selected:
+            if name not in BENCHMARKS:
+                report["scenarios"][name] = {"error": "unknown scenario"}
+                continue
+            started = time.perf_counter()
+            try:
+                result = BENCHMARKS[name](fakes, args)
+            except Exception as e:
+                # Tk scenarios fail without a display; report instead of aborting the run
+                result = {"skipped": f"{type(e).__name__}: {e}"}
+            result["wall_seconds"] = round(time.perf_counter() - started, 2)
+            report["scenarios"][name] = result
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scenarios', help=f"comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument('--delay', type=float, default=0.05, help="fake manager startup delay (s)")
+    parser.add_argument('--results', type=int, default=50, help="rows per fake search")
+    parser.add_argument('--install-time', type=float, default=0.1, help="seconds per fake package install")
+    parser.add_argument('--download-time', type=float, default=0.1, help="seconds per fake package download")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="fraction of installs that fail")
+    parser.add_argument('--lock', action='store_true', help="serialize fake installs on a machine-wide lock")
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--packages', type=int, default=12, help="packages per install scenario")
+    parser.add_argument('--rows', type=int, default=20000, help="rows for large_render")
+    parser.add_argument('--choco-jobs', type=int, default=4, help="Chocolatey concurrency limit")
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    failed = [name for name, result in report["scenarios"].items() if "error" in result]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+"""Headless entry point: search, install and provision without the GUI.
+
+Runs the same engine as the GUI (search cache, local index, scheduler,
+batch installs, installed inventory) and prints JSON to stdout, so it can
+be scripted for unattended machine setup::
+
+    python main.py search vscode
+    python main.py install Git.Git Mozilla.Firefox --batch
+    python main.py install-category Development --pipeline
+    python main.py apply-profile dev-machine.json
+    python main.py list --manager chocolatey
+    python main.py cache --prefetch Development
+    python main.py upgrade --manager all
+    python main.py resume --last
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from engine import Engine, Profile, resolve_manager, SEARCH_MANAGERS, JOB_FAILED, JOB_CANCELLED
+
+
+COMMANDS = ('search', 'install', 'install-category', 'apply-profile', 'list', 'categories', 'cache', 'upgrade', 'resume')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='winget-installer', description="Headless WinGet/Chocolatey package installer")
+    parser.add_argument('--config-dir', help="settings and cache directory (default: the GUI's)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    def add_manager(p, allow_all=False):
+        choices = ['winget', 'chocolatey'] + (['all'] if allow_all else [])
+        p.add_argument('--manager', '-m', choices=choices, default='winget')
+
+    p = sub.add_parser('search', help="search for packages")
+    p.add_argument('query')
+    add_manager(p, allow_all=True)
+    p.add_argument('--refresh', action='store_true', help="bypass the local index and search cache")
+
+    p = sub.add_parser('install', help="install packages by ID")
+    p.add_argument('packages', nargs='+')
+    add_manager(p)
+    p.add_argument('--batch', action='store_true', help="one manager invocation for all packages")
+    p.add_argument('--pipeline', action='store_true', help="download ahead while earlier packages install")
+    p.add_argument('--force', action='store_true', help="install even if already installed")
+
+    p = sub.add_parser('install-category', help="install every app in a built-in category")
+    p.add_argument('category')
+    add_manager(p)
+    p.add_argument('--batch', action='store_true', help="one manager invocation for all packages")
+    p.add_argument('--pipeline', action='store_true', help="download ahead while earlier packages install")
+    p.add_argument('--force', action='store_true', help="install even if already installed")
+
+    p = sub.add_parser('apply-profile', help="install a JSON profile in dependency order")
+    p.add_argument('profile')
+    add_manager(p)
+    p.add_argument('--force', action='store_true', help="install even if already installed")
+
+    p = sub.add_parser('list', help="list installed packages")
+    add_manager(p)
+    p.add_argument('--refresh', action='store_true', help="re-list instead of using the cached inventory")
+
+    p = sub.add_parser('categories', help="list catalog categories (with app counts)")
+    p.add_argument('--apps', action='store_true', help="list every app in every category")
+    p.add_argument('--search', help="find catalog apps by name or ID")
+
+    p = sub.add_parser('upgrade', help="upgrade installed packages that have a newer version")
+    p.add_argument('packages', nargs='*', help="only these IDs (default: everything outdated)")
+    add_manager(p, allow_all=True)
+    p.add_argument('--dry-run', action='store_true', help="only print the upgrade plan")
+    p.add_argument('--refresh', action='store_true', help="re-check instead of using the cached version map")
+
+    p = sub.add_parser('resume', help="list or resume batches interrupted by a crash or reboot")
+    p.add_argument('batch', nargs='?', help="batch ID to resume (default: list interrupted batches)")
+    p.add_argument('--last', action='store_true', help="resume the most recent interrupted batch")
+    p.add_argument('--discard', action='store_true', help="forget the batch instead of resuming it")
+
+    p = sub.add_parser('cache', help="show, fill or clear the installer cache")
+    add_manager(p)
+    p.add_argument('--prefetch', metavar='CATEGORY', help="download a category's installers without installing")
+    p.add_argument('--clear', action='store_true', help="delete every cached installer")
+    p.add_argument('--dir', help="use this cache folder (e.g. a share) and remember it")
+    return parser
+
+
+def _install_report(engine, jobs, skipped):
+    """Wait for ``jobs`` and summarize per-package outcomes."""
+    engine.wait(jobs)
+    packages = {pkgid: 'already installed' for pkgid in skipped}
+    logs = {}
+    for job in jobs:
+        for pkgid in job.packages:
+            packages[pkgid] = job.package_state(pkgid)
+            if job.log_path:
+                logs[pkgid] = job.log_path
+    failed = [p for p, state in packages.items() if state in (JOB_FAILED, JOB_CANCELLED)]
+    return {"packages": packages, "failed": failed, "logs": logs}, (1 if failed else 0)
+
+
+def cmd_search(engine, args):
+    if args.manager == 'all':
+        rows, outcomes = engine.search_all(args.query, args.refresh)
+        results = [row._asdict() for row in rows]
+        status = {m: st for m, (st, _, _) in outcomes.items()}
+        failed = all(st != 'complete' for st in status.values())
+        return {"query": args.query, "status": status, "results": results}, (1 if failed else 0)
+    records, status, how, error = engine.search(args.manager, args.query, args.refresh)
+    result = {"query": args.query, "manager": args.manager, "status": status, "source": how,
+              "results": [r._asdict() for r in records]}
+    if error:
+        result["error"] = error
+    return result, (0 if status == 'complete' else 1)
+
+
+def _install(engine, packages, manager, args, depends_on=None):
+    if not args.force:
+        # The GUI loads the inventory at startup; a one-shot run re-lists it only when stale
+        engine.refresh_inventory(manager)
+    return engine.install_many(packages, manager, args.batch, skip_installed=not args.force,
+                               pipeline=args.pipeline, depends_on=depends_on)
+
+
+def cmd_install(engine, args):
+    jobs, skipped = _install(engine, args.packages, args.manager, args)
+    return _install_report(engine, jobs, skipped)
+
+
+def cmd_install_category(engine, args):
+    if args.category not in engine.categories:
+        return {"error": f"Unknown category: {args.category}", "categories": list(engine.categories)}, 2
+    apps = engine.categories[args.category]
+    if args.batch or args.pipeline:
+        jobs, skipped = _install(engine, [app.id for app in apps], args.manager, args,
+                                 {app.id: app.depends_on for app in apps})
+        return _install_report(engine, jobs, skipped)
+    # One job per package: install as a profile so dependencies (Git before GitHub Desktop) go first
+    try:
+        profile = Profile.from_category(apps, args.manager)
+    except ValueError as e:
+        return {"error": f"Bad dependencies in category {args.category}: {e}"}, 2
+    return _apply_profile(engine, profile, args, f"Install All: {args.category}")
+
+
+def cmd_apply_profile(engine, args):
+    try:
+        profile = Profile.load(args.profile, args.manager)
+    except Exception as e:
+        return {"error": f"Could not read profile: {e}"}, 2
+    return _apply_profile(engine, profile, args)
+
+
+def _apply_profile(engine, profile, args, title=None):
+    if not args.force:
+        for manager in {resolve_manager(entry.managers) for entry in profile.entries.values()}:
+            engine.refresh_inventory(manager)
+    executor = engine.apply_profile(profile, skip_installed=not args.force, title=title)
+    executor.wait()
+    result = {"profile": profile.name or title, "order": profile.order, "packages": dict(executor.outcomes),
+              "managers": executor.managers, "skipped_because": executor.reasons, "failed": executor.failed,
+              "seconds": round(executor.finished - executor.started, 2)}
+    return result, (1 if executor.failed else 0)
+
+
+def cmd_list(engine, args):
+    packages = engine.list_installed(args.manager, args.refresh)
+    return {"manager": args.manager, "packages": sorted(packages.values(), key=lambda p: p["id"].lower())}, 0
+
+
+def _app_dict(app):
+    data = {"name": app.name, "id": app.id}
+    if app.manager:
+        data["manager"] = app.manager
+    if app.depends_on:
+        data["depends_on"] = list(app.depends_on)
+    return data
+
+
+def cmd_categories(engine, args):
+    catalog = engine.catalog
+    if args.search:
+        return [dict(_app_dict(app), category=category) for category, app in catalog.search(args.search)], 0
+    if not args.apps:
+        return {name: catalog.count(name) for name in catalog.keys()}, 0
+    return {name: [_app_dict(app) for app in apps] for name, apps in catalog.items()}, 0
+
+
+def cmd_upgrade(engine, args):
+    managers = list(SEARCH_MANAGERS) if args.manager == 'all' else [args.manager]
+    plan = engine.plan_upgrades(managers, refresh=args.refresh)
+    if args.packages:
+        wanted = {p.lower() for p in args.packages}
+        plan = [item for item in plan if item.id.lower() in wanted]
+    result = {"plan": [item._asdict() for item in plan]}
+    if args.dry_run:
+        return result, 0
+    jobs = engine.submit_upgrades(plan)
+    engine.wait(jobs)
+    result["packages"] = {job.packages[0]: job.state for job in jobs}
+    result["failed"] = [p for p, state in result["packages"].items() if state in (JOB_FAILED, JOB_CANCELLED)]
+    return result, (1 if result["failed"] else 0)
+
+
+def cmd_resume(engine, args):
+    interrupted = engine.journal.interrupted()
+    if not args.batch and not args.last:
+        return {"interrupted": interrupted}, 0
+    if args.last:
+        if not interrupted:
+            return {"error": "No interrupted batches"}, 2
+        batch = interrupted[-1]
+    else:
+        batch = next((b for b in interrupted if b["batch"] == args.batch), None)
+        if batch is None:
+            return {"error": f"No interrupted batch: {args.batch}", "interrupted": interrupted}, 2
+    if args.discard:
+        engine.journal.dismiss(batch["batch"])
+        return {"batch": batch["batch"], "discarded": batch["remaining"]}, 0
+    # Packages installed before the interruption are skipped
+    engine.refresh_inventory(force=True)
+    jobs, skipped, executor = engine.resume(batch["batch"])
+    if executor is None:
+        result, code = _install_report(engine, jobs, skipped)
+    else:
+        executor.wait()
+        result = {"packages": dict(executor.outcomes), "skipped_because": executor.reasons,
+                  "failed": executor.failed}
+        code = 1 if executor.failed else 0
+    return dict(result, batch=batch["batch"], title=batch["title"]), code
+
+
+def cmd_cache(engine, args):
+    cache = engine.artifact_cache
+    if args.dir:
+        cache.root = Path(args.dir)
+        engine.settings.update(engine.settings_values())
+    if args.clear:
+        cache.clear()
+    result = {}
+    if args.prefetch:
+        if args.prefetch not in engine.categories:
+            return {"error": f"Unknown category: {args.prefetch}", "categories": list(engine.categories)}, 2
+        if not cache.enabled:
+            return {"error": "The installer cache is turned off (artifact_cache in settings.json)"}, 2
+        result["packages"] = engine.prefetch([app.id for app in engine.categories[args.prefetch]], args.manager)
+    result.update(cache.stats())
+    failed = [p for p, state in result.get("packages", {}).items() if state == 'failed']
+    return result, (1 if failed else 0)
+
+
+HANDLERS = {
+    'search': cmd_search,
+    'install': cmd_install,
+    'install-category': cmd_install_category,
+    'apply-profile': cmd_apply_profile,
+    'list': cmd_list,
+    'categories': cmd_categories,
+    'cache': cmd_cache,
+    'upgrade': cmd_upgrade,
+    'resume': cmd_resume,
+}
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    engine = Engine(args.config_dir)
+    # Same concurrency limits and cache settings as the GUI
+    engine.apply_settings()
+    result, code = HANDLERS[args.command](engine, args)
+    engine.settings.flush()
+    if sys.stdout is not None:  # None in the --noconsole build; the exit code still reports failures
+        json.dump(result, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,3438 @@
+"""Package search/install engine shared by the GUI (main.py) and the CLI (cli.py).
+
+Nothing in here imports tkinter, so it can run headless and be exercised on
+any OS with stand-in ``winget``/``choco`` executables on PATH.
+"""
+import bisect
+import hashlib
+import subprocess
+import sys
+import threading
+import json
+import os
+import heapq
+import itertools
+import queue
+import re
+import shutil
+import tempfile
+import time
+from collections import OrderedDict, namedtuple, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+def default_config_dir():
+    """Per-user directory for settings and caches (created on first write)."""
+    local_appdata = os.getenv('LOCALAPPDATA') or str(Path.home() / 'AppData' / 'Local')
+    return Path(local_appdata) / 'WinGet Package Installer'
+
+
+# Directory holding the bundled catalog (next to this module, or unpacked by PyInstaller)
+BUNDLED_CATALOG_DIR = Path(getattr(sys, '_MEIPASS', Path(__file__).resolve().parent)) / 'catalog'
+# Extra catalog files or directories (os.pathsep-separated), e.g. an IT-curated share
+CATALOG_PATH_ENV = 'WINGET_INSTALLER_CATALOG'
+CATALOG_MANIFEST = 'catalog.json'
+
+
+def catalog_sources(config_dir):
+    """Catalog manifests in override order: bundled, shared (ProgramData, env), per-user."""
+    sources = [BUNDLED_CATALOG_DIR]
+    program_data = os.getenv('PROGRAMDATA')
+    if program_data:
+        sources.append(Path(program_data) / 'WinGet Package Installer' / 'catalog')
+    sources.extend(Path(p) for p in os.getenv(CATALOG_PATH_ENV, '').split(os.pathsep) if p)
+    sources.append(Path(config_dir) / 'catalog')
+    return [p if p.suffix.lower() == '.json' else p / CATALOG_MANIFEST for p in sources]
+
+
+# One app in a catalog category; manager None means "the selected manager"
+CatalogApp = namedtuple('CatalogApp', 'name id manager depends_on')
+
+
+def _expand_command(command):
+    """Expand ``~`` in shortcut command arguments to the user's home directory."""
+    return ' '.join(str(Path(os.path.expanduser(part))) if part.startswith('~') else part
+                    for part in command.split(' '))
+
+
+class Catalog:
+    """Package categories and shortcuts read from catalog files.
+
+    Every source is a ``catalog.json`` manifest listing categories (name,
+    category file, app count) and optionally a shortcuts file; later sources
+    override earlier ones category by category (``"mode"``: ``replace``,
+    ``append`` or ``remove``). Manifests are read on first use and each
+    category file only when that category is needed, so startup cost does
+    not grow with the catalog. Loaded apps are indexed by ID and by name
+    tokens for ``find()`` and ``search()``.
+    """
+
+    def __init__(self, sources):
+        self.sources = [Path(p) for p in sources]
+        self.errors = []  # (path, message) for files that could not be read
+        self._lock = threading.RLock()
+        self._layers = None  # category -> [(manifest dir, entry)] in override order
+        self._counts = {}
+        self._shortcut_files = []
+        self._apps = {}  # category -> [CatalogApp], for loaded categories
+        self._by_id = {}  # id lower -> (category, CatalogApp)
+        self._tokens = None  # (sorted tokens, token -> [id lower]) over every category
+
+    def _read_json(self, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.errors.append((str(path), str(e)))
+            return None
+
+    def _manifests(self):
+        with self._lock:
+            if self._layers is not None:
+                return self._layers
+            layers = OrderedDict()
+            for path in self.sources:
+                manifest = self._read_json(path)
+                if not isinstance(manifest, dict):
+                    continue
+                for entry in manifest.get("categories", []):
+                    name = entry.get("name")
+                    if not name:
+                        continue
+                    mode = entry.get("mode", "replace")
+                    if mode == "remove":
+                        layers.pop(name, None)
+                        self._counts.pop(name, None)
+                        continue
+                    if mode != "append" or name not in layers:
+                        layers[name] = []
+                        self._counts[name] = 0
+                    layers[name].append((path.parent, entry))
+                    self._counts[name] += entry.get("count") or len(entry.get("apps", []))
+                if manifest.get("shortcuts"):
+                    self._shortcut_files.append((path.parent, manifest["shortcuts"]))
+            self._layers = layers
+            return layers
+
+    # Mapping-style access used by the GUI and CLI (category name -> apps)
+
+    def keys(self):
+        return list(self._manifests())
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __contains__(self, name):
+        return name in self._manifests()
+
+    def __len__(self):
+        return len(self._manifests())
+
+    def __getitem__(self, name):
+        apps = self.get(name)
+        if apps is None:
+            raise KeyError(name)
+        return apps
+
+    def get(self, name, default=None):
+        """Apps in a category, loading its files on first access."""
+        with self._lock:
+            if name in self._apps:
+                return self._apps[name]
+            layers = self._manifests().get(name)
+            if layers is None:
+                return default
+            apps = OrderedDict()
+            for base, entry in layers:
+                items = entry.get("apps")
+                if items is None and entry.get("file"):
+                    data = self._read_json(base / entry["file"])
+                    items = data.get("apps", []) if isinstance(data, dict) else (data or [])
+                for item in items or []:
+                    app = self._parse_app(item)
+                    if app is not None:
+                        apps[app.id.lower()] = app
+            result = self._apps[name] = list(apps.values())
+            for app in result:
+                self._by_id.setdefault(app.id.lower(), (name, app))
+            self._tokens = None
+            return result
+
+    def items(self):
+        return [(name, self.get(name)) for name in self.keys()]
+
+    def count(self, name):
+        """App count from the manifest (no category file is read)."""
+        self._manifests()
+        return len(self._apps[name]) if name in self._apps else self._counts.get(name, 0)
+
+    @staticmethod
+    def _parse_app(item):
+        if isinstance(item, (list, tuple)) and len(item) >= 2:
+            return CatalogApp(str(item[0]), str(item[1]), None, ())
+        if not isinstance(item, dict) or not item.get("id"):
+            return None
+        depends_on = item.get("depends_on") or ()
+        if isinstance(depends_on, str):
+            depends_on = [depends_on]
+        return CatalogApp(item.get("name") or item["id"], item["id"], item.get("manager"), tuple(depends_on))
+
+    def load_all(self):
+        for name in self.keys():
+            self.get(name)
+
+    def find(self, pkgid):
+        """``(category, CatalogApp)`` for a package ID, or None (loads categories as needed)."""
+        key = pkgid.lower()
+        with self._lock:
+            if key not in self._by_id:
+                for name in self.keys():
+                    if name not in self._apps:
+                        self.get(name)
+                        if key in self._by_id:
+                            break
+            return self._by_id.get(key)
+
+    def warm(self):
+        """Load every category and build the name/ID token index (call off the UI thread)."""
+        self._token_index()
+
+    def _token_index(self):
+        with self._lock:
+            if self._tokens is not None:
+                return self._tokens
+        self.load_all()  # category by category, so the lock is never held for long
+        with self._lock:
+            apps = list(self._by_id.items())
+        postings = {}
+        for key, (category, app) in apps:
+            for token in set(re.split(r'[^\w+#]+', f"{app.name} {app.id}".lower())):
+                if token:
+                    postings.setdefault(token, []).append(key)
+        index = (sorted(postings), postings)
+        with self._lock:
+            self._tokens = index
+        return index
+
+    def search(self, text, limit=200):
+        """``[(category, CatalogApp)]`` whose name or ID tokens start with every query word."""
+        words = [w for w in re.split(r'[^\w+#]+', text.lower()) if w]
+        if not words:
+            return []
+        tokens, postings = self._token_index()
+        matches = None
+        for word in words:
+            found = set()
+            i = bisect.bisect_left(tokens, word)
+            while i < len(tokens) and tokens[i].startswith(word):
+                found.update(postings[tokens[i]])
+                i += 1
+            matches = found if matches is None else matches & found
+            if not matches:
+                return []
+        with self._lock:
+            results = [self._by_id[key] for key in matches]
+        results.sort(key=lambda r: (r[1].name.lower(), r[1].id.lower()))
+        return results[:limit]
+
+    def shortcuts(self):
+        """``{group: [(name, command)]}`` merged from every source (later groups replace earlier)."""
+        self._manifests()
+        groups = OrderedDict()
+        for base, file_name in self._shortcut_files:
+            data = self._read_json(base / file_name)
+            for group in (data or {}).get("groups", []):
+                items = [(s["name"], _expand_command(s["command"])) for s in group.get("shortcuts", [])
+                         if s.get("name") and s.get("command")]
+                if group.get("mode") == "remove":
+                    groups.pop(group.get("name"), None)
+                elif group.get("mode") == "append" and group.get("name") in groups:
+                    groups[group["name"]].extend(items)
+                else:
+                    groups[group.get("name", "Shortcuts")] = items
+        return groups
+
+
+# Rotate the command log at this size, keeping this many older files
+COMMAND_LOG_MAX_BYTES = 1024 * 1024
+COMMAND_LOG_BACKUPS = 3
+# Durations kept per (manager, operation) for the latency percentiles
+COMMAND_STATS_WINDOW = 500
+
+
+def manager_for_command(command):
+    """Package manager name for a command line ('choco' -> 'chocolatey')."""
+    exe = Path(str(command[0])).stem.lower() if command else ''
+    return {'choco': 'chocolatey'}.get(exe, exe)
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))]
+
+
+def _output_size(*outputs):
+    size = 0
+    for output in outputs:
+        if isinstance(output, str):
+            size += len(output.encode('utf-8', 'replace'))
+        elif output:
+            size += len(output)
+    return size
+
+
+class CommandLog:
+    """Record of every package manager invocation.
+
+    Each call to ``record`` appends one JSON line to a size-rotated log
+    (``commands.jsonl``, ``commands.jsonl.1``, ...) and adds the duration to
+    an in-memory window per (manager, operation) for ``summary()``.
+    """
+
+    def __init__(self, path, max_bytes=COMMAND_LOG_MAX_BYTES, backups=COMMAND_LOG_BACKUPS, window=COMMAND_STATS_WINDOW):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.window = window
+        self._lock = threading.Lock()
+        self._stats = OrderedDict()  # (manager, operation) -> {"durations": deque, status counts}
+        self._recent = deque(maxlen=200)
+
+    def record(self, operation, command, duration, returncode=None, output_bytes=0, status='ok', manager=None):
+        entry = {
+            "time": datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            "manager": manager or manager_for_command(command),
+            "operation": operation,
+            "command": [str(part) for part in command],
+            "duration_ms": round(duration * 1000, 1),
+            "returncode": returncode,
+            "output_bytes": output_bytes,
+            "status": status,
+        }
+        with self._lock:
+            stats = self._stats.get((entry["manager"], operation))
+            if stats is None:
+                stats = self._stats[(entry["manager"], operation)] = {"durations": deque(maxlen=self.window), "count": 0}
+            stats["durations"].append(entry["duration_ms"])
+            stats["count"] += 1
+            stats[status] = stats.get(status, 0) + 1
+            self._recent.append(entry)
+            self._write(entry)
+        return entry
+
+    def _write(self, entry):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self.path.exists() and self.path.stat().st_size >= self.max_bytes:
+                for i in range(self.backups - 1, 0, -1):
+                    older = self.path.with_name(f"{self.path.name}.{i}")
+                    if older.exists():
+                        os.replace(older, self.path.with_name(f"{self.path.name}.{i + 1}"))
+                os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        except Exception:
+            pass  # diagnostics must never break a search or install
+
+    def summary(self):
+        """Per (manager, operation): counts by status and p50/p95/max duration in ms."""
+        with self._lock:
+            rows = []
+            for (manager, operation), stats in self._stats.items():
+                durations = list(stats["durations"])
+                rows.append({
+                    "manager": manager,
+                    "operation": operation,
+                    "count": stats["count"],
+                    "failed": stats.get('failed', 0) + stats.get('error', 0),
+                    "timeout": stats.get('timeout', 0),
+                    "cancelled": stats.get('cancelled', 0),
+                    "p50_ms": _percentile(durations, 50),
+                    "p95_ms": _percentile(durations, 95),
+                    "max_ms": max(durations) if durations else 0.0,
+                })
+            return rows
+
+    def recent(self, limit=50):
+        with self._lock:
+            return list(self._recent)[-limit:]
+
+    def export(self, path):
+        """Write the summary plus every retained log entry (oldest first) to one JSON file."""
+        entries = []
+        with self._lock:
+            for i in range(self.backups, -1, -1):
+                log = self.path if i == 0 else self.path.with_name(f"{self.path.name}.{i}")
+                try:
+                    with open(log, "r", encoding="utf-8") as f:
+                        entries.extend(json.loads(line) for line in f if line.strip())
+                except (OSError, ValueError):
+                    continue
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"exported": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                       "summary": self.summary(), "commands": entries}, f, indent=2)
+
+
+# Per-job output logs: a job's file rotates at this size, and this many job files are kept on disk
+JOB_LOG_MAX_BYTES = 512 * 1024
+JOB_LOG_KEEP = 200
+# Lines of each job's output kept in memory for the live tail
+JOB_LOG_TAIL_LINES = 500
+# Job logs held in memory (most recent first); older ones are only on disk
+JOB_LOG_CACHE = 50
+
+# The job log of the job running on the current thread (see JobScheduler / job_log_context)
+_job_context = threading.local()
+
+
+def current_job_log():
+    return getattr(_job_context, 'log', None)
+
+
+@contextmanager
+def job_log_context(log):
+    """Send run_command output on this thread to ``log`` (e.g. a job's helper threads)."""
+    previous = current_job_log()
+    _job_context.log = log
+    try:
+        yield log
+    finally:
+        _job_context.log = previous
+
+
+class JobLog:
+    """Output of one job: appended to a size-rotated file, last lines kept in a ring buffer.
+
+    Lines are numbered from 0 as they arrive, so a viewer can follow the
+    job with ``read_since(n)`` and only ever handle the new lines.
+    """
+
+    def __init__(self, path, max_bytes=JOB_LOG_MAX_BYTES, tail_lines=JOB_LOG_TAIL_LINES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.tail = deque(maxlen=tail_lines)
+        self.count = 0  # lines written so far
+        self.returncode = None  # of the last command run for the job
+        self.closed = False
+        self._lock = threading.Lock()
+        self._file = None
+        self._size = 0
+
+    def write(self, text):
+        """Append ``text`` to the file as printed; only the tail skips blanks and spinner frames."""
+        with self._lock:
+            self._write_file(text if text.endswith("\n") else text + "\n")
+            for line in text.split("\n"):
+                # A console shows only the last carriage-return segment of a progress line
+                line = line.rstrip().rsplit("\r", 1)[-1].rstrip()
+                if len(line.strip()) <= 1 and line.strip() in ('', '-', '\\', '|', '/'):
+                    continue
+                self.tail.append(line)
+                self.count += 1
+
+    def _write_file(self, line):
+        try:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+                self._size = self._file.tell()
+            if self._size >= self.max_bytes:
+                self._file.close()
+                os.replace(self.path, self.path.with_name(self.path.name + '.1'))
+                self._file = open(self.path, "w", encoding="utf-8")
+                self._size = 0
+            self._file.write(line)
+            self._file.flush()
+            self._size += len(line.encode('utf-8', 'replace'))
+        except OSError:
+            pass  # the in-memory tail still works
+
+    def read_since(self, index):
+        """``(lines, next_index, skipped)``: lines from ``index`` on still in the tail, and how many fell out."""
+        with self._lock:
+            first = self.count - len(self.tail)
+            start = max(index, first)
+            lines = list(self.tail)[start - first:]
+            return lines, self.count, start - index
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+            if self._file is not None:
+                try:
+                    self._file.close()
+                except OSError:
+                    pass
+                self._file = None
+
+
+class JobLogs:
+    """Per-job logs under ``directory``; only the most recent ``cache`` stay in memory."""
+
+    def __init__(self, directory, keep=JOB_LOG_KEEP, cache=JOB_LOG_CACHE):
+        self.directory = Path(directory)
+        self.keep = keep
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._logs = OrderedDict()  # job id -> JobLog
+        self._session = datetime.now().strftime('%Y%m%d-%H%M%S')  # job ids restart every session
+
+    def open(self, job):
+        log = JobLog(self.directory / f"job-{self._session}-{job.id}.log")
+        log.write(f"# {job.kind} {' '.join(job.packages)} via {job.manager}")
+        job.log_path = str(log.path)
+        with self._lock:
+            self._logs[job.id] = log
+            for job_id in [j for j, l in self._logs.items() if l.closed][:max(0, len(self._logs) - self.cache)]:
+                del self._logs[job_id]
+        self._prune()
+        return log
+
+    def get(self, job_id):
+        with self._lock:
+            return self._logs.get(job_id)
+
+    def _prune(self):
+        try:
+            files = sorted(self.directory.glob('job-*.log'), key=lambda p: p.stat().st_mtime)
+        except OSError:
+            return
+        for path in files[:max(0, len(files) - self.keep)]:
+            for old in (path, path.with_name(path.name + '.1')):
+                try:
+                    old.unlink()
+                except OSError:
+                    pass
+
+    @staticmethod
+    def tail_file(path, lines=JOB_LOG_TAIL_LINES, max_bytes=64 * 1024):
+        """Last ``lines`` lines of a log file, reading at most ``max_bytes`` from its end."""
+        try:
+            with open(path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                f.seek(max(0, f.tell() - max_bytes))
+                data = f.read().decode('utf-8', 'replace')
+        except OSError:
+            return []
+        return data.splitlines()[-lines:]
+
+
+def _stream_run(command, job_log, kwargs, on_output=None):
+    """``subprocess.run(capture_output=True)`` that also streams each output line to ``job_log``.
+
+    stderr is merged into stdout so the log keeps the order the tool wrote them in.
+    """
+    timeout = kwargs.pop('timeout', None)
+    check = kwargs.pop('check', False)
+    kwargs.pop('capture_output', None)
+    want_text = kwargs.pop('text', False) or 'encoding' in kwargs or kwargs.pop('universal_newlines', False)
+    kwargs.setdefault('errors', 'replace')
+    proc = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            text=True, **kwargs)
+    output = []
+
+    def read():
+        for line in proc.stdout:
+            output.append(line)
+            job_log.write(line)
+            if on_output is not None:
+                try:
+                    on_output(line)
+                except Exception:
+                    pass
+
+    # Read on a helper thread so a timeout is not held up by children still holding the pipe open
+    reader = threading.Thread(target=read, daemon=True)
+    reader.start()
+    killed = False
+    try:
+        returncode = proc.wait(timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        returncode = proc.wait()
+        killed = True
+    reader.join(1.0 if killed else 5.0)
+    stdout = ''.join(output)
+    if not want_text:
+        stdout = stdout.encode('utf-8')
+    if killed:
+        job_log.write(f"# killed after {timeout}s")
+        raise subprocess.TimeoutExpired(command, timeout, output=stdout)
+    if check and returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command, output=stdout, stderr='' if want_text else b'')
+    return subprocess.CompletedProcess(command, returncode, stdout, '' if want_text else b'')
+
+
+def run_command(log, operation, command, **kwargs):
+    """``subprocess.run`` that records the invocation in ``log`` (a CommandLog, or None).
+
+    Inside a job, captured output is also streamed line by line to the job's log
+    and to ``on_output(line)`` when given (outside a job it is not called).
+    """
+    started = time.perf_counter()
+    on_output = kwargs.pop('on_output', None)
+    job_log = current_job_log()
+    try:
+        if job_log is not None and kwargs.get('capture_output'):
+            job_log.write(f"$ {subprocess.list2cmdline([str(part) for part in command])}")
+            result = _stream_run(command, job_log, dict(kwargs), on_output)
+        else:
+            result = subprocess.run(command, **kwargs)
+    except subprocess.TimeoutExpired as e:
+        if log is not None:
+            log.record(operation, command, time.perf_counter() - started, None, _output_size(e.stdout, e.stderr), 'timeout')
+        raise
+    except subprocess.CalledProcessError as e:
+        if job_log is not None:
+            job_log.returncode = e.returncode
+        if log is not None:
+            log.record(operation, command, time.perf_counter() - started, e.returncode, _output_size(e.stdout, e.stderr), 'failed')
+        raise
+    except Exception:
+        if log is not None:
+            log.record(operation, command, time.perf_counter() - started, None, 0, 'error')
+        raise
+    if job_log is not None:
+        job_log.returncode = result.returncode
+    if log is not None:
+        log.record(operation, command, time.perf_counter() - started, result.returncode,
+                   _output_size(result.stdout, result.stderr), 'ok' if result.returncode == 0 else 'failed')
+    return result
+
+
+# Launched processes kept in the history once they exit
+LAUNCH_HISTORY = 50
+# Windows programs started without the shell; anything else goes through cmd's file associations
+DIRECT_LAUNCH_SUFFIXES = ('.exe', '.com')
+# CreateProcess error for programs whose manifest asks for administrator rights
+ERROR_ELEVATION_REQUIRED = 740
+
+
+class LaunchedProcess:
+    """A shortcut process started by ``Launcher``."""
+
+    def __init__(self, name, command):
+        self.name = name
+        self.command = command
+        self.pid = None
+        self.started = time.time()
+        self.spawn_ms = None
+        self.returncode = None
+        self.ended = None
+        self.error = None  # set when the launch failed
+
+    @property
+    def running(self):
+        return self.pid is not None and self.returncode is None
+
+    @property
+    def failed(self):
+        """Could not start. Exit codes are not judged: explorer, for one, hands off and exits 1 at once."""
+        return self.error is not None
+
+
+class Launcher:
+    """Start shortcut commands detached, off the caller's thread, and track them.
+
+    ``launch`` returns immediately; the process is spawned on a worker
+    thread, its spawn time recorded in the command log (operation
+    ``launch``), and a waiter thread notes when it exits. Listeners are
+    called (from those threads) whenever a process starts, fails or exits.
+    """
+
+    def __init__(self, command_log=None, history=LAUNCH_HISTORY):
+        self.command_log = command_log
+        self.history = history
+        self._lock = threading.Lock()
+        self._processes = []
+        self._listeners = []
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def launch(self, name, command):
+        process = LaunchedProcess(name, command)
+        with self._lock:
+            self._processes.append(process)
+        threading.Thread(target=self._spawn, args=(process,), daemon=True).start()
+        return process
+
+    def processes(self):
+        """Tracked processes, newest first."""
+        with self._lock:
+            return list(reversed(self._processes))
+
+    def running(self):
+        return [p for p in self.processes() if p.running]
+
+    def _spawn(self, process):
+        started = time.perf_counter()
+        try:
+            popen = self._popen(process.command)
+        except Exception as e:
+            process.error = str(e)
+            process.ended = time.time()
+        else:
+            process.pid = popen.pid
+        process.spawn_ms = round((time.perf_counter() - started) * 1000, 1)
+        if self.command_log is not None:
+            self.command_log.record('launch', [process.command], process.spawn_ms / 1000.0, None, 0,
+                                   'failed' if process.error else 'ok', manager='shortcut')
+        self._notify(process)
+        if process.error is None:
+            process.returncode = popen.wait()
+            process.ended = time.time()
+            self._notify(process)
+        self._prune()
+
+    @staticmethod
+    def _argv(command):
+        # A plain executable is started directly so the tracked PID is the program itself;
+        # `start ...`, .msc snap-ins and the like go through the shell
+        parts = command.split()
+        if not parts or any(ch in command for ch in '"&|<>^%'):
+            return command
+        path = shutil.which(parts[0])
+        # PATHEXT also resolves .msc/.cpl/.bat, which CreateProcess cannot start itself
+        if path and (os.name != 'nt' or Path(path).suffix.lower() in DIRECT_LAUNCH_SUFFIXES):
+            return parts
+        return command
+
+    @staticmethod
+    def _popen(command):
+        argv = Launcher._argv(command)
+        try:
+            return subprocess.Popen(argv, **Launcher._popen_options(isinstance(argv, str)))
+        except OSError as e:
+            if getattr(e, 'winerror', None) != ERROR_ELEVATION_REQUIRED or isinstance(argv, str):
+                raise
+        # regedit, taskmgr for admins, ...: CreateProcess refuses, cmd falls back to
+        # ShellExecute, which shows the UAC prompt
+        return subprocess.Popen(command, **Launcher._popen_options(True))
+
+    @staticmethod
+    def _popen_options(shell):
+        options = {"stdin": subprocess.DEVNULL, "stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL,
+                   "shell": shell, "close_fds": True}
+        if os.name == 'nt':
+            # New process group so the tool outlives the app and Ctrl+C in a console does not reach it
+            options["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            options["start_new_session"] = True
+        return options
+
+    def _prune(self):
+        with self._lock:
+            finished = [p for p in self._processes if not p.running and p.ended is not None]
+            for process in finished[:max(0, len(finished) - self.history)]:
+                self._processes.remove(process)
+
+    def _notify(self, process):
+        for callback in list(self._listeners):
+            try:
+                callback(process)
+            except Exception:
+                pass
+
+
+# Finished jobs the scheduler remembers
+JOB_HISTORY = 500
+
+# Job states reported by the install scheduler
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_SUCCEEDED = 'succeeded'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+JOB_FINISHED_STATES = (JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED)
+
+# Lower numbers run first; jobs with equal priority run in submission order
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+
+# Concurrent jobs allowed per package manager. winget installers share the
+# MSI installer lock, so winget is serialized by default.
+DEFAULT_CONCURRENCY = {'winget': 1, 'chocolatey': 2}
+
+
+class InstallJob:
+    """One unit of scheduled work covering one or more packages."""
+
+    def __init__(self, job_id, manager, packages, runner, priority=PRIORITY_NORMAL):
+        self.id = job_id
+        self.manager = manager
+        self.packages = list(packages)
+        self.runner = runner
+        self.priority = priority
+        self.state = JOB_QUEUED
+        self.results = {}  # per-package state overrides (set by batch runners)
+        self.error = None
+        self.kind = 'install'  # or 'upgrade'
+        self.log_path = None  # set when the job starts (see JobLogs)
+        self.returncode = None  # exit code of the job's last manager command
+        self.batch_id = None  # JobJournal batch the job belongs to
+        self.target_version = None  # upgrades: the version being installed
+
+    def package_state(self, package):
+        return self.results.get(package, self.state)
+
+
+class JobScheduler:
+    """Priority FIFO job queue with a concurrency limit for each package manager.
+
+    Runners are called on a worker thread with the job and return True on
+    success. ``on_change`` is called (from any thread) whenever a job changes
+    state; ``wait`` only returns once it has been called for the final state.
+    """
+
+    def __init__(self, limits=None, on_change=None, job_logs=None, history=JOB_HISTORY):
+        self._limits = dict(DEFAULT_CONCURRENCY)
+        self._limits.update(limits or {})
+        self._on_change = on_change
+        self.job_logs = job_logs
+        self.history = history
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+        self._queues = {}
+        self._running = {}
+        self._settling = set()  # finished jobs whose final on_change call has not returned yet
+        self._seq = itertools.count(1)
+        self.jobs = OrderedDict()
+
+    def get_limit(self, manager):
+        return max(1, int(self._limits.get(manager, 1)))
+
+    def set_limit(self, manager, limit):
+        with self._lock:
+            self._limits[manager] = max(1, int(limit))
+        self._dispatch()
+
+    def submit(self, manager, packages, runner, priority=PRIORITY_NORMAL, batch_id=None):
+        return self.enqueue(self.create(manager, packages, runner, priority, batch_id))
+
+    def create(self, manager, packages, runner, priority=PRIORITY_NORMAL, batch_id=None):
+        """Register a job without queueing it; ``enqueue`` it once the caller has set it up.
+
+        Unlike ``submit`` this calls no listeners, so it is safe under the caller's own locks.
+        """
+        with self._lock:
+            job = InstallJob(next(self._seq), manager, packages, runner, priority)
+            job.batch_id = batch_id
+            self.jobs[job.id] = job
+        return job
+
+    def enqueue(self, job):
+        with self._lock:
+            if job.state == JOB_QUEUED:
+                heapq.heappush(self._queues.setdefault(job.manager, []), (job.priority, job.id, job))
+        self._notify(job)
+        self._dispatch()
+        return job
+
+    def cancel(self, job_id):
+        """Cancel a queued job. Running jobs are left to finish."""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.state != JOB_QUEUED:
+                return False
+            job.state = JOB_CANCELLED
+            self._settling.add(job.id)
+        self._settle(job)
+        return True
+
+    def wait(self, jobs, timeout=None):
+        """Block until every job has finished and been reported; returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while any(j.state not in JOB_FINISHED_STATES or j.id in self._settling for j in jobs):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._done.wait(remaining)
+        return True
+
+    def progress(self, job):
+        """Report a change in a running job's per-package ``results``."""
+        self._notify(job)
+
+    def recent_jobs(self, limit=100):
+        """The newest ``limit`` jobs, newest first."""
+        with self._lock:
+            return list(self.jobs.values())[::-1][:limit]
+
+    def active_jobs(self):
+        with self._lock:
+            return [j for j in self.jobs.values() if j.state not in JOB_FINISHED_STATES]
+
+    def _dispatch(self):
+        started = []
+        with self._lock:
+            for manager, pending in self._queues.items():
+                limit = max(1, int(self._limits.get(manager, 1)))
+                while pending and self._running.get(manager, 0) < limit:
+                    _, _, job = heapq.heappop(pending)
+                    if job.state != JOB_QUEUED:
+                        continue  # cancelled while waiting
+                    job.state = JOB_RUNNING
+                    self._running[manager] = self._running.get(manager, 0) + 1
+                    started.append(job)
+        for job in started:
+            self._notify(job)
+            threading.Thread(target=self._run, args=(job,), daemon=True).start()
+
+    def _run(self, job):
+        log = self.job_logs.open(job) if self.job_logs is not None else None
+        try:
+            with job_log_context(log):
+                state = JOB_SUCCEEDED if job.runner(job) else JOB_FAILED
+        except Exception as e:
+            job.error = str(e)
+            state = JOB_FAILED
+        if log is not None:
+            job.returncode = log.returncode
+            log.write(f"# {state}" + (f": {job.error}" if job.error else ""))
+            log.close()
+        with self._lock:
+            job.state = state
+            self._running[job.manager] -= 1
+            # Forget the oldest finished jobs so a long session does not accumulate them
+            finished = [j for j, jb in self.jobs.items() if jb.state in JOB_FINISHED_STATES]
+            for job_id in finished[:max(0, len(finished) - self.history)]:
+                del self.jobs[job_id]
+            self._settling.add(job.id)
+        self._settle(job)
+        self._dispatch()
+
+    def _settle(self, job):
+        """Report a job's final state, then release its waiters.
+
+        Listeners such as the journal run first, so a caller that exits as
+        soon as ``wait`` returns (the CLI) does not lose their work.
+        """
+        try:
+            self._notify(job)
+        finally:
+            with self._lock:
+                self._settling.discard(job.id)
+                self._done.notify_all()
+
+    def _notify(self, job):
+        if self._on_change is not None:
+            try:
+                self._on_change(job)
+            except Exception:
+                pass
+
+
+# Package states in the journal that need no further work
+JOURNAL_DONE = ('succeeded', 'already installed')
+JOURNAL_FINAL = JOURNAL_DONE + ('failed', 'cancelled', 'skipped')
+
+
+class JobJournal:
+    """Append-only record of batch installs, so an interrupted batch can be resumed.
+
+    Every line of ``journal.jsonl`` is one event: a batch being defined (its
+    kind, title, packages and options), a package being queued, started or
+    finished (with its final state and exit code), or a batch being
+    dismissed. Each line is flushed and fsynced before the call returns and
+    a torn last line is ignored, so a crash or reboot loses at most the event
+    being written. On load, batches with nothing left to do are compacted
+    away; ``interrupted()`` lists the rest.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._batches = None  # batch id -> {"kind", "title", "packages", "options", "states", "returncodes"}
+        self._seq = itertools.count(1)
+
+    def load(self):
+        with self._lock:
+            if self._batches is not None:
+                return
+            self._batches = OrderedDict()
+            records = []
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            records.append(json.loads(line))
+                        except ValueError:
+                            continue  # torn write from a crash
+            except OSError:
+                return
+            for record in records:
+                self._apply(record)
+            closed = [b for b, batch in self._batches.items() if not self._is_open(batch)]
+            if closed:
+                for batch_id in closed:
+                    del self._batches[batch_id]
+                kept = [r for r in records if r.get("batch") in self._batches]
+                try:
+                    write_text_atomic(self.path, ''.join(json.dumps(r) + "\n" for r in kept))
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _is_open(batch):
+        return not batch.get("dismissed") and any(s not in JOURNAL_FINAL for s in batch["states"].values())
+
+    def _apply(self, record):
+        event, batch_id = record.get("event"), record.get("batch")
+        if event == 'batch':
+            self._batches[batch_id] = {
+                "kind": record.get("kind"), "title": record.get("title"), "time": record.get("t"),
+                "packages": record.get("packages", []), "options": record.get("options", {}),
+                "states": OrderedDict((p["id"], 'pending') for p in record.get("packages", [])),
+                "returncodes": {},
+            }
+            return
+        batch = self._batches.get(batch_id)
+        if batch is None:
+            return
+        if event == 'dismissed':
+            batch["dismissed"] = True
+        elif event in ('queued', 'started'):
+            batch["states"][record["package"]] = event
+        elif event == 'finished':
+            batch["states"][record["package"]] = record.get("state")
+            batch["returncodes"][record["package"]] = record.get("returncode")
+
+    def _append(self, record):
+        self.load()
+        record["t"] = round(time.time(), 3)
+        with self._lock:
+            self._apply(record)
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+            except OSError:
+                pass  # a journal failure must not stop the install itself
+
+    def begin(self, kind, title, packages, **options):
+        """Start a batch; ``packages`` are dicts with at least an ``id``. Returns the batch id."""
+        batch_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(self._seq)}"
+        self._append({"event": 'batch', "batch": batch_id, "kind": kind, "title": title,
+                      "packages": list(packages), "options": options})
+        return batch_id
+
+    def package(self, batch_id, package, event, state=None, returncode=None):
+        with self._lock:
+            batch = (self._batches or {}).get(batch_id)
+            current = batch["states"].get(package) if batch is not None else None
+        if batch is None or (current in JOURNAL_DONE and event != 'finished'):
+            return
+        if current == (state if event == 'finished' else event):
+            return  # e.g. progress notifications of a running job
+        record = {"event": event, "batch": batch_id, "package": package}
+        if event == 'finished':
+            record.update(state=state, returncode=returncode)
+        self._append(record)
+
+    def record_job(self, job):
+        """Journal a state change (or per-package progress) of a job that belongs to a batch.
+
+        Packages of a running multi-package job are journaled as finished as
+        soon as their entry in ``job.results`` is, not when the whole job ends.
+        """
+        if job.batch_id is None:
+            return
+        for package in job.packages:
+            state = job.package_state(package)
+            if job.state in JOB_FINISHED_STATES and state not in JOB_FINISHED_STATES:
+                state = job.state  # e.g. the runner raised while the package was downloading
+            if state in JOB_FINISHED_STATES:
+                self.package(job.batch_id, package, 'finished', state,
+                             job.returncode if job.state in JOB_FINISHED_STATES else None)
+            elif job.state == JOB_RUNNING:
+                self.package(job.batch_id, package, 'started')
+            else:
+                self.package(job.batch_id, package, 'queued')
+
+    def dismiss(self, batch_id):
+        self._append({"event": 'dismissed', "batch": batch_id})
+
+    def batch(self, batch_id):
+        self.load()
+        with self._lock:
+            batch = self._batches.get(batch_id)
+            return None if batch is None else dict(batch, states=dict(batch["states"]))
+
+    def remaining(self, batch_id):
+        """Packages of a batch that have not succeeded (or been found installed)."""
+        batch = self.batch(batch_id)
+        return [] if batch is None else [p for p, s in batch["states"].items() if s not in JOURNAL_DONE]
+
+    def interrupted(self):
+        """Open batches, oldest first: ``{"batch", "kind", "title", "time", "total", "done", "remaining"}``."""
+        self.load()
+        with self._lock:
+            batches = [(b, batch) for b, batch in self._batches.items() if self._is_open(batch)]
+        return [{"batch": batch_id, "kind": batch["kind"], "title": batch["title"], "time": batch["time"],
+                 "total": len(batch["states"]),
+                 "done": sum(1 for s in batch["states"].values() if s in JOURNAL_DONE),
+                 "remaining": self.remaining(batch_id)}
+                for batch_id, batch in batches]
+
+
+def build_winget_import_manifest(package_ids):
+    """Return a `winget import` manifest (as a dict) installing the given package IDs."""
+    return {
+        "$schema": "https://aka.ms/winget-packages.schema.2.0.json",
+        "CreationDate": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000-00:00"),
+        "Sources": [{
+            "Packages": [{"PackageIdentifier": pkgid} for pkgid in package_ids],
+            "SourceDetails": {
+                "Argument": "https://cdn.winget.microsoft.com/cache",
+                "Identifier": "Microsoft.Winget.Source_8wekyb3d8bbwe",
+                "Name": "winget",
+                "Type": "Microsoft.PreIndexed.Package",
+            },
+        }],
+    }
+
+
+def _batch_results(found, package_ids, returncode):
+    """Map results found in combined output back to the requested IDs (case-insensitive).
+
+    Packages the output never mentions are judged by the overall exit code.
+    """
+    fallback = JOB_SUCCEEDED if returncode == 0 else JOB_FAILED
+    lowered = {k.lower(): v for k, v in found.items()}
+    return {pkgid: lowered.get(pkgid.lower(), fallback) for pkgid in package_ids}
+
+
+def parse_winget_import_output(output, package_ids, returncode=0):
+    """Extract per-package results from `winget import` output."""
+    parser = WingetImportParser()
+    parser.feed(output)
+    return _batch_results(parser.found, package_ids, returncode)
+
+
+class WingetImportParser:
+    """Incrementally collect per-package results (``found``: id -> state) from `winget import` output."""
+
+    def __init__(self):
+        self.found = {}
+        self.current = None
+
+    def feed(self, text):
+        """Parse more output; returns the ``(id, state)`` results it reported."""
+        reported = []
+        for line in text.splitlines():
+            result = self.feed_line(line.strip())
+            if result is not None:
+                self.found[result[0]] = result[1]
+                reported.append(result)
+        return reported
+
+    def feed_line(self, line):
+        m = re.match(r'^Found .*\[(?P<id>[^\]]+)\]', line)
+        if m:
+            self.current = m.group('id')
+            return None
+        m = re.match(r'^Package is already installed:\s*(?P<id>\S+)', line, re.I)
+        if m:
+            return m.group('id'), JOB_SUCCEEDED
+        m = re.match(r'^(?:Package not found|No package found matching input criteria)[:.]?\s*(?P<id>\S+)?', line, re.I)
+        if m:
+            pkgid = m.group('id') or self.current
+            return (pkgid, JOB_FAILED) if pkgid else None
+        if self.current is None:
+            return None
+        if line.startswith('Successfully installed'):
+            return self.current, JOB_SUCCEEDED
+        if re.search(r'(installer|installation) failed', line, re.I):
+            return self.current, JOB_FAILED
+        return None
+
+
+def parse_choco_install_output(output, package_ids, returncode=0):
+    """Extract per-package results from a multi-package `choco install` run."""
+    parser = ChocoInstallParser()
+    parser.feed(output)
+    return _batch_results(parser.found, package_ids, returncode)
+
+
+class ChocoInstallParser(WingetImportParser):
+    """Incrementally collect per-package results from a multi-package `choco install` run."""
+
+    def __init__(self):
+        super().__init__()
+        self.in_failures = False
+
+    def feed_line(self, line):
+        m = re.search(r'The install of (?P<id>\S+) was successful', line)
+        if m:
+            return m.group('id'), JOB_SUCCEEDED
+        m = re.match(r'^(?P<id>\S+) v\S+ already installed', line)
+        if m:
+            return m.group('id'), JOB_SUCCEEDED
+        if line.startswith('Failures'):
+            self.in_failures = True
+            return None
+        if self.in_failures:
+            m = re.match(r'^-\s+(?P<id>\S+)\s+(?:\(exited|-)', line)
+            if m:
+                return m.group('id'), JOB_FAILED
+            if line and not line.startswith('-'):
+                self.in_failures = False
+        return None
+
+
+# One row of search output, normalized across package managers
+PackageRecord = namedtuple('PackageRecord', 'name id version match source')
+
+
+class WingetTableParser:
+    """Incrementally parse the fixed-width tables printed by `winget search/list/upgrade`.
+
+    Column offsets are taken from the header line (the one followed by a row
+    of dashes); every subsequent line is sliced into those columns.
+    """
+
+    def __init__(self):
+        self._previous = None
+        self._columns = None
+
+    def feed_row(self, line):
+        """Consume one line of output; return a dict of lower-cased column -> value, or None."""
+        # winget draws progress spinners with carriage returns; keep the final frame
+        line = line.rstrip('\r\n').split('\r')[-1]
+        if self._columns is None:
+            if self._previous is not None and line.strip() and set(line.strip()) == {'-'}:
+                self._columns = self._header_columns(self._previous)
+            self._previous = line
+            return None
+        if not line.strip():
+            return None
+        id_start = dict(self._columns).get('id', 0)
+        if id_start and len(line) > id_start and not line[id_start - 1].isspace():
+            return None  # free text spanning columns (e.g. "3 upgrades available.")
+        values = {}
+        for i, (title, start) in enumerate(self._columns):
+            end = self._columns[i + 1][1] if i + 1 < len(self._columns) else None
+            values[title] = line[start:end].strip()
+        if not values.get('id') or ' ' in values['id']:
+            return None
+        return values
+
+    def feed_line(self, line):
+        """Consume one line of output; return a PackageRecord or None."""
+        values = self.feed_row(line)
+        if values is None:
+            return None
+        return PackageRecord(values.get('name', ''), values['id'], values.get('version', ''),
+                             values.get('match', ''), values.get('source', '') or 'winget')
+
+    @staticmethod
+    def _header_columns(header):
+        return [(m.group(0).lower(), m.start()) for m in re.finditer(r'\S+', header)]
+
+
+def parse_winget_search_output(output):
+    parser = WingetTableParser()
+    records = []
+    for line in output.splitlines():
+        record = parser.feed_line(line)
+        if record is not None:
+            records.append(record)
+    return records
+
+
+def parse_choco_search_line(line):
+    """Parse one line of `choco search --limit-output` (``id|version``)."""
+    parts = line.strip().split('|')
+    if len(parts) < 2 or not parts[0] or ' ' in parts[0]:
+        return None
+    return PackageRecord(parts[0], parts[0], parts[1], '', 'chocolatey')
+
+
+def parse_choco_search_output(output):
+    return [r for r in (parse_choco_search_line(line) for line in output.splitlines()) if r is not None]
+
+
+def parse_search_output(manager, output):
+    if manager == 'chocolatey':
+        return parse_choco_search_output(output)
+    return parse_winget_search_output(output)
+
+
+# Seconds before a search child process is killed (partial results are kept)
+SEARCH_TIMEOUT = 10
+
+
+def search_command(manager, query):
+    if manager == 'chocolatey':
+        return ["choco", "search", query, "--limit-output"]
+    return ["winget", "search", query]
+
+
+class StreamingSearch:
+    """Run a package manager search, delivering parsed records as lines arrive.
+
+    ``on_records`` is called from the reading thread with batches of new
+    PackageRecords, at most every ``flush_interval`` seconds. The child can be
+    killed with ``cancel()``; on timeout it is killed too, and the records
+    already received are kept. ``run()`` returns the final status
+    ('complete', 'timeout', 'cancelled' or 'error') and the raw output.
+    """
+
+    def __init__(self, manager, query, on_records, timeout=SEARCH_TIMEOUT, flush_interval=0.1, command_log=None):
+        self.manager = manager
+        self.command_log = command_log
+        self.query = query
+        self.on_records = on_records
+        self.timeout = timeout
+        self.flush_interval = flush_interval
+        self.status = None
+        self.error = None
+        self.records = []
+        self._proc = None
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._timed_out = False
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled = True
+            self._kill()
+
+    def _on_timeout(self):
+        with self._lock:
+            self._timed_out = True
+            self._kill()
+
+    def _kill(self):
+        if self._proc is not None and self._proc.poll() is None:
+            try:
+                self._proc.kill()
+            except OSError:
+                pass
+
+    def run(self):
+        lines = []
+        pending = []
+        table = WingetTableParser() if self.manager != 'chocolatey' else None
+        command = search_command(self.manager, self.query)
+        started = time.perf_counter()
+        with self._lock:
+            if self._cancelled:
+                self.status = 'cancelled'
+                return self.status, ''
+            try:
+                self._proc = subprocess.Popen(
+                    command,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                    encoding='utf-8',
+                    errors='replace',
+                    bufsize=1
+                )
+            except Exception as e:
+                self.status, self.error = 'error', str(e)
+                self._record(command, started, None, 0)
+                return self.status, ''
+        timer = threading.Timer(self.timeout, self._on_timeout)
+        timer.daemon = True
+        timer.start()
+        last_flush = time.monotonic()
+        try:
+            for line in self._proc.stdout:
+                lines.append(line)
+                record = table.feed_line(line) if table else parse_choco_search_line(line)
+                if record is not None:
+                    pending.append(record)
+                if pending and time.monotonic() - last_flush >= self.flush_interval:
+                    self._flush(pending)
+                    pending = []
+                    last_flush = time.monotonic()
+            self._proc.wait()
+        finally:
+            timer.cancel()
+        self._flush(pending)
+        if self._cancelled:
+            self.status = 'cancelled'
+        elif self._timed_out:
+            self.status = 'timeout'
+        else:
+            self.status = 'complete'
+        output = ''.join(lines)
+        self._record(command, started, self._proc.returncode, _output_size(output))
+        return self.status, output
+
+    def _record(self, command, started, returncode, output_bytes):
+        if self.command_log is None:
+            return
+        status = {'complete': 'ok' if returncode == 0 else 'failed'}.get(self.status, self.status)
+        self.command_log.record('search', command, time.perf_counter() - started, returncode, output_bytes, status, self.manager)
+
+    def _flush(self, records):
+        if not records or self._cancelled:
+            return
+        self.records.extend(records)
+        self.on_records(records)
+
+
+def filter_records(records, query):
+    """Narrow an earlier result set to the records that still match a refined query.
+
+    winget matches queries as substrings of the name, id, moniker or tag (the
+    latter two appear in the Match column), so the results for "chrom" are a
+    superset of the results for "chrome".
+    """
+    needle = SearchCache.normalize(query)
+    return [r for r in records
+            if needle in r.name.lower() or needle in r.id.lower() or needle in r.match.lower()]
+
+
+def _normalize_name(value):
+    return re.sub(r'[^a-z0-9]+', '', value.lower())
+
+
+class SearchResultMerger:
+    """Merge search results from several managers into one row per package.
+
+    Records from different managers are merged when their normalized name
+    (or the ID without its publisher prefix) agrees and their publishers
+    do not conflict; choco IDs carry no publisher. Rows keep the first
+    record that arrived and list every manager in ``source``; the other
+    manager's ID is shown in ``match``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows = []  # [record, managers, publisher]
+        self._keys = {}
+
+    @staticmethod
+    def _publisher(manager, record):
+        if manager == 'chocolatey' or '.' not in record.id:
+            return None
+        return record.id.split('.', 1)[0].lower()
+
+    @staticmethod
+    def _keys_for(record):
+        keys = {_normalize_name(record.name), _normalize_name(record.id.split('.', 1)[-1])}
+        keys.discard('')
+        return keys
+
+    def add(self, manager, records):
+        """Add a manager's records and return a snapshot of the merged rows."""
+        with self._lock:
+            for record in records:
+                publisher = self._publisher(manager, record)
+                keys = self._keys_for(record)
+                row = None
+                for key in keys:
+                    for candidate in self._keys.get(key, ()):
+                        if manager not in candidate[1] and (publisher is None or candidate[2] in (None, publisher)):
+                            row = candidate
+                            break
+                    if row is not None:
+                        break
+                if row is None:
+                    row = [record._replace(source=manager if record.source in ('', manager) else record.source), {manager}, publisher]
+                    self._rows.append(row)
+                else:
+                    merged = row[0]
+                    extra = f"{manager}: {record.id}" if record.id.lower() != merged.id.lower() else ''
+                    row[0] = merged._replace(source=f"{merged.source} + {manager}",
+                                             match=", ".join(x for x in (merged.match, extra) if x))
+                    row[1].add(manager)
+                    row[2] = row[2] or publisher
+                for key in keys:
+                    self._keys.setdefault(key, []).append(row)
+            return [row[0] for row in self._rows]
+
+    def rows(self):
+        with self._lock:
+            return [row[0] for row in self._rows]
+
+
+# Managers queried by the "All" package manager mode
+SEARCH_MANAGERS = ('winget', 'chocolatey')
+
+
+# Bump when the layout of settings.json changes, and add a step to SETTINGS_MIGRATIONS
+SETTINGS_SCHEMA_VERSION = 1
+# Seconds of quiet after the last change before settings are written
+SETTINGS_DEBOUNCE = 0.5
+
+
+def _migrate_settings_v0(data):
+    """Unversioned files (before the store existed) are flat dicts; just stamp them."""
+    return data
+
+
+# version -> function upgrading a dict from that version to the next
+SETTINGS_MIGRATIONS = {
+    0: _migrate_settings_v0,
+}
+
+
+def write_json_atomic(path, data, **dump_options):
+    """Write JSON to a temp file in the same directory, then rename it over ``path``.
+
+    Readers see either the old file or the complete new one, never a torn write.
+    """
+    write_text_atomic(path, json.dumps(data, **dump_options))
+
+
+def write_text_atomic(path, text):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=path.name + '.', suffix='.tmp', dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class SettingsStore:
+    """Versioned JSON settings, read on first access and written in the background.
+
+    ``set``/``update`` only change memory and (re)start a debounce timer; the
+    file is written atomically on a worker thread once changes stop for
+    ``debounce`` seconds, or immediately by ``flush()``. Large state goes in
+    a ``section()``, stored in its own file and loaded only when used.
+    """
+
+    def __init__(self, path, debounce=SETTINGS_DEBOUNCE, on_error=None):
+        self.path = Path(path)
+        self.debounce = debounce
+        self.on_error = on_error  # called with a message when a background write fails
+        self.last_error = None
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()  # serializes writers; held without _lock
+        self._data = None
+        self._dirty = False
+        self._timer = None
+        self._sections = {}
+
+    def _load(self):
+        if self._data is not None:
+            return self._data
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                raise ValueError("settings file does not contain an object")
+        except FileNotFoundError:
+            data = {}
+        except (OSError, ValueError) as e:
+            # Keep the unreadable file for inspection instead of overwriting it silently
+            self.last_error = f"Could not read {self.path.name}: {e}"
+            try:
+                os.replace(self.path, self.path.with_name(self.path.name + '.corrupt'))
+            except OSError:
+                pass
+            data = {}
+        version = data.get("schema_version", 0)
+        while version < SETTINGS_SCHEMA_VERSION:
+            data = SETTINGS_MIGRATIONS[version](data)
+            version += 1
+        # Files from a newer version keep their number (and unknown keys) untouched
+        data["schema_version"] = max(version, SETTINGS_SCHEMA_VERSION)
+        self._data = data
+        return data
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._load().get(key, default)
+
+    def set(self, key, value):
+        self.update({key: value})
+
+    def update(self, values):
+        with self._lock:
+            data = self._load()
+            changed = {k: v for k, v in values.items() if data.get(k) != v}
+            if not changed:
+                return
+            data.update(changed)
+            self._dirty = True
+            self._schedule()
+
+    def section(self, name):
+        """Child store kept in ``<settings>.<name>.json``, loaded on first access."""
+        with self._lock:
+            store = self._sections.get(name)
+            if store is None:
+                path = self.path.with_name(f"{self.path.stem}.{name}{self.path.suffix}")
+                store = self._sections[name] = SettingsStore(path, self.debounce, self.on_error)
+            return store
+
+    def _schedule(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.debounce, self.flush)
+        self._timer.start()
+
+    def flush(self):
+        """Write pending changes now (this store and its sections); returns False on error."""
+        ok = True
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                text = json.dumps(self._data, indent=2) if self._dirty else None
+                self._dirty = False
+                sections = list(self._sections.values())
+            # The disk write happens outside _lock so set()/update() never wait on it
+            if text is not None:
+                try:
+                    write_text_atomic(self.path, text)
+                    self.last_error = None
+                except Exception as e:
+                    self.last_error = f"Could not save {self.path.name}: {e}"
+                    with self._lock:
+                        self._dirty = True
+                    ok = False
+                    if self.on_error is not None:
+                        self.on_error(self.last_error)
+        for store in sections:
+            ok = store.flush() and ok
+        return ok
+
+
+class SearchCache:
+    """LRU cache of search output keyed by (manager, normalized query).
+
+    Entries older than ``ttl`` seconds are treated as missing. The cache is
+    loaded from ``path`` on first use and written back after every change.
+    """
+
+    def __init__(self, path, ttl=6 * 3600, max_entries=200):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(query):
+        return " ".join(query.lower().split())
+
+    def _key(self, manager, query):
+        return f"{manager}\x00{self.normalize(query)}"
+
+    def get(self, manager, query):
+        """Return the cached output for a search, or None if missing or expired."""
+        key = self._key(manager, query)
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry["time"] > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry["output"]
+
+    def put(self, manager, query, output):
+        with self._lock:
+            self._load()
+            key = self._key(manager, query)
+            self._entries[key] = {"time": time.time(), "output": output}
+            self._entries.move_to_end(key)
+            self._evict()
+            self._save()
+
+    def get_prefix(self, manager, query):
+        """Return ``(cached_query, output)`` for the longest fresh cached query
+        that is a prefix of ``query``, or None.
+        """
+        normalized = self.normalize(query)
+        prefix = f"{manager}\x00"
+        best = None
+        with self._lock:
+            self._load()
+            now = time.time()
+            for key, entry in self._entries.items():
+                if not key.startswith(prefix) or now - entry["time"] > self.ttl:
+                    continue
+                cached = key[len(prefix):]
+                if cached and normalized.startswith(cached) and (best is None or len(cached) > len(best[0])):
+                    best = (cached, entry["output"])
+        return best
+
+    def invalidate(self, manager, query):
+        with self._lock:
+            self._load()
+            if self._entries.pop(self._key(manager, query), None) is not None:
+                self._save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._loaded = True
+            self._save()
+
+    def _evict(self):
+        now = time.time()
+        for key in [k for k, e in self._entries.items() if now - e["time"] > self.ttl]:
+            del self._entries[key]
+        while len(self._entries) > max(0, self.max_entries):
+            self._entries.popitem(last=False)
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for key, entry in data.get("entries", []):
+                self._entries[key] = entry
+            self._evict()
+        except Exception:
+            pass
+
+    def _save(self):
+        try:
+            write_json_atomic(self.path, {"entries": list(self._entries.items())})
+        except Exception:
+            pass
+
+
+# Commands that list installed packages, and the same for a single package ID
+INVENTORY_COMMANDS = {
+    'winget': ["winget", "list", "--accept-source-agreements"],
+    'chocolatey': ["choco", "list", "--limit-output"],
+}
+INVENTORY_PACKAGE_COMMANDS = {
+    'winget': lambda pkgid: ["winget", "list", "-e", "--id", pkgid, "--accept-source-agreements"],
+    'chocolatey': lambda pkgid: ["choco", "list", pkgid, "--exact", "--limit-output"],
+}
+
+# Fully re-list installed packages when the on-disk snapshot is older than this
+INVENTORY_MAX_AGE = 3600
+
+
+def parse_installed_output(manager, output):
+    """Parse `winget list` / `choco list --limit-output` into {id: {"version", "available"}}."""
+    installed = {}
+    if manager == 'chocolatey':
+        for line in output.splitlines():
+            parts = line.strip().split('|')
+            if len(parts) >= 2 and parts[0] and ' ' not in parts[0]:
+                installed[parts[0]] = {"version": parts[1], "available": ""}
+        return installed
+    parser = WingetTableParser()
+    for line in output.splitlines():
+        row = parser.feed_row(line)
+        if row is not None:
+            installed[row['id']] = {"version": row.get('version', ''), "available": row.get('available', '')}
+    return installed
+
+
+class InstalledInventory:
+    """Snapshot of installed packages per manager (ID -> version), cached on disk.
+
+    IDs are compared case-insensitively. ``refresh()`` re-lists everything;
+    ``refresh_packages()`` re-checks only the given IDs after an install.
+    """
+
+    def __init__(self, path, max_age=INVENTORY_MAX_AGE, command_log=None):
+        self.path = Path(path)
+        self.max_age = max_age
+        self.command_log = command_log
+        self._lock = threading.Lock()
+        self._snapshots = {}  # manager -> {"time": t, "packages": {id_lower: {"id", "version", "available"}}}
+        self._loaded = False
+
+    def load(self):
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._snapshots = json.load(f)
+            except Exception:
+                self._snapshots = {}
+
+    def is_stale(self, manager):
+        self.load()
+        with self._lock:
+            snapshot = self._snapshots.get(manager)
+            return snapshot is None or time.time() - snapshot.get("time", 0) > self.max_age
+
+    def get(self, manager, pkgid):
+        """Return ``{"id", "version", "available"}`` for an installed package, or None."""
+        self.load()
+        with self._lock:
+            return self._snapshots.get(manager, {}).get("packages", {}).get(pkgid.lower())
+
+    def is_installed(self, manager, pkgid):
+        return self.get(manager, pkgid) is not None
+
+    def snapshot(self, manager):
+        """Return ``{id: {"id", "version", "available"}}`` for one manager."""
+        self.load()
+        with self._lock:
+            packages = self._snapshots.get(manager, {}).get("packages", {})
+            return {info.get("id", key): dict(info) for key, info in packages.items()}
+
+    def refresh(self, manager, timeout=120):
+        result = run_command(
+            self.command_log, 'list',
+            INVENTORY_COMMANDS[manager],
+            capture_output=True,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            timeout=timeout
+        )
+        installed = parse_installed_output(manager, result.stdout)
+        if result.returncode != 0 and not installed:
+            raise RuntimeError(f"{manager} list failed with exit code {result.returncode}")
+        self.load()
+        with self._lock:
+            self._snapshots[manager] = {
+                "time": time.time(),
+                "packages": {pkgid.lower(): dict(info, id=pkgid) for pkgid, info in installed.items()},
+            }
+            self._save()
+
+    def set_versions(self, manager, versions):
+        """Record new installed versions (``{id: version}``) without re-listing, e.g. after upgrades."""
+        self.load()
+        with self._lock:
+            packages = self._snapshots.setdefault(manager, {"time": time.time(), "packages": {}})["packages"]
+            for pkgid, version in versions.items():
+                packages[pkgid.lower()] = {"id": pkgid, "version": version, "available": ""}
+            self._save()
+
+    def set_available(self, manager, available):
+        """Fill in available versions (``{id: version}``) for installed packages."""
+        self.load()
+        with self._lock:
+            packages = self._snapshots.get(manager, {}).get("packages", {})
+            for info in packages.values():
+                info["available"] = available.get(info.get("id", ''), available.get(info.get("id", '').lower(), ""))
+            self._save()
+
+    def refresh_packages(self, manager, package_ids, timeout=60):
+        """Re-check only ``package_ids`` (e.g. after installing them)."""
+        self.load()
+        for pkgid in package_ids:
+            result = run_command(
+                self.command_log, 'list-package',
+                INVENTORY_PACKAGE_COMMANDS[manager](pkgid),
+                capture_output=True,
+                text=True,
+                encoding='utf-8',
+                errors='replace',
+                timeout=timeout
+            )
+            found = {k.lower(): dict(v, id=k) for k, v in parse_installed_output(manager, result.stdout).items()}
+            with self._lock:
+                packages = self._snapshots.setdefault(manager, {"time": time.time(), "packages": {}})["packages"]
+                if pkgid.lower() in found:
+                    packages[pkgid.lower()] = found[pkgid.lower()]
+                else:
+                    packages.pop(pkgid.lower(), None)
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        try:
+            write_json_atomic(self.path, self._snapshots)
+        except Exception:
+            pass
+
+
+# Commands listing installed packages that have a newer version available
+OUTDATED_COMMANDS = {
+    'winget': ["winget", "upgrade", "--accept-source-agreements"],
+    'chocolatey': ["choco", "outdated", "--limit-output"],
+}
+
+# Re-check for upgrades when the cached version map is older than this
+UPGRADE_MAX_AGE = 3600
+
+UpgradeItem = namedtuple('UpgradeItem', 'manager id version available')
+
+
+def parse_outdated_output(manager, output):
+    """Parse `winget upgrade` / `choco outdated --limit-output` into {id: {"version", "available", "pinned"}}."""
+    outdated = {}
+    if manager == 'chocolatey':
+        for line in output.splitlines():
+            parts = line.strip().split('|')  # id|current|available|pinned
+            if len(parts) >= 3 and parts[0] and ' ' not in parts[0]:
+                pinned = len(parts) > 3 and parts[3].strip().lower() == 'true'
+                outdated[parts[0]] = {"version": parts[1], "available": parts[2], "pinned": pinned}
+        return outdated
+    parser = WingetTableParser()
+    for line in output.splitlines():
+        row = parser.feed_row(line)
+        if row is not None and row.get('available') and ' ' not in row['id']:
+            outdated[row['id']] = {"version": row.get('version', ''), "available": row['available'], "pinned": False}
+    return outdated
+
+
+def version_key(version):
+    """Sort key for version strings: numeric parts compare as numbers ('1.10' > '1.9')."""
+    parts = re.findall(r'\d+|[A-Za-z]+', version or '')
+    return [(0, int(p), '') if p.isdigit() else (-1, 0, p.lower()) for p in parts]
+
+
+class UpgradePlanner:
+    """Installed vs available versions per manager, cached on disk.
+
+    ``refresh()`` costs one `winget upgrade` / `choco outdated` call per
+    manager; ``plan()`` then works from the cached version map and returns
+    only packages whose available version is really newer and not pinned.
+    Successful upgrades are folded back in with ``mark_upgraded()`` instead
+    of re-listing.
+    """
+
+    def __init__(self, path, max_age=UPGRADE_MAX_AGE, command_log=None):
+        self.path = Path(path)
+        self.max_age = max_age
+        self.command_log = command_log
+        self._lock = threading.Lock()
+        self._maps = None  # manager -> {"time": t, "packages": {id_lower: {"id", "version", "available", "pinned"}}}
+
+    def _load(self):
+        if self._maps is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._maps = json.load(f)
+            except Exception:
+                self._maps = {}
+        return self._maps
+
+    def is_stale(self, manager):
+        with self._lock:
+            snapshot = self._load().get(manager)
+            return snapshot is None or time.time() - snapshot.get("time", 0) > self.max_age
+
+    def checked(self, manager):
+        """When ``manager`` was last checked (epoch seconds), or None."""
+        with self._lock:
+            return self._load().get(manager, {}).get("time")
+
+    def refresh(self, manager, timeout=180):
+        result = run_command(self.command_log, 'outdated', OUTDATED_COMMANDS[manager], capture_output=True,
+                             text=True, encoding='utf-8', errors='replace', timeout=timeout)
+        outdated = parse_outdated_output(manager, result.stdout)
+        # `winget upgrade` exits non-zero when nothing is upgradable; only a failure with no table is an error
+        if result.returncode != 0 and not outdated and manager == 'chocolatey':
+            raise RuntimeError(f"choco outdated failed with exit code {result.returncode}")
+        with self._lock:
+            self._load()[manager] = {
+                "time": time.time(),
+                "packages": {pkgid.lower(): dict(info, id=pkgid) for pkgid, info in outdated.items()},
+            }
+            self._save()
+        return outdated
+
+    def plan(self, managers=None, include_pinned=False):
+        """Upgrades still needed, as UpgradeItems sorted by manager and ID."""
+        items = []
+        with self._lock:
+            for manager, snapshot in self._load().items():
+                if managers is not None and manager not in managers:
+                    continue
+                for info in snapshot.get("packages", {}).values():
+                    if info.get("pinned") and not include_pinned:
+                        continue
+                    if version_key(info.get("available")) > version_key(info.get("version")):
+                        items.append(UpgradeItem(manager, info["id"], info.get("version", ''), info["available"]))
+        return sorted(items, key=lambda i: (i.manager, i.id.lower()))
+
+    def mark_upgraded(self, manager, package_ids):
+        with self._lock:
+            packages = self._load().get(manager, {}).get("packages", {})
+            for pkgid in package_ids:
+                packages.pop(pkgid.lower(), None)
+            self._save()
+
+    def _save(self):
+        try:
+            write_json_atomic(self.path, self._maps)
+        except Exception:
+            pass
+
+
+# Commands that list a manager's whole catalog, used to build the local index
+CATALOG_COMMANDS = {
+    'winget': ["winget", "search", "--query", "", "--source", "winget", "--accept-source-agreements"],
+    'chocolatey': ["choco", "search", "--limit-output"],
+}
+
+# Rebuild the local package index when it is older than this
+INDEX_REFRESH_HOURS = 24
+
+
+class PackageIndex:
+    """Local full-text index of package catalogs stored in SQLite.
+
+    Uses an FTS5 table when the SQLite build supports it and falls back to
+    LIKE queries otherwise. Refreshes are incremental: only packages that were
+    added, changed or removed since the last listing touch the database.
+    """
+
+    def __init__(self, path, command_log=None):
+        self.path = Path(path)
+        self.command_log = command_log
+        self._lock = threading.Lock()
+        self._conn = None
+        self._fts = False
+        self._words = None  # lazily built word -> rows map for fuzzy matching
+        self._bigrams = None
+
+    def _connect(self):
+        if self._conn is not None:
+            return self._conn
+        import sqlite3  # deferred: only needed once the index is used, not at startup
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        try:
+            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS packages USING fts5("
+                         "id, name, manager UNINDEXED, version UNINDEXED, source UNINDEXED, "
+                         "tokenize = \"unicode61 tokenchars '-_'\")")
+            self._fts = True
+        except sqlite3.OperationalError:
+            conn.execute("CREATE TABLE IF NOT EXISTS packages (id TEXT, name TEXT, manager TEXT, version TEXT, source TEXT)")
+            conn.execute("CREATE INDEX IF NOT EXISTS packages_manager_id ON packages (manager, id)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (manager TEXT PRIMARY KEY, refreshed REAL)")
+        conn.commit()
+        self._conn = conn
+        return conn
+
+    def refreshed_at(self, manager):
+        with self._lock:
+            row = self._connect().execute("SELECT refreshed FROM meta WHERE manager = ?", (manager,)).fetchone()
+        return row[0] if row else None
+
+    def is_stale(self, manager, max_age_hours=INDEX_REFRESH_HOURS):
+        refreshed = self.refreshed_at(manager)
+        return refreshed is None or time.time() - refreshed > max_age_hours * 3600
+
+    def count(self, manager=None):
+        with self._lock:
+            conn = self._connect()
+            if manager is None:
+                return conn.execute("SELECT COUNT(*) FROM packages").fetchone()[0]
+            return conn.execute("SELECT COUNT(*) FROM packages WHERE manager = ?", (manager,)).fetchone()[0]
+
+    def update(self, manager, records):
+        """Replace the catalog for ``manager``, writing only the rows that changed.
+
+        Returns ``(added_or_changed, removed)`` counts.
+        """
+        incoming = {}
+        for r in records:
+            incoming[r.id] = r
+        with self._lock:
+            conn = self._connect()
+            existing = {row[0]: tuple(row[1:]) for row in conn.execute(
+                "SELECT id, name, version, source FROM packages WHERE manager = ?", (manager,))}
+            changed = [r for r in incoming.values() if existing.get(r.id) != (r.name, r.version, r.source)]
+            removed = [pkgid for pkgid in existing if pkgid not in incoming]
+            stale = [r.id for r in changed if r.id in existing] + removed
+            with conn:
+                conn.executemany("DELETE FROM packages WHERE manager = ? AND id = ?", [(manager, pkgid) for pkgid in stale])
+                conn.executemany("INSERT INTO packages (id, name, manager, version, source) VALUES (?, ?, ?, ?, ?)",
+                                 [(r.id, r.name, manager, r.version, r.source) for r in changed])
+                conn.execute("INSERT OR REPLACE INTO meta (manager, refreshed) VALUES (?, ?)", (manager, time.time()))
+            if changed or removed:
+                self._words = None
+        return len(changed), len(removed)
+
+    def refresh(self, manager, timeout=600):
+        """List the manager's whole catalog and merge it into the index."""
+        result = run_command(
+            self.command_log, 'catalog',
+            CATALOG_COMMANDS[manager],
+            capture_output=True,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            timeout=timeout
+        )
+        records = parse_search_output(manager, result.stdout)
+        if not records:
+            # Keep the previous index rather than wiping it on a failed listing
+            raise RuntimeError(f"{manager} catalog listing returned no packages (exit code {result.returncode})")
+        return self.update(manager, records)
+
+    def search(self, query, manager=None, limit=500):
+        """Return PackageRecords matching ``query``, best matches first.
+
+        Every word is matched as a prefix of a name or id token. When nothing
+        matches, close (typo-tolerant) name matches are returned instead.
+        """
+        words = [w for w in re.split(r'[^\w.\-]+', query.lower()) if w]
+        if not words:
+            return []
+        with self._lock:
+            conn = self._connect()
+            where, params = [], []
+            if self._fts:
+                where.append("packages MATCH ?")
+                params.append(" AND ".join('"' + w.replace('"', '""') + '"*' for w in words))
+            else:
+                for w in words:
+                    where.append("(lower(name) LIKE ? OR lower(id) LIKE ?)")
+                    params += [f"%{w}%", f"%{w}%"]
+            if manager is not None:
+                where.append("manager = ?")
+                params.append(manager)
+            order = "ORDER BY rank" if self._fts else ""
+            rows = conn.execute(
+                f"SELECT name, id, version, source FROM packages WHERE {' AND '.join(where)} {order} LIMIT ?",
+                params + [limit * 4]).fetchall()
+        records = [PackageRecord(name, pkgid, version, '', source) for name, pkgid, version, source in rows]
+        if not records:
+            return self._fuzzy(words, manager, limit)
+        needle = " ".join(words)
+
+        def score(r):
+            name, pkgid = r.name.lower(), r.id.lower()
+            return (pkgid != needle and name != needle, not (name.startswith(needle) or pkgid.startswith(needle)), len(name))
+
+        records.sort(key=score)
+        return records[:limit]
+
+    def _fuzzy(self, words, manager, limit, cutoff=0.75):
+        """Typo-tolerant lookup: every query word must closely match a name/id word.
+
+        Candidate words are those sharing most of the query word's character
+        bigrams, so only a handful are scored with difflib.
+        """
+        with self._lock:
+            if self._words is None:
+                self._build_fuzzy_index()
+        combined = None
+        for needle in words:
+            scored = self._fuzzy_word(needle, manager, cutoff)
+            if combined is None:
+                combined = scored
+            else:
+                combined = {pkgid: (combined[pkgid][0] + ratio, row) for pkgid, (ratio, row) in scored.items() if pkgid in combined}
+            if not combined:
+                return []
+        best = sorted(combined.values(), key=lambda item: -item[0])[:limit]
+        return [PackageRecord(row[0], row[1], row[2], 'Fuzzy', row[3]) for _, row in best]
+
+    def _fuzzy_word(self, needle, manager, cutoff):
+        grams = {needle[i:i + 2] for i in range(len(needle) - 1)}
+        shared = {}
+        for gram in grams:
+            for word in self._bigrams.get(gram, ()):
+                shared[word] = shared.get(word, 0) + 1
+        needed = max(1, len(grams) - 2)
+        import difflib  # deferred: only needed for typo-tolerant lookups
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(needle)
+        scored = {}
+        for word, count in shared.items():
+            if count < needed:
+                continue
+            matcher.set_seq1(word)
+            ratio = matcher.ratio()
+            if ratio < cutoff:
+                continue
+            for row in self._words[word]:
+                if (manager is None or row[4] == manager) and ratio > scored.get(row[1], (0, None))[0]:
+                    scored[row[1]] = (ratio, row)
+        return scored
+
+    def warm(self):
+        """Build the in-memory fuzzy lookup tables ahead of the first typo."""
+        with self._lock:
+            if self._words is None:
+                self._build_fuzzy_index()
+
+    def _build_fuzzy_index(self):
+        words, bigrams = {}, {}
+        for row in self._connect().execute("SELECT name, id, version, source, manager FROM packages"):
+            for word in set(re.split(r'[^\w]+', f"{row[0]} {row[1]}".lower())):
+                if len(word) > 2:
+                    words.setdefault(word, []).append(row)
+        for word in words:
+            for i in range(len(word) - 1):
+                bigrams.setdefault(word[i:i + 2], set()).add(word)
+        self._words, self._bigrams = words, bigrams
+
+
+# Seconds before an install child process is killed
+INSTALL_TIMEOUT = 300
+
+
+def upgrade_command(manager, package):
+    if manager == 'chocolatey':
+        return ["choco", "upgrade", package, "-y"]
+    return ["winget", "upgrade", "-e", "--id", package, "--accept-package-agreements", "--accept-source-agreements"]
+
+
+def install_command(manager, package, version=None):
+    if manager == 'chocolatey':
+        command = ["choco", "install", package, "-y"]
+    else:
+        command = ["winget", "install", "-e", "--id", package, "--accept-package-agreements", "--accept-source-agreements"]
+    if version:
+        command += ["--version", str(version)]
+    return command
+
+
+# Executable checked when a profile entry lists several managers in order of preference
+MANAGER_EXECUTABLES = {'winget': 'winget', 'chocolatey': 'choco'}
+
+# Outcomes of profile entries that never ran an install
+PROFILE_ALREADY_INSTALLED = 'already installed'
+PROFILE_SKIPPED = 'skipped'
+
+ProfileEntry = namedtuple('ProfileEntry', 'id managers version depends_on')
+
+
+class Profile:
+    """Declarative provisioning profile: packages plus their install-order dependencies.
+
+    JSON form::
+
+        {"name": "dev", "manager": "winget",
+         "packages": ["Git.Git",
+                      {"id": "GitHub.GitHubDesktop", "depends_on": ["Git.Git"]},
+                      {"id": "python", "manager": ["chocolatey", "winget"], "version": "3.12.1"}]}
+
+    ``manager`` (per entry or profile-wide) is one manager or a preference
+    list; ``version`` pins the install. Dependencies name other entries' IDs.
+    """
+
+    def __init__(self, entries, name=None):
+        self.name = name
+        self.entries = OrderedDict()
+        for entry in entries:
+            if entry.id in self.entries:
+                raise ValueError(f"Duplicate package in profile: {entry.id}")
+            self.entries[entry.id] = entry
+        for entry in self.entries.values():
+            for dep in entry.depends_on:
+                if dep not in self.entries:
+                    raise ValueError(f"{entry.id} depends on {dep}, which is not in the profile")
+        self.order = self._topological_order()
+
+    @classmethod
+    def from_dict(cls, data, default_manager='winget'):
+        if isinstance(data, list):
+            data = {"packages": data}
+        default = data.get("manager", default_manager)
+        entries = []
+        for item in data.get("packages", []):
+            if isinstance(item, str):
+                item = {"id": item}
+            managers = item.get("manager", default)
+            if isinstance(managers, str):
+                managers = [managers]
+            depends_on = item.get("depends_on", [])
+            if isinstance(depends_on, str):
+                depends_on = [depends_on]
+            entries.append(ProfileEntry(item["id"], tuple(managers), item.get("version"), tuple(depends_on)))
+        return cls(entries, data.get("name"))
+
+    @classmethod
+    def load(cls, path, default_manager='winget'):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f), default_manager)
+
+    @classmethod
+    def from_category(cls, apps, manager):
+        """Profile for a catalog category (CatalogApps), ordered by their ``depends_on``."""
+        ids = {app.id for app in apps}
+        return cls([ProfileEntry(app.id, (app.manager or manager,), None,
+                                 tuple(d for d in app.depends_on if d in ids))
+                    for app in apps])
+
+    def dependents(self):
+        result = {pkgid: [] for pkgid in self.entries}
+        for entry in self.entries.values():
+            for dep in entry.depends_on:
+                result[dep].append(entry.id)
+        return result
+
+    def _topological_order(self):
+        """Kahn's algorithm in file order; raises ValueError on a cycle."""
+        remaining = {pkgid: len(entry.depends_on) for pkgid, entry in self.entries.items()}
+        dependents = self.dependents()
+        ready = [pkgid for pkgid, n in remaining.items() if n == 0]
+        order = []
+        while ready:
+            pkgid = ready.pop(0)
+            order.append(pkgid)
+            for child in dependents[pkgid]:
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    ready.append(child)
+        if len(order) != len(self.entries):
+            cycle = sorted(pkgid for pkgid in self.entries if pkgid not in order)
+            raise ValueError(f"Dependency cycle between: {', '.join(cycle)}")
+        return order
+
+    def critical_path(self):
+        """Number of packages on the longest dependency chain starting at each entry."""
+        dependents = self.dependents()
+        depth = {}
+        for pkgid in reversed(self.order):
+            depth[pkgid] = 1 + max((depth[child] for child in dependents[pkgid]), default=0)
+        return depth
+
+
+def resolve_manager(managers):
+    """First manager in the preference list whose executable is on PATH."""
+    for manager in managers:
+        if shutil.which(MANAGER_EXECUTABLES.get(manager, manager)):
+            return manager
+    return managers[0] if managers else 'winget'
+
+
+class ProfileExecutor:
+    """Install a Profile in dependency order, running independent branches in parallel.
+
+    Every entry whose dependencies are satisfied is submitted to the engine's
+    scheduler at once, so parallelism is bounded only by the per-manager
+    concurrency limits; entries on longer dependency chains get higher
+    priority. Dependents of a failed or cancelled install are skipped.
+    ``on_update(package_id, outcome)`` is called from worker threads.
+    """
+
+    def __init__(self, engine, profile, skip_installed=True, on_update=None, batch_id=None):
+        self.engine = engine
+        self.profile = profile
+        self.batch_id = batch_id  # JobJournal batch
+        self.skip_installed = skip_installed
+        self.on_update = on_update
+        self.outcomes = OrderedDict()  # package ID -> job state, PROFILE_ALREADY_INSTALLED or PROFILE_SKIPPED
+        self.reasons = {}  # skipped package ID -> the failed dependency
+        self.managers = {}
+        self._dependents = profile.dependents()
+        self._waiting = {pkgid: len(entry.depends_on) for pkgid, entry in profile.entries.items()}
+        self._priority = {pkgid: PRIORITY_NORMAL - min(depth, PRIORITY_NORMAL)
+                          for pkgid, depth in profile.critical_path().items()}
+        self._jobs = {}  # job ID -> package ID
+        self._lock = threading.RLock()
+        self._done = threading.Event()
+        self.started = None
+        self.finished = None
+
+    def start(self):
+        self.started = time.time()
+        self.engine.add_job_listener(self._on_job_change)
+        with self._lock:
+            if not self.profile.entries:
+                self._check_done()
+            ready = [pkgid for pkgid in self.profile.order if self._waiting[pkgid] == 0]
+        self._submit_all(ready)
+        return self
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    @property
+    def failed(self):
+        return [p for p, outcome in self.outcomes.items() if outcome in (JOB_FAILED, JOB_CANCELLED, PROFILE_SKIPPED)]
+
+    def _submit_all(self, ready):
+        # Never called under self._lock: submitting notifies every job listener, this one included
+        while ready:
+            ready.extend(self._submit(ready.pop(0)))
+
+    def _submit(self, pkgid):
+        """Install one entry; returns the dependents that became ready (when it is already installed)."""
+        entry = self.profile.entries[pkgid]
+        manager = resolve_manager(entry.managers)
+        with self._lock:
+            self.managers[pkgid] = manager
+            if self.skip_installed:
+                info = self.engine.inventory.get(manager, pkgid)
+                if info is not None and (not entry.version or info.get("version") == str(entry.version)):
+                    return self._finish(pkgid, PROFILE_ALREADY_INSTALLED)
+        job = self.engine.submit_install(pkgid, manager, self._priority[pkgid], entry.version, self.batch_id)
+        with self._lock:
+            self._jobs[job.id] = pkgid
+            if job.state not in JOB_FINISHED_STATES or pkgid in self.outcomes:
+                return []
+            # Finished before it was registered here, so _on_job_change ignored it
+            return self._finish(pkgid, job.package_state(pkgid))
+
+    def _on_job_change(self, job):
+        with self._lock:
+            pkgid = self._jobs.get(job.id)
+            if pkgid is None or job.state not in JOB_FINISHED_STATES or pkgid in self.outcomes:
+                return
+            ready = self._finish(pkgid, job.package_state(pkgid))
+        self._submit_all(ready)
+
+    def _finish(self, pkgid, outcome):
+        """Record an outcome (under self._lock); returns the dependents now ready to submit."""
+        ready = []
+        self._set_outcome(pkgid, outcome)
+        if outcome in (JOB_SUCCEEDED, PROFILE_ALREADY_INSTALLED):
+            for child in self._dependents[pkgid]:
+                self._waiting[child] -= 1
+                if self._waiting[child] == 0 and child not in self.outcomes:
+                    ready.append(child)
+        else:
+            self._skip_dependents(pkgid)
+        self._check_done()
+        return ready
+
+    def _skip_dependents(self, pkgid):
+        pending = list(self._dependents[pkgid])
+        while pending:
+            child = pending.pop()
+            if child in self.outcomes:
+                continue
+            self.reasons[child] = pkgid
+            self._set_outcome(child, PROFILE_SKIPPED)
+            pending.extend(self._dependents[child])
+
+    def _set_outcome(self, pkgid, outcome):
+        self.outcomes[pkgid] = outcome
+        if self.batch_id is not None and outcome in (PROFILE_ALREADY_INSTALLED, PROFILE_SKIPPED):
+            # Outcomes without a job; job results are journaled by the engine
+            self.engine.journal.package(self.batch_id, pkgid, 'finished', outcome)
+        if self.on_update is not None:
+            try:
+                self.on_update(pkgid, outcome)
+            except Exception:
+                pass
+
+    def _check_done(self):
+        if len(self.outcomes) == len(self.profile.entries) and not self._done.is_set():
+            self.finished = time.time()
+            self.engine.remove_job_listener(self._on_job_change)
+            self._done.set()
+
+
+# Default size limit of the installer cache
+ARTIFACT_CACHE_MB = 4096
+
+
+def _hash_file(path):
+    """``(sha256 hex digest, size)`` of a file."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+class ArtifactCache:
+    """Content-addressed store of downloaded installers and packages.
+
+    Each file is stored once as ``objects/<sha256[:2]>/<sha256>``; ``index.json``
+    maps ``manager:package`` to the files its download produced (relative
+    name, hash, size), the package version and when the entry was last
+    used. ``restore`` checks every hash before handing files out, and drops
+    the entry when the caller knows of a different version; ``store``
+    evicts the least recently used entries beyond ``max_bytes``. ``root`` may be a shared
+    folder: blobs never change once written and the index is re-read and
+    replaced atomically on every update, so a lost race only costs a
+    re-download.
+    """
+
+    def __init__(self, root, max_bytes=ARTIFACT_CACHE_MB * 1024 * 1024, command_log=None):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.command_log = command_log
+        # Opt-in: cached installs run the installer directly rather than through
+        # winget/choco, which loses their elevation and exit-code handling
+        self.enabled = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(manager, package):
+        return f"{manager}:{package.lower()}"
+
+    def _blob(self, digest):
+        return self.root / 'objects' / digest[:2] / digest
+
+    def _load(self):
+        try:
+            with open(self.root / 'index.json', "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data.get("entries", {}) if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, entries):
+        write_json_atomic(self.root / 'index.json', {"entries": entries}, indent=1)
+
+    def has(self, manager, package, version=None):
+        entry = self._load().get(self.key(manager, package))
+        return entry is not None and (version is None or entry.get("version") == version)
+
+    def store(self, manager, package, directory, version=None):
+        """Add every file under ``directory`` as the cached download of ``package`` (at ``version``)."""
+        directory = Path(directory)
+        files = []
+        for path in sorted(directory.rglob('*')):
+            if not path.is_file():
+                continue
+            digest, size = _hash_file(path)
+            blob = self._blob(digest)
+            if not blob.exists():
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                tmp = blob.with_name(f"{digest}.{os.getpid()}.{threading.get_ident()}.tmp")
+                shutil.copy2(path, tmp)  # keeps the executable bit on POSIX
+                os.replace(tmp, blob)
+            files.append({"name": path.relative_to(directory).as_posix(), "sha256": digest, "size": size})
+        if not files:
+            return False
+        with self._lock:
+            entries = self._load()
+            now = time.time()
+            entries[self.key(manager, package)] = {"files": files, "version": version, "stored": now, "used": now}
+            self._evict(entries)
+            self._save(entries)
+        return True
+
+    def restore(self, manager, package, directory, version=None):
+        """Copy the cached download of ``package`` into ``directory``; False on a miss or bad hash.
+
+        ``version`` is the latest version when it could be looked up; an
+        entry for any other version is stale and dropped.
+        """
+        key = self.key(manager, package)
+        started = time.perf_counter()
+        entry = self._load().get(key)
+        status, size = 'miss', 0
+        try:
+            if entry is None:
+                return False
+            if version is not None and entry.get("version") != version:
+                status = 'stale'
+                self._update(key, None)
+                return False
+            directory = Path(directory)
+            for item in entry["files"]:
+                target = directory / item["name"]
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(self._blob(item["sha256"]), target)
+                # Check the copy, since that is what gets installed
+                if _hash_file(target)[0] != item["sha256"]:
+                    raise ValueError(f"hash mismatch: {item['name']}")
+                size += item["size"]
+            status = 'ok'
+            self._update(key, lambda e: e.update(used=time.time()))
+            return True
+        except (OSError, ValueError, KeyError, TypeError):
+            status = 'failed'
+            self._update(key, None)  # corrupt or incomplete: forget it, the next install re-downloads
+            shutil.rmtree(directory, ignore_errors=True)
+            Path(directory).mkdir(parents=True, exist_ok=True)
+            return False
+        finally:
+            if self.command_log is not None:
+                self.command_log.record('cache', ['restore', key], time.perf_counter() - started, None, size,
+                                        status, manager=manager)
+
+    def _update(self, key, change):
+        """Apply ``change`` to one index entry, or remove it when ``change`` is None."""
+        with self._lock:
+            entries = self._load()
+            if key not in entries:
+                return
+            if change is None:
+                del entries[key]
+            else:
+                change(entries[key])
+            try:
+                self._save(entries)
+            except OSError:
+                pass  # read-only share: serving from it still works
+
+    def _evict(self, entries):
+        def total():
+            sizes = {f["sha256"]: f["size"] for e in entries.values() for f in e.get("files", [])}
+            return sum(sizes.values())
+        while len(entries) > 1 and total() > self.max_bytes:
+            del entries[min(entries, key=lambda k: entries[k].get("used", 0))]
+        referenced = {f["sha256"] for e in entries.values() for f in e.get("files", [])}
+        for blob in (self.root / 'objects').glob('*/*'):
+            if blob.name not in referenced and not blob.name.endswith('.tmp'):
+                try:
+                    blob.unlink()
+                except OSError:
+                    pass
+
+    def discard(self, manager, package):
+        """Forget a package's cached download (e.g. once a newer version is out)."""
+        self._update(self.key(manager, package), None)
+
+    def stats(self):
+        entries = self._load()
+        sizes = {f["sha256"]: f["size"] for e in entries.values() for f in e.get("files", [])}
+        return {"path": str(self.root), "entries": len(entries), "bytes": sum(sizes.values()),
+                "max_bytes": self.max_bytes, "enabled": self.enabled}
+
+    def clear(self):
+        with self._lock:
+            shutil.rmtree(self.root / 'objects', ignore_errors=True)
+            try:
+                os.remove(self.root / 'index.json')
+            except OSError:
+                pass
+
+
+# Packages downloaded ahead of the (one at a time) install stage in pipelined mode
+DOWNLOAD_WORKERS = 3
+DOWNLOAD_TIMEOUT = 600
+# Per-package states reported while a pipelined job runs
+PACKAGE_DOWNLOADING = 'downloading'
+PACKAGE_DOWNLOADED = 'downloaded'
+# Chocolatey community feed; nupkgs are fetched from it when `choco download` (licensed) is unavailable
+CHOCO_FEED = 'https://community.chocolatey.org/api/v2/'
+# Silent switches used when a winget manifest does not list any
+DEFAULT_SILENT_SWITCHES = {
+    'inno': '/VERYSILENT /SUPPRESSMSGBOXES /NORESTART /SP-',
+    'nullsoft': '/S',
+    'burn': '/quiet /norestart',
+}
+
+
+def download_command(manager, package, directory):
+    if manager == 'chocolatey':
+        # --internalize also pulls the installers the package script would download
+        return ["choco", "download", package, "--internalize", "--outputdirectory", str(directory), "--no-progress", "-y"]
+    return ["winget", "download", "--id", package, "-e", "--download-directory", str(directory),
+            "--accept-package-agreements", "--accept-source-agreements"]
+
+
+def read_winget_download(directory):
+    """Installer path, type and switches from a `winget download` directory, or None.
+
+    Only the flat ``Key: value`` lines of the downloaded manifest are read.
+    """
+    directory = Path(directory)
+    manifests = sorted(directory.glob('*.yaml'))
+    installers = [p for p in directory.iterdir() if p.is_file() and p.suffix.lower() not in ('.yaml', '.yml')]
+    if not manifests or len(installers) != 1:
+        return None
+    info = {"installer": installers[0]}
+    with open(manifests[0], "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            m = re.match(r'^\s*-?\s*(PackageVersion|InstallerType|Silent|Custom)\s*:\s*(.*?)\s*$', line)
+            if m and m.group(1) not in info:
+                info[m.group(1)] = m.group(2).strip('\'"')
+    return info
+
+
+def artifact_version(manager, package, artifact):
+    """Version of ``package`` in a downloaded artifact directory, or None if it cannot be told."""
+    if manager == 'chocolatey':
+        prefix = package.lower() + '.'
+        for path in Path(artifact).rglob('*.nupkg'):
+            name = path.name.lower()
+            if name.startswith(prefix):
+                return name[len(prefix):-len('.nupkg')]
+        return None
+    info = read_winget_download(artifact)
+    return info.get("PackageVersion") if info else None
+
+
+def latest_version_command(manager, package):
+    if manager == 'chocolatey':
+        return ["choco", "search", package, "--exact", "--limit-output"]
+    return ["winget", "show", "-e", "--id", package, "--accept-source-agreements"]
+
+
+def parse_latest_version(manager, package, output):
+    """Version from `choco search --exact` / `winget show` output, or None."""
+    for line in output.splitlines():
+        if manager == 'chocolatey':
+            parts = line.strip().split('|')
+            if len(parts) >= 2 and parts[0].lower() == package.lower():
+                return parts[1]
+        else:
+            m = re.match(r'^Version:\s*(\S+)', line.strip())
+            if m:
+                return m.group(1)
+    return None
+
+
+def local_install_command(manager, package, artifact):
+    """Command installing ``package`` from a downloaded artifact directory, or None if unsupported."""
+    if manager == 'chocolatey':
+        # Local source only: with the community feed added, anything missing would quietly be
+        # downloaded. A failure here falls back to a normal install.
+        return ["choco", "install", package, "-y", "--source", str(artifact)]
+    info = read_winget_download(artifact)
+    if info is None:
+        return None
+    installer = str(info["installer"])
+    kind = info.get("InstallerType", "").lower()
+    custom = info.get("Custom", "").split()
+    if kind in ('msi', 'wix'):
+        return ["msiexec", "/i", installer, "/qn", "/norestart", *custom]
+    if kind in ('msix', 'appx'):
+        return ["powershell", "-NoProfile", "-Command", f"Add-AppxPackage -Path '{installer}'"]
+    switches = info.get("Silent") or DEFAULT_SILENT_SWITCHES.get(kind)
+    if kind in ('exe', 'inno', 'nullsoft', 'burn') and switches:
+        return [installer, *switches.split(), *custom]
+    return None  # zip/portable or no known silent switches: let winget install it
+
+
+class DownloadPipeline:
+    """Install one job's packages with downloads overlapped with installation.
+
+    Up to ``workers`` downloads run in parallel and feed a single install
+    stage, which installs each package as soon as it is downloaded (and its
+    ``depends_on`` within the job are done), so a batch takes roughly
+    max(downloads, installs) instead of their sum. A package whose download
+    fails or cannot be installed from the local artifact gets a normal
+    install instead. Per-package progress is published in ``job.results``.
+    """
+
+    def __init__(self, engine, job, workers=DOWNLOAD_WORKERS, depends_on=None):
+        self.engine = engine
+        self.job = job
+        self.workers = max(1, workers)
+        self.depends_on = depends_on or {}
+        self.timings = {}  # package -> {"download": s, "install": s}
+        self._ready = queue.Queue()
+
+    def run(self):
+        packages = self.job.packages
+        self.engine.download_dir.mkdir(parents=True, exist_ok=True)
+        directory = Path(tempfile.mkdtemp(prefix=f'job{self.job.id}-', dir=self.engine.download_dir))
+        pending = queue.Queue()
+        for pkgid in packages:
+            pending.put(pkgid)
+            self.job.results[pkgid] = JOB_QUEUED
+        log = current_job_log()  # download threads write to this job's log too
+        for _ in range(min(self.workers, len(packages))):
+            threading.Thread(target=self._download_worker, args=(pending, directory, log), daemon=True).start()
+        try:
+            return self._install_stage(packages)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def _download_worker(self, pending, directory, log):
+        with job_log_context(log):
+            self._download_loop(pending, directory)
+
+    def _download_loop(self, pending, directory):
+        while True:
+            try:
+                pkgid = pending.get_nowait()
+            except queue.Empty:
+                return
+            self._set(pkgid, PACKAGE_DOWNLOADING)
+            started = time.perf_counter()
+            target = directory / re.sub(r'[^\w.\-]+', '_', pkgid)
+            try:
+                artifact = self.engine.fetch_package(pkgid, self.job.manager, target)
+            except Exception:
+                artifact = None
+            self.timings[pkgid] = {"download": round(time.perf_counter() - started, 3)}
+            self._set(pkgid, PACKAGE_DOWNLOADED)
+            self._ready.put((pkgid, artifact))
+
+    def _install_stage(self, packages):
+        in_job = set(packages)
+        waiting = []  # downloaded, but a dependency in this job is not installed yet
+        remaining = len(packages)
+        ok = True
+        while remaining:
+            waiting.append(self._ready.get())
+            progressed = True
+            while progressed:
+                progressed = False
+                for item in list(waiting):
+                    pkgid, artifact = item
+                    deps = [d for d in self.depends_on.get(pkgid, ()) if d in in_job]
+                    states = [self.job.results.get(d) for d in deps]
+                    if any(s in (JOB_FAILED, JOB_CANCELLED) for s in states):
+                        self._set(pkgid, JOB_FAILED)  # a dependency failed: do not install
+                    elif all(s == JOB_SUCCEEDED for s in states):
+                        self._install(pkgid, artifact)
+                    else:
+                        continue
+                    waiting.remove(item)
+                    remaining -= 1
+                    ok = ok and self.job.results[pkgid] == JOB_SUCCEEDED
+                    progressed = True
+            if waiting and len(waiting) == remaining:
+                # Everything left is downloaded but waiting on each other: a depends_on cycle
+                log = current_job_log()
+                if log is not None:
+                    log.write(f"Not installed (dependency cycle): {', '.join(sorted(p for p, _ in waiting))}\n")
+                for pkgid, _ in waiting:
+                    self._set(pkgid, JOB_FAILED)
+                return False
+        return ok
+
+    def _install(self, pkgid, artifact):
+        self._set(pkgid, JOB_RUNNING)
+        started = time.perf_counter()
+        installed = self.engine.install_downloaded(pkgid, self.job.manager, artifact)
+        self.timings.setdefault(pkgid, {})["install"] = round(time.perf_counter() - started, 3)
+        self._set(pkgid, JOB_SUCCEEDED if installed else JOB_FAILED)
+
+    def _set(self, pkgid, state):
+        self.job.results[pkgid] = state
+        self.engine.scheduler.progress(self.job)
+
+
+class Engine:
+    """Search, install and inventory operations shared by the GUI and the CLI.
+
+    Listeners added with ``add_job_listener`` / ``add_inventory_listener``
+    are called from worker threads; the GUI marshals them onto Tk itself.
+    """
+
+    def __init__(self, config_dir=None, limits=None):
+        self.config_dir = Path(config_dir) if config_dir else default_config_dir()
+        # Read on first access; see apply_settings()
+        self.settings = SettingsStore(self.config_dir / 'settings.json')
+        # Every winget/choco invocation is timed and logged here (Diagnostics tab)
+        self.command_log = CommandLog(self.config_dir / 'commands.jsonl')
+        self.launcher = Launcher(self.command_log)
+        self.search_cache = SearchCache(self.config_dir / 'search_cache.json')
+        self.package_index = PackageIndex(self.config_dir / 'package_index.sqlite3', command_log=self.command_log)
+        self.inventory = InstalledInventory(self.config_dir / 'installed_inventory.json', command_log=self.command_log)
+        self.download_dir = self.config_dir / 'downloads'
+        self.download_workers = DOWNLOAD_WORKERS
+        self._choco_download = None  # whether `choco download` works here (licensed editions only)
+        self.upgrades = UpgradePlanner(self.config_dir / 'upgrades.json', command_log=self.command_log)
+        self.artifact_cache = ArtifactCache(self.config_dir / 'artifacts', command_log=self.command_log)
+        self._uncacheable = set()  # downloads that cannot be installed locally (e.g. portable zips)
+        self.index_refresh_hours = INDEX_REFRESH_HOURS
+        self.search_timeout = SEARCH_TIMEOUT
+        # Categories and shortcuts from the bundled, shared and per-user catalog files
+        self.catalog = Catalog(catalog_sources(self.config_dir))
+        self.categories = self.catalog
+        self.job_logs = JobLogs(self.config_dir / 'logs')
+        self.journal = JobJournal(self.config_dir / 'journal.jsonl')
+        self.scheduler = JobScheduler(limits, on_change=self._on_job_change, job_logs=self.job_logs)
+        self.package_jobs = {}  # package ID -> latest job covering it
+        self._job_listeners = []
+        self._inventory_listeners = []
+        self._active_searches = set()
+        self._index_refreshing = set()
+        self._lock = threading.Lock()
+
+    def apply_settings(self):
+        """Apply the persisted engine settings (concurrency, cache sizes, index age)."""
+        settings = self.settings
+        for manager, limit in (settings.get("concurrency") or {}).items():
+            self.scheduler.set_limit(manager, limit)
+        self.search_cache.ttl = settings.get("search_cache_ttl", self.search_cache.ttl)
+        self.search_cache.max_entries = settings.get("search_cache_size", self.search_cache.max_entries)
+        self.index_refresh_hours = settings.get("index_refresh_hours", self.index_refresh_hours)
+        cache = self.artifact_cache
+        cache.enabled = bool(settings.get("artifact_cache", cache.enabled))
+        cache.max_bytes = int(settings.get("artifact_cache_mb", cache.max_bytes // (1024 * 1024))) * 1024 * 1024
+        cache.root = Path(settings.get("artifact_cache_dir") or self.config_dir / 'artifacts')
+
+    def settings_values(self):
+        """The engine's half of settings.json, as written by the GUI."""
+        return {
+            "concurrency": {m: self.scheduler.get_limit(m) for m in DEFAULT_CONCURRENCY},
+            "search_cache_ttl": self.search_cache.ttl,
+            "search_cache_size": self.search_cache.max_entries,
+            "index_refresh_hours": self.index_refresh_hours,
+            "artifact_cache": self.artifact_cache.enabled,
+            "artifact_cache_mb": self.artifact_cache.max_bytes // (1024 * 1024),
+            # None while the cache lives in the config dir, so moving that moves the cache too
+            "artifact_cache_dir": (str(self.artifact_cache.root)
+                                   if self.artifact_cache.root != self.config_dir / 'artifacts' else None),
+        }
+
+    def add_job_listener(self, callback):
+        self._job_listeners.append(callback)
+
+    def remove_job_listener(self, callback):
+        try:
+            self._job_listeners.remove(callback)
+        except ValueError:
+            pass
+
+    def add_inventory_listener(self, callback):
+        self._inventory_listeners.append(callback)
+
+    # -- search ---------------------------------------------------------
+
+    def search(self, manager, query, refresh=False, on_records=None, is_current=None):
+        """Search one manager: local index, then cache, then a refinement of a
+        cached query, then the CLI (streamed). Records are also delivered to
+        ``on_records`` as they arrive, unless ``is_current()`` turns False.
+
+        Returns ``(records, status, how, error)``; status is 'complete',
+        'timeout', 'cancelled' or 'error'.
+        """
+        current = is_current or (lambda: True)
+
+        def deliver(records):
+            if on_records is not None and current():
+                on_records(records)
+
+        try:
+            # The local index answers instantly and offline; the CLI is the fallback
+            records = [] if refresh else self.search_index(query, manager)
+            if records:
+                deliver(records)
+                return records, 'complete', 'local index', None
+            output = None if refresh else self.search_cache.get(manager, query)
+            if output is not None:
+                records = parse_search_output(manager, output)
+                deliver(records)
+                return records, 'complete', 'cached', None
+            # Refining a query we already fetched needs no new process (winget only:
+            # choco also matches descriptions, which --limit-output does not show)
+            cached = None if refresh or manager == 'chocolatey' else self.search_cache.get_prefix(manager, query)
+            if cached is not None:
+                records = filter_records(parse_search_output(manager, cached[1]), query)
+                deliver(records)
+                return records, 'complete', f'refined from "{cached[0]}"', None
+
+            search = StreamingSearch(manager, query, deliver, timeout=self.search_timeout, command_log=self.command_log)
+            self._active_searches.add(search)
+            if not current():
+                search.cancel()
+            try:
+                status, output = search.run()
+            finally:
+                self._active_searches.discard(search)
+            if status == 'complete':
+                self.search_cache.put(manager, query, output)
+            return search.records, status, None, search.error
+        except Exception as e:
+            return [], 'error', None, str(e)
+
+    def search_all(self, query, refresh=False, on_update=None, on_manager_done=None, is_current=None):
+        """Search every manager concurrently, merging results as each one reports.
+
+        ``on_update(rows)`` receives the merged rows after every batch;
+        ``on_manager_done(manager, status, seconds, merger)`` fires as each
+        manager finishes. Returns ``(rows, {manager: (status, seconds, error)})``.
+        """
+        merger = SearchResultMerger()
+        outcomes = {}
+        started = time.perf_counter()
+
+        def run(manager):
+            def on_records(records):
+                rows = merger.add(manager, records)
+                if on_update is not None:
+                    on_update(rows)
+
+            _, status, _, error = self.search(manager, query, refresh, on_records, is_current)
+            outcomes[manager] = (status, time.perf_counter() - started, error)
+            if on_manager_done is not None:
+                on_manager_done(manager, status, outcomes[manager][1], merger)
+
+        threads = [threading.Thread(target=run, args=(m,), daemon=True) for m in SEARCH_MANAGERS]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return merger.rows(), outcomes
+
+    def cancel_searches(self):
+        """Kill the running search child processes."""
+        for search in list(self._active_searches):
+            search.cancel()
+
+    def search_index(self, query, manager):
+        try:
+            if self.package_index.refreshed_at(manager) is None:
+                return []
+            return self.package_index.search(query, manager)
+        except Exception:
+            return []
+
+    # -- local index ----------------------------------------------------
+
+    def refresh_index(self, force=False, wait=False):
+        """Rebuild stale manager catalogs in the local index on background threads."""
+        threads = []
+        for manager in CATALOG_COMMANDS:
+            with self._lock:
+                if manager in self._index_refreshing:
+                    continue
+                if not force and not self.package_index.is_stale(manager, self.index_refresh_hours):
+                    continue
+                self._index_refreshing.add(manager)
+            t = threading.Thread(target=self._refresh_index_thread, args=(manager,), daemon=True)
+            t.start()
+            threads.append(t)
+        if wait:
+            for t in threads:
+                t.join()
+
+    def _refresh_index_thread(self, manager):
+        try:
+            self.package_index.refresh(manager)
+            self.package_index.warm()
+        except Exception:
+            pass  # manager not installed or offline; keep the existing index
+        finally:
+            with self._lock:
+                self._index_refreshing.discard(manager)
+
+    def warm_index(self):
+        try:
+            self.package_index.warm()
+        except Exception:
+            pass
+
+    # -- installs -------------------------------------------------------
+
+    def install(self, package, manager, version=None):
+        """Install one package synchronously; returns True on success.
+
+        With the installer cache on, an unpinned install is downloaded into
+        (or served from) the cache and installed from the local copy.
+        """
+        if version is None and self.artifact_cache.enabled and (manager, package.lower()) not in self._uncacheable:
+            self.download_dir.mkdir(parents=True, exist_ok=True)
+            directory = Path(tempfile.mkdtemp(prefix='install-', dir=self.download_dir))
+            try:
+                artifact = self.fetch_package(package, manager, directory)
+            except Exception:
+                artifact = None  # download timed out or could not run: install_downloaded falls back
+            try:
+                return self.install_downloaded(package, manager, artifact)
+            finally:
+                shutil.rmtree(directory, ignore_errors=True)
+        return self._install_online(package, manager, version)
+
+    def _install_online(self, package, manager, version=None):
+        try:
+            # Captured so installer chatter never mixes into the CLI's JSON output
+            run_command(self.command_log, 'install', install_command(manager, package, version), check=True,
+                        capture_output=True, text=True, timeout=INSTALL_TIMEOUT)
+            return True
+        except Exception:
+            return False
+
+    def batch_install(self, job):
+        """Install all of ``job.packages`` with a single manager invocation.
+
+        Per-package results are parsed from the combined output into ``job.results``,
+        as each package is reported while the command runs and in full once it exits.
+        """
+        packages = job.packages
+        timeout = INSTALL_TIMEOUT * len(packages)
+        on_output = self._batch_progress(job, ChocoInstallParser() if job.manager == 'chocolatey'
+                                         else WingetImportParser())
+        if job.manager == 'chocolatey':
+            result = run_command(
+                self.command_log, 'batch-install',
+                ["choco", "install", *packages, "-y"],
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+                on_output=on_output
+            )
+            job.results = parse_choco_install_output(result.stdout, packages, result.returncode)
+        else:  # winget
+            fd, manifest_path = tempfile.mkstemp(prefix='winget-import-', suffix='.json')
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(build_winget_import_manifest(packages), f)
+                result = run_command(
+                    self.command_log, 'batch-install',
+                    ["winget", "import", "-i", manifest_path, "--accept-package-agreements", "--accept-source-agreements"],
+                    capture_output=True,
+                    text=True,
+                    timeout=timeout,
+                    on_output=on_output
+                )
+            finally:
+                try:
+                    os.remove(manifest_path)
+                except OSError:
+                    pass
+            job.results = parse_winget_import_output(result.stdout, packages, result.returncode)
+        return all(state == JOB_SUCCEEDED for state in job.results.values())
+
+    def _batch_progress(self, job, parser):
+        """``on_output`` callback publishing per-package results of a batch job as they are printed."""
+        by_id = {p.lower(): p for p in job.packages}
+
+        def on_output(line):
+            changed = False
+            for pkgid, state in parser.feed(line):
+                package = by_id.get(pkgid.lower())
+                if package is not None and job.results.get(package) != state:
+                    job.results[package] = state
+                    changed = True
+            if changed:
+                self.scheduler.progress(job)  # the journal records each package as it finishes
+        return on_output
+
+    def submit_install(self, package, manager, priority=PRIORITY_NORMAL, version=None, batch_id=None):
+        """Queue an install unless the package is already queued or running."""
+        with self._lock:
+            job = self.package_jobs.get(package)
+            if job is not None and job.state not in JOB_FINISHED_STATES:
+                return job
+            job = self.scheduler.create(manager, [package], lambda j: self.install(package, manager, version),
+                                        priority, batch_id)
+            self.package_jobs[package] = job
+        # Queued outside the lock: listeners (e.g. a ProfileExecutor) may submit installs themselves
+        return self.scheduler.enqueue(job)
+
+    # -- upgrades -------------------------------------------------------
+
+    def plan_upgrades(self, managers=None, refresh=False):
+        """Upgrades needed, re-checking a manager only when its version map is stale (or ``refresh``)."""
+        for manager in managers or list(OUTDATED_COMMANDS):
+            if manager not in OUTDATED_COMMANDS or not (refresh or self.upgrades.is_stale(manager)):
+                continue
+            try:
+                outdated = self.upgrades.refresh(manager)
+            except Exception:
+                continue  # manager missing or failing: plan from what is known
+            self.inventory.set_available(manager, {pkgid: info["available"] for pkgid, info in outdated.items()})
+            for pkgid in outdated:
+                self.artifact_cache.discard(manager, pkgid)  # a cached installer is now out of date
+            for callback in list(self._inventory_listeners):
+                try:
+                    callback()
+                except Exception:
+                    pass
+        return self.upgrades.plan(managers)
+
+    def upgrade(self, package, manager):
+        """Upgrade one package synchronously (always from the manager, never the installer cache)."""
+        try:
+            run_command(self.command_log, 'upgrade', upgrade_command(manager, package), check=True,
+                        capture_output=True, text=True, timeout=INSTALL_TIMEOUT)
+            return True
+        except Exception:
+            return False
+
+    def submit_upgrades(self, items, priority=PRIORITY_NORMAL, batch_id=None):
+        """Queue one upgrade job per UpgradeItem through the scheduler; returns the jobs."""
+        if batch_id is None and items:
+            batch_id = self.journal.begin('upgrade', f"Upgrade {len(items)} packages",
+                                          [dict(item._asdict()) for item in items])
+        jobs = []
+        for item in items:
+            with self._lock:
+                job = self.package_jobs.get(item.id)
+                if job is not None and job.manager == item.manager and job.state not in JOB_FINISHED_STATES:
+                    jobs.append(job)
+                    continue
+                job = self.scheduler.create(item.manager, [item.id],
+                                            lambda j, item=item: self.upgrade(item.id, item.manager), priority,
+                                            batch_id)
+                job.target_version = item.available
+                job.kind = 'upgrade'
+                self.package_jobs[item.id] = job
+            jobs.append(self.scheduler.enqueue(job))
+        return jobs
+
+    def download_package(self, package, manager, directory):
+        """Download ``package`` into ``directory`` without installing it; returns the directory or None."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        if manager == 'chocolatey':
+            if self._choco_download is not False:
+                result = run_command(self.command_log, 'download', download_command(manager, package, directory),
+                                     capture_output=True, text=True, timeout=DOWNLOAD_TIMEOUT)
+                if result.returncode == 0 and any(directory.rglob('*.nupkg')):
+                    self._choco_download = True
+                    return directory
+                if 'licens' in (result.stdout + result.stderr).lower():
+                    self._choco_download = False
+            return directory if self._fetch_nupkg(package, directory) else None
+        result = run_command(self.command_log, 'download', download_command(manager, package, directory),
+                             capture_output=True, text=True, timeout=DOWNLOAD_TIMEOUT)
+        return directory if result.returncode == 0 and read_winget_download(directory) else None
+
+    def fetch_package(self, package, manager, directory):
+        """Like ``download_package``, but served from the installer cache when it has the latest version.
+
+        Offline (the version lookup fails) whatever the cache has is used.
+        """
+        cache = self.artifact_cache
+        if cache.enabled and cache.has(manager, package) and \
+                cache.restore(manager, package, directory, self.latest_version(package, manager)):
+            return Path(directory)
+        artifact = self.download_package(package, manager, directory)
+        if artifact is not None and cache.enabled:
+            if local_install_command(manager, package, artifact) is None:
+                self._uncacheable.add((manager, package.lower()))
+            else:
+                try:
+                    cache.store(manager, package, artifact, artifact_version(manager, package, artifact))
+                except OSError:
+                    pass  # cache full or share unavailable: the install goes ahead from the download
+        return artifact
+
+    def latest_version(self, package, manager):
+        """The package's current version in the manager's source, or None (offline, not found)."""
+        try:
+            result = run_command(self.command_log, 'version', latest_version_command(manager, package),
+                                 capture_output=True, text=True, timeout=SEARCH_TIMEOUT)
+        except Exception:
+            return None
+        return parse_latest_version(manager, package, result.stdout) if result.returncode == 0 else None
+
+    def prefetch(self, packages, manager):
+        """Fill the installer cache without installing; returns ``{package: 'cached'|'downloaded'|'failed'}``."""
+        results = {}
+        pending = queue.Queue()
+        for package in packages:
+            pending.put(package)
+        self.download_dir.mkdir(parents=True, exist_ok=True)
+
+        def worker():
+            while True:
+                try:
+                    package = pending.get_nowait()
+                except queue.Empty:
+                    return
+                if self.artifact_cache.has(manager, package, self.latest_version(package, manager)):
+                    results[package] = 'cached'
+                    continue
+                directory = Path(tempfile.mkdtemp(prefix='prefetch-', dir=self.download_dir))
+                try:
+                    artifact = self.fetch_package(package, manager, directory)
+                    results[package] = 'downloaded' if artifact and self.artifact_cache.has(manager, package) else 'failed'
+                except Exception:
+                    results[package] = 'failed'
+                finally:
+                    shutil.rmtree(directory, ignore_errors=True)
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(min(self.download_workers, len(packages)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return {package: results.get(package, 'failed') for package in packages}
+
+    def _fetch_nupkg(self, package, directory):
+        """Open-source choco has no `download`: fetch the package itself from the community feed."""
+        import urllib.request  # deferred: only pipelined Chocolatey installs need it
+        url = f"{CHOCO_FEED}package/{package}"
+        started = time.perf_counter()
+        size, status = 0, 'ok'
+        try:
+            with urllib.request.urlopen(url, timeout=DOWNLOAD_TIMEOUT) as response, \
+                    open(directory / f"{package}.nupkg", "wb") as f:
+                shutil.copyfileobj(response, f)
+                size = f.tell()
+            return True
+        except Exception:
+            status = 'failed'
+            return False
+        finally:
+            self.command_log.record('download', ['GET', url], time.perf_counter() - started, None, size, status, manager='chocolatey')
+
+    def install_downloaded(self, package, manager, artifact):
+        """Install from a downloaded artifact; falls back to a normal install.
+
+        The fallback also covers a local run that fails, e.g. a per-machine
+        installer that needs the elevation the manager would have asked for.
+        """
+        try:
+            command = local_install_command(manager, package, artifact) if artifact is not None else None
+        except OSError:
+            command = None  # download directory unreadable
+        if command is not None:
+            try:
+                run_command(self.command_log, 'install-local', command, check=True, capture_output=True,
+                            text=True, timeout=INSTALL_TIMEOUT)
+                return True
+            except Exception:
+                log = current_job_log()
+                if log is not None:
+                    log.write(f"Installing {package} from the download failed; retrying with {manager}\n")
+        return self._install_online(package, manager)
+
+    def pipelined_install(self, job, depends_on=None):
+        """Runner for pipelined jobs (see DownloadPipeline)."""
+        return DownloadPipeline(self, job, self.download_workers, depends_on).run()
+
+    def submit_pipeline(self, packages, manager, priority=PRIORITY_NORMAL, depends_on=None, batch_id=None):
+        """Queue one pipelined download-then-install job for packages not already queued or running."""
+        runner = lambda job: self.pipelined_install(job, depends_on)
+        return self._submit_group(packages, manager, runner, priority, batch_id)
+
+    def submit_batch(self, packages, manager, priority=PRIORITY_NORMAL, batch_id=None):
+        """Queue one batch job for every package not already queued or running."""
+        return self._submit_group(packages, manager, self.batch_install, priority, batch_id)
+
+    def _submit_group(self, packages, manager, runner, priority, batch_id=None):
+        with self._lock:
+            pending = [p for p in packages
+                       if self.package_jobs.get(p) is None or self.package_jobs[p].state in JOB_FINISHED_STATES]
+            if not pending:
+                return None
+            job = self.scheduler.create(manager, pending, runner, priority, batch_id)
+            for pkgid in pending:
+                self.package_jobs[pkgid] = job
+        return self.scheduler.enqueue(job)
+
+    def install_many(self, packages, manager, batch=False, skip_installed=True, priority=PRIORITY_NORMAL,
+                     pipeline=False, depends_on=None, title=None, batch_id=None):
+        """Queue installs for ``packages``; returns ``(jobs, skipped)``.
+
+        ``pipeline`` downloads in parallel ahead of one-at-a-time installs
+        (ordered by ``depends_on``); ``batch`` uses one manager invocation.
+        Otherwise each package gets its own job and ``depends_on`` is not
+        enforced; use apply_profile() for parallel installs in dependency order.
+        The packages are journaled as one batch (``batch_id`` continues one).
+        """
+        skipped = [p for p in packages if skip_installed and self.inventory.is_installed(manager, p)]
+        pending = [p for p in packages if p not in skipped]
+        if not pending:
+            return [], skipped
+        if batch_id is None:
+            deps = {p: list((depends_on or {}).get(p, ())) for p in pending}
+            batch_id = self.journal.begin('install', title or f"Install {len(pending)} packages",
+                                          [{"id": p, "manager": manager} for p in pending],
+                                          manager=manager, batch=batch, pipeline=pipeline, depends_on=deps)
+        if pipeline:
+            job = self.submit_pipeline(pending, manager, priority, depends_on, batch_id)
+            return ([job] if job is not None else []), skipped
+        if batch:
+            job = self.submit_batch(pending, manager, priority, batch_id)
+            return ([job] if job is not None else []), skipped
+        return [self.submit_install(p, manager, priority, batch_id=batch_id) for p in pending], skipped
+
+    def install_category(self, category_name, manager, batch=False, skip_installed=True, pipeline=False):
+        """Install a category as one batch or pipelined job (see install_many).
+
+        For one job per package in dependency order, apply
+        ``Profile.from_category`` instead, as the GUI and CLI do.
+        """
+        apps = self.categories.get(category_name)
+        if apps is None:
+            raise KeyError(f"Unknown category: {category_name}")
+        return self.install_many([app.id for app in apps], manager, batch, skip_installed,
+                                 pipeline=pipeline, depends_on={app.id: app.depends_on for app in apps},
+                                 title=f"Install All: {category_name}")
+
+    def apply_profile(self, profile, skip_installed=True, on_update=None, title=None, batch_id=None):
+        """Start installing ``profile`` in dependency order; returns the running ProfileExecutor."""
+        if batch_id is None:
+            batch_id = self.journal.begin('profile', title or profile.name or "Profile",
+                                          [{"id": e.id, "managers": list(e.managers), "version": e.version,
+                                            "depends_on": list(e.depends_on)} for e in profile.entries.values()])
+        return ProfileExecutor(self, profile, skip_installed, on_update, batch_id).start()
+
+    def resume(self, batch_id, on_update=None):
+        """Re-run the packages of a journaled batch that did not succeed; returns ``(jobs, skipped, executor)``.
+
+        Profiles (and categories installed as one) resume through a
+        ProfileExecutor, dependencies on already-finished packages dropped;
+        the others resume as jobs (``skipped`` lists those found installed
+        meanwhile). Either way the same batch id is continued.
+        """
+        batch = self.journal.batch(batch_id)
+        remaining = self.journal.remaining(batch_id)
+        if batch is None or not remaining:
+            return [], [], None
+        packages = [p for p in batch["packages"] if p["id"] in remaining]
+        if batch["kind"] == 'profile':
+            entries = [ProfileEntry(p["id"], tuple(p.get("managers") or ('winget',)), p.get("version"),
+                                    tuple(d for d in p.get("depends_on", ()) if d in remaining))
+                       for p in packages]
+            return [], [], self.apply_profile(Profile(entries, batch["title"]), on_update=on_update, batch_id=batch_id)
+        if batch["kind"] == 'upgrade':
+            items = [UpgradeItem(p["manager"], p["id"], p.get("version", ''), p.get("available", ''))
+                     for p in packages]
+            return self.submit_upgrades(items, batch_id=batch_id), [], None
+        options = batch["options"]
+        jobs, skipped = self.install_many(remaining, options.get("manager", 'winget'), options.get("batch", False),
+                                          pipeline=options.get("pipeline", False),
+                                          depends_on=options.get("depends_on"), batch_id=batch_id)
+        for pkgid in skipped:
+            self.journal.package(batch_id, pkgid, 'finished', PROFILE_ALREADY_INSTALLED)
+        return jobs, skipped, None
+
+    def cancel_packages(self, packages):
+        """Cancel queued (not yet running) jobs covering any of ``packages``."""
+        for pkgid in packages:
+            job = self.package_jobs.get(pkgid)
+            if job is not None:
+                self.scheduler.cancel(job.id)
+
+    def wait(self, jobs, timeout=None):
+        return self.scheduler.wait(jobs, timeout)
+
+    def _on_job_change(self, job):
+        self.journal.record_job(job)
+        if job.kind == 'upgrade' and job.state == JOB_SUCCEEDED:
+            # The planner already knows the new version: no re-listing needed
+            self.upgrades.mark_upgraded(job.manager, job.packages)
+            self.inventory.set_versions(job.manager, {p: job.target_version for p in job.packages})
+            for callback in list(self._inventory_listeners):
+                try:
+                    callback()
+                except Exception:
+                    pass
+        elif job.state in JOB_FINISHED_STATES and job.state != JOB_CANCELLED:
+            # Re-check just these packages so badges and later batches see the new state
+            threading.Thread(target=self.refresh_inventory, args=(job.manager, job.packages), daemon=True).start()
+        for callback in list(self._job_listeners):
+            try:
+                callback(job)
+            except Exception:
+                pass
+
+    # -- installed inventory --------------------------------------------
+
+    def refresh_inventory(self, manager=None, packages=None, force=False):
+        """Refresh the installed inventory (stale managers, all if ``force``, or just ``packages``)."""
+        try:
+            if packages is not None:
+                self.inventory.refresh_packages(manager, packages)
+            else:
+                for name in INVENTORY_COMMANDS:
+                    if (manager is None or name == manager) and (force or self.inventory.is_stale(name)):
+                        try:
+                            self.inventory.refresh(name)
+                        except Exception:
+                            pass  # manager not installed
+        except Exception:
+            pass
+        for callback in self._inventory_listeners:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def list_installed(self, manager, refresh=False):
+        """Return ``{id: {"id", "version", "available"}}`` of installed packages."""
+        self.refresh_inventory(manager, force=refresh)
+        self.inventory.load()
+        return self.inventory.snapshot(manager)
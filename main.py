@@ -1,23 +1,436 @@
+import time
+
+# Taken before any other import so --profile-startup can report import time
+_STARTUP_T0 = time.perf_counter()
+
+import sys
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
+from tkinter import ttk, messagebox, filedialog
 import subprocess
 import threading
 import json
-import os
+import queue
+import re
 from pathlib import Path
 
+from engine import (
+    Engine, Profile, default_config_dir, DEFAULT_CONCURRENCY, SEARCH_MANAGERS, SEARCH_TIMEOUT,
+    PROFILE_SKIPPED, PROFILE_ALREADY_INSTALLED, PACKAGE_DOWNLOADING, PACKAGE_DOWNLOADED, run_command,
+    JobLogs, JOB_LOG_TAIL_LINES,
+    JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED, JOB_FINISHED_STATES,
+    PRIORITY_HIGH, PRIORITY_NORMAL,
+)
+
 # Windows-specific registry access for detecting system theme
 try:
     import winreg
 except Exception:
     winreg = None
 
+
+# Default delay between the last keystroke and a live search
+SEARCH_DEBOUNCE_MS = 350
+
+
+def _natural_key(value):
+    """Sort key that orders embedded numbers numerically (1.10 after 1.9)."""
+    return [(0, int(part), '') if part.isdigit() else (1, 0, part) for part in re.split(r'(\d+)', str(value).lower()) if part]
+
+
+class VirtualTreeview(ttk.Frame):
+    """Sortable Treeview that only materializes the rows scrolled into view.
+
+    Records live in a plain list; the Treeview holds a fixed window of
+    ``height`` items whose values are swapped as the user scrolls, so
+    rendering cost and widget memory do not grow with the result count.
+    """
+
+    def __init__(self, master, columns, height=14, on_activate=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self._fields = [field for field, _, _ in columns]
+        self._records = []
+        self._offset = 0
+        self._sort_field = None
+        self._sort_reverse = False
+        self._on_activate = on_activate
+        self.tree = ttk.Treeview(self, columns=self._fields, show='headings', height=height, selectmode='browse')
+        for field, title, width in columns:
+            self.tree.heading(field, text=title, command=lambda f=field: self.sort_by(f))
+            self.tree.column(field, width=width, anchor=tk.W)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.bind('<MouseWheel>', lambda e: self.scroll(-1 if e.delta > 0 else 1, 'units'))
+        self.tree.bind('<Button-4>', lambda e: self.scroll(-1, 'units'))
+        self.tree.bind('<Button-5>', lambda e: self.scroll(1, 'units'))
+        self.tree.bind('<Double-1>', self._activate)
+        self.tree.bind('<Return>', self._activate)
+
+    @property
+    def rows(self):
+        return max(1, int(self.tree.cget('height')))
+
+    def set_records(self, records):
+        self._records = list(records)
+        self._offset = 0
+        self._apply_sort()
+        self._render()
+
+    def append_records(self, records):
+        self._records.extend(records)
+        self._apply_sort()
+        self._render()
+
+    def records(self):
+        return list(self._records)
+
+    def sort_by(self, field):
+        if self._sort_field == field:
+            self._sort_reverse = not self._sort_reverse
+        else:
+            self._sort_field, self._sort_reverse = field, False
+        self._apply_sort()
+        self._render()
+
+    def _apply_sort(self):
+        if self._sort_field is not None:
+            index = self._fields.index(self._sort_field)
+            self._records.sort(key=lambda r: _natural_key(r[index]), reverse=self._sort_reverse)
+
+    def scroll(self, amount, what='units'):
+        step = self.rows if what == 'pages' else 1
+        self._offset += int(amount) * step
+        self._render()
+
+    def _on_scrollbar(self, action, *args):
+        if action == 'moveto':
+            self._offset = int(float(args[0]) * len(self._records))
+            self._render()
+        elif action == 'scroll':
+            self.scroll(args[0], args[1])
+
+    def _render(self):
+        total = len(self._records)
+        rows = self.rows
+        self._offset = max(0, min(self._offset, total - rows))
+        window = self._records[self._offset:self._offset + rows]
+        items = self.tree.get_children()
+        for i, record in enumerate(window):
+            values = [getattr(record, field) for field in self._fields]
+            if i < len(items):
+                self.tree.item(items[i], values=values)
+            else:
+                self.tree.insert('', tk.END, iid=str(i), values=values)
+        if len(items) > len(window):
+            self.tree.delete(*items[len(window):])
+        if total:
+            self.scrollbar.set(self._offset / total, min(1.0, (self._offset + rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def selected_record(self):
+        selection = self.tree.selection()
+        if not selection:
+            return None
+        index = self._offset + int(selection[0])
+        return self._records[index] if index < len(self._records) else None
+
+    def _activate(self, event=None):
+        record = self.selected_record()
+        if record is not None and self._on_activate is not None:
+            self._on_activate(record)
+
+
+# Windows 11 Mica-style palettes, compiled into ttk themes once at startup
+THEME_PALETTES = {
+    'light': {
+        'bg': '#FCFCFC',  # Very light, almost transparent
+        'fg': '#000000',
+        'entry_bg': '#FFFFFF',  # Pure white cards
+        'text_bg': '#FFFFFF',
+        'pressed': '#F0F0F0',
+        'accent': '#005FB8',
+        'border': '#F0F0F0',
+    },
+    'dark': {
+        'bg': '#1F1F1F',  # More transparent dark background
+        'fg': '#FFFFFF',
+        'entry_bg': '#2A2A2A',  # Lighter card background
+        'text_bg': '#151515',  # Darker text areas
+        'pressed': '#333333',
+        'accent': '#60CDFF',
+        'border': '#333333',
+    },
+}
+
+
+def build_theme_settings(palette, dark):
+    """Return ``ttk.Style.theme_create`` settings for one palette."""
+    bg, fg, entry_bg, text_bg = palette['bg'], palette['fg'], palette['entry_bg'], palette['text_bg']
+    pressed, accent = palette['pressed'], palette['accent']
+    return {
+        # Base widget colors and fonts
+        '.': {'configure': {'background': bg, 'foreground': fg, 'font': ('Segoe UI', 10)}},
+        'TFrame': {'configure': {'background': bg}},
+        'TLabelframe': {'configure': {'background': entry_bg, 'foreground': fg, 'borderwidth': 1, 'relief': 'solid', 'labelmargins': 12}},
+        'TLabelframe.Label': {'configure': {'background': entry_bg, 'foreground': accent if dark else fg, 'font': ('Segoe UI', 12, 'bold')}},
+        'TLabel': {'configure': {'background': bg, 'foreground': fg, 'font': ('Segoe UI', 10)}},
+        # Buttons (modern Mica-style with subtle borders)
+        'TButton': {
+            'configure': {'background': entry_bg, 'foreground': fg, 'relief': 'solid', 'padding': (20, 10), 'borderwidth': 1, 'font': ('Segoe UI', 10)},
+            'map': {'background': [('active', accent), ('pressed', pressed)], 'foreground': [('active', '#FFFFFF'), ('pressed', fg)]},
+        },
+        # App-style menu bar and modern popup menu button styles
+        'App.TButton': {'configure': {'background': entry_bg, 'foreground': fg, 'font': ('Segoe UI', 9)}},
+        'Menu.TButton': {'configure': {'background': entry_bg, 'foreground': fg, 'relief': 'flat', 'font': ('Segoe UI', 9)}},
+        'Menu.TFrame': {'configure': {'background': entry_bg}},
+        # Entries / Combobox (modern rounded look)
+        'TEntry': {'configure': {'fieldbackground': entry_bg, 'foreground': fg, 'borderwidth': 0, 'relief': 'flat', 'font': ('Segoe UI', 10), 'padding': (12, 6)}},
+        'TCombobox': {
+            'configure': {'fieldbackground': entry_bg, 'foreground': fg, 'borderwidth': 0, 'font': ('Segoe UI', 10)},
+            'map': {'fieldbackground': [('readonly', entry_bg)]},
+        },
+        'TCheckbutton': {
+            'configure': {'background': bg, 'foreground': fg, 'font': ('Segoe UI', 10)},
+            'map': {'background': [('active', bg)], 'foreground': [('active', fg)]},
+        },
+        'TRadiobutton': {
+            'configure': {'background': bg, 'foreground': fg, 'font': ('Segoe UI', 10)},
+            'map': {'background': [('active', bg)], 'foreground': [('active', fg)]},
+        },
+        # Scrollbars (modern thin design)
+        'Vertical.TScrollbar': {'configure': {'background': entry_bg, 'troughcolor': bg, 'borderwidth': 0, 'width': 12}},
+        'Horizontal.TScrollbar': {'configure': {'background': entry_bg, 'troughcolor': bg, 'borderwidth': 0, 'width': 12}},
+        # Notebook tabs (Windows 11 Mica style)
+        'TNotebook': {'configure': {'background': bg, 'borderwidth': 0}},
+        'TNotebook.Tab': {
+            'configure': {'background': entry_bg, 'foreground': fg, 'padding': (24, 12), 'borderwidth': 1, 'font': ('Segoe UI', 11, 'bold')},
+            'map': {'background': [('selected', accent), ('active', pressed)], 'foreground': [('selected', '#FFFFFF'), ('active', fg)]},
+        },
+        # Search results table
+        'Treeview': {
+            'configure': {'background': text_bg, 'fieldbackground': text_bg, 'foreground': fg, 'borderwidth': 0, 'font': ('Segoe UI', 10), 'rowheight': 24},
+            'map': {'background': [('selected', accent)], 'foreground': [('selected', '#FFFFFF')]},
+        },
+        'Treeview.Heading': {
+            'configure': {'background': entry_bg, 'foreground': fg, 'relief': 'flat', 'font': ('Segoe UI', 10, 'bold')},
+            'map': {'background': [('active', pressed)]},
+        },
+    }
+
+
+class StartupProfiler:
+    """Record how long each startup phase takes (reported with --profile-startup)."""
+
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self._last = self.start
+        self.phases = []
+
+    def mark(self, phase):
+        """Close the current phase, naming it ``phase``."""
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self._last) * 1000.0))
+        self._last = now
+
+    def total_ms(self):
+        return (self._last - self.start) * 1000.0
+
+    def as_dict(self):
+        return {"phases_ms": {name: round(ms, 2) for name, ms in self.phases}, "total_ms": round(self.total_ms(), 2)}
+
+    def report(self):
+        width = max([len(name) for name, _ in self.phases] + [5])
+        lines = [f"{name:<{width}}  {ms:8.1f} ms" for name, ms in self.phases]
+        lines.append(f"{'total':<{width}}  {self.total_ms():8.1f} ms")
+        return "\n".join(lines)
+
+
+class UiPump:
+    """Funnel updates from worker threads onto the Tk main loop.
+
+    Worker threads must not touch Tk directly. ``post()`` queues a call to
+    run in order on the main thread; ``coalesce()`` keeps only the latest call
+    for a key (status text, row badges), so a burst of progress reports costs
+    at most one redraw per frame. The queue is drained every ``frame_ms``.
+    """
+
+    def __init__(self, root, frame_ms=16, budget_ms=8):
+        self.root = root
+        self.frame_ms = frame_ms
+        self.budget = budget_ms / 1000.0
+        self._queue = queue.SimpleQueue()
+        self._latest = {}
+        self._lock = threading.Lock()
+        self._after_id = None
+
+    def post(self, func, *args):
+        self._queue.put((func, args))
+
+    def coalesce(self, key, func, *args):
+        with self._lock:
+            self._latest[key] = (func, args)
+
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self.root.after(self.frame_ms, self._drain)
+
+    def stop(self):
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _drain(self):
+        deadline = time.perf_counter() + self.budget
+        # Ordered calls first, within the frame budget; the rest wait a frame
+        while time.perf_counter() < deadline:
+            try:
+                func, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._call(func, args)
+        with self._lock:
+            latest, self._latest = self._latest, {}
+        for func, args in latest.values():
+            self._call(func, args)
+        self._after_id = self.root.after(self.frame_ms, self._drain)
+
+    @staticmethod
+    def _call(func, args):
+        try:
+            func(*args)
+        except Exception:
+            pass
+
+
+class NotificationArea(ttk.Frame):
+    """Non-blocking replacement for message boxes: a strip of dismissable messages."""
+
+    ICONS = {'info': 'ℹ', 'success': '✓', 'warning': '⚠', 'error': '✗'}
+
+    def __init__(self, master, max_visible=3, timeout_ms=8000, **kwargs):
+        super().__init__(master, **kwargs)
+        self.max_visible = max_visible
+        self.timeout_ms = timeout_ms
+        self._items = []
+        self._pack_options = None
+
+    def place_with(self, **pack_options):
+        """Remember how to pack the area; it is only shown while it has messages."""
+        self._pack_options = pack_options
+
+    def show(self, message, level='info', timeout_ms=None, actions=None):
+        """``actions``: ``[(label, callback)]`` buttons; clicking one runs it and dismisses the message."""
+        item = ttk.Frame(self, padding=(12, 4))
+        ttk.Label(item, text=f"{self.ICONS.get(level, '')} {message}", wraplength=900, justify=tk.LEFT).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        ttk.Button(item, text="✕", width=3, command=lambda: self.dismiss(item)).pack(side=tk.RIGHT)
+        for label, callback in reversed(actions or []):
+            ttk.Button(item, text=label, command=lambda c=callback: (self.dismiss(item), c())).pack(side=tk.RIGHT, padx=(0, 5))
+        item.pack(fill=tk.X)
+        self._items.append(item)
+        while len(self._items) > self.max_visible:
+            self.dismiss(self._items[0])
+        timeout = self.timeout_ms if timeout_ms is None else timeout_ms
+        if timeout:
+            self.after(timeout, lambda: self.dismiss(item))
+        if self._pack_options is not None and not self.winfo_ismapped():
+            self.pack(**self._pack_options)
+
+    def dismiss(self, item):
+        if item in self._items:
+            self._items.remove(item)
+            item.destroy()
+        if not self._items and self._pack_options is not None:
+            self.pack_forget()
+
+
+class VirtualRowList(ttk.Frame):
+    """Scrolling list of app rows (name, status badge, Install button) built
+    from a fixed pool of widgets that are rebound to items as the user scrolls.
+    """
+
+    def __init__(self, master, items, status_var, on_install, visible_rows=12, **kwargs):
+        super().__init__(master, **kwargs)
+        self._items = list(items)
+        self._status_var = status_var
+        self._on_install = on_install
+        self._offset = 0
+        body = ttk.Frame(self)
+        body.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self._rows = []
+        for _ in range(min(visible_rows, len(self._items))):
+            row = ttk.Frame(body)
+            row.pack(fill=tk.X, pady=2)
+            name = ttk.Label(row)
+            name.pack(side=tk.LEFT, padx=5)
+            button = ttk.Button(row, text="Install")
+            button.pack(side=tk.RIGHT, padx=5)
+            status = ttk.Label(row)
+            status.pack(side=tk.RIGHT, padx=5)
+            for widget in (row, name, button, status):
+                widget.bind('<MouseWheel>', lambda e: self.scroll(-1 if e.delta > 0 else 1))
+                widget.bind('<Button-4>', lambda e: self.scroll(-1))
+                widget.bind('<Button-5>', lambda e: self.scroll(1))
+            self._rows.append((name, status, button))
+        self._render()
+
+    def scroll(self, amount):
+        self._offset += int(amount)
+        self._render()
+
+    def _on_scrollbar(self, action, *args):
+        if action == 'moveto':
+            self._offset = int(float(args[0]) * len(self._items))
+        elif action == 'scroll':
+            self._offset += int(args[0]) * (len(self._rows) if args[1] == 'pages' else 1)
+        self._render()
+
+    def _render(self):
+        total, rows = len(self._items), len(self._rows)
+        self._offset = max(0, min(self._offset, total - rows))
+        for (name_label, status_label, button), (name, pkgid) in zip(self._rows, self._items[self._offset:self._offset + rows]):
+            name_label.configure(text=name)
+            status_label.configure(textvariable=self._status_var(pkgid))
+            button.configure(command=lambda p=pkgid, n=name: self._on_install(p, n))
+        if total:
+            self.scrollbar.set(self._offset / total, min(1.0, (self._offset + rows) / total))
+
+
+# Categories longer than this are shown in a VirtualRowList instead of one frame per app
+VIRTUAL_LIST_THRESHOLD = 30
+# Catalogs with more categories than this get a drop-down instead of one button each
+CATEGORY_BUTTON_LIMIT = 8
+
+
 class WinGetGUI:
-    def __init__(self, root):
+    def __init__(self, root, profiler=None):
         self.root = root
+        self.profiler = profiler or StartupProfiler()
         self.root.title("WinGet Package Manager")
         self.root.geometry("1100x800")
         self.root.resizable(True, True)
+        # Worker threads hand all UI updates to this pump (drained on the Tk main loop)
+        self.pump = UiPump(self.root)
+        self.pump.start()
+
+        # Configuration path for storing user settings and caches (per-user)
+        # The directory is created on first write, not before the first frame
+        self.config_dir = default_config_dir()
+        # Search, install and inventory logic is shared with the headless CLI (cli.py)
+        self.engine = Engine(self.config_dir)
+        self.search_cache = self.engine.search_cache
+        self.package_index = self.engine.package_index
+        self.inventory = self.engine.inventory
+        self.scheduler = self.engine.scheduler
+        self.categories = self.engine.categories
+        # settings.json: changes are batched and written atomically off the UI thread
+        self.settings = self.engine.settings
+        self.settings.on_error = lambda message: self.notify(message, 'error')
         
         # Try to set window transparency for Mica-like effect
         try:
@@ -28,6 +441,9 @@ class WinGetGUI:
         # Menu Bar (keep native menu for keyboard shortcuts)
         menubar = tk.Menu(self.root)
         file_menu = tk.Menu(menubar, tearoff=0)
+        file_menu.add_command(label="Apply Profile...", command=self.apply_profile_file)
+        file_menu.add_command(label="Installer Cache Folder...", command=self.choose_cache_folder)
+        file_menu.add_separator()
         file_menu.add_command(label="Exit", accelerator="Ctrl+Q", command=lambda: self.exit_app())
         menubar.add_cascade(label="File", menu=file_menu)
         self.root.config(menu=menubar)
@@ -61,7 +477,18 @@ class WinGetGUI:
         ttk.Label(toolbar, text="Package Manager:").pack(side=tk.LEFT, padx=(20, 5))
         ttk.Radiobutton(toolbar, text="WinGet", variable=self.package_manager_var, value='winget').pack(side=tk.LEFT, padx=2)
         ttk.Radiobutton(toolbar, text="Chocolatey", variable=self.package_manager_var, value='chocolatey').pack(side=tk.LEFT, padx=2)
+        ttk.Radiobutton(toolbar, text="All", variable=self.package_manager_var, value='all').pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="Install Chocolatey", command=self.install_chocolatey).pack(side=tk.LEFT, padx=(20, 5))
+        # Parallel Chocolatey installs (winget is always serialized by default)
+        ttk.Label(toolbar, text="Choco jobs:").pack(side=tk.LEFT, padx=(20, 5))
+        self.choco_jobs_var = tk.IntVar(value=DEFAULT_CONCURRENCY['chocolatey'])
+        ttk.Spinbox(toolbar, from_=1, to=8, width=3, textvariable=self.choco_jobs_var, command=self._set_choco_concurrency).pack(side=tk.LEFT, padx=2)
+        # Batch mode: Install All runs one `winget import` / `choco install a b c` per category
+        self.batch_mode_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(toolbar, text="Batch installs", variable=self.batch_mode_var, command=self.save_settings).pack(side=tk.LEFT, padx=(20, 5))
+        # Pipelined mode: Install All downloads ahead while earlier packages install
+        self.pipeline_mode_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(toolbar, text="Pipelined installs", variable=self.pipeline_mode_var, command=self.save_settings).pack(side=tk.LEFT, padx=5)
 
         help_menu = tk.Menu(menubar, tearoff=0)
         help_menu.add_command(label="About", command=self.show_about)
@@ -75,6 +502,10 @@ class WinGetGUI:
         # Notebook for tabs
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=24, pady=(0, 24))
+
+        # Notifications from background work (shown under the tabs while non-empty)
+        self.notifications = NotificationArea(self.root)
+        self.notifications.place_with(side=tk.BOTTOM, fill=tk.X, padx=24, pady=(0, 12), before=self.notebook)
         
         # Packages Tab
         self.packages_tab = ttk.Frame(self.notebook)
@@ -83,87 +514,61 @@ class WinGetGUI:
         # Shortcuts Tab
         self.shortcuts_tab = ttk.Frame(self.notebook)
         self.notebook.add(self.shortcuts_tab, text="Shortcuts")
+
+        # Upgrades Tab (installed packages with a newer version available)
+        self.upgrades_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.upgrades_tab, text="Upgrades")
+
+        # Job Logs Tab (live output of install/upgrade jobs)
+        self.logs_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.logs_tab, text="Job Logs")
+
+        # Diagnostics Tab (timings of every winget/choco call)
+        self.diagnostics_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.diagnostics_tab, text="Diagnostics")
         
-        # Search Frame (hidden by default under Advanced options)
-        self.search_frame = ttk.Frame(self.packages_tab, padding=(0, 12))
-        # not packed by default
-        
-        ttk.Label(self.search_frame, text="Package ID:").pack(side=tk.LEFT, padx=(0, 12))
+        # Search, results and install-by-ID widgets are built on first use of Advanced options
         self.search_var = tk.StringVar()
-        ttk.Entry(self.search_frame, textvariable=self.search_var, width=40).pack(side=tk.LEFT, padx=5)
-        ttk.Button(self.search_frame, text="Search", command=self.search_package).pack(side=tk.LEFT, padx=5)
-        
-        # Results Frame (hidden by default under Advanced options)
-        self.results_frame = ttk.LabelFrame(self.packages_tab, text="Search Results", padding=(16, 12))
-        # not packed by default
-        
-        self.results_text = scrolledtext.ScrolledText(self.results_frame, height=14, width=90)
-        self.results_text.pack(fill=tk.BOTH, expand=True)
+        self.install_var = tk.StringVar()
+        self.live_search_var = tk.BooleanVar(value=True)
+        self.search_frame = None
+        self.search_debounce_ms = SEARCH_DEBOUNCE_MS
+        self._search_after_id = None
+        self._search_generation = 0
+        self.search_var.trace_add('write', self._on_search_typed)
         
         # Advanced Options (hide/install by ID)
         self.advanced_var = tk.BooleanVar(value=False)
         adv_chk = ttk.Checkbutton(self.packages_tab, text="Advanced options", variable=self.advanced_var, command=self.toggle_advanced)
         adv_chk.pack(anchor=tk.W, padx=24, pady=(12, 0))
         
-        # Install Frame (hidden by default; shows when Advanced options checked)
-        self.install_frame = ttk.Frame(self.packages_tab, padding=(0, 12))
-        ttk.Label(self.install_frame, text="Package ID to Install:").pack(side=tk.LEFT, padx=(0, 12))
-        self.install_var = tk.StringVar()
-        ttk.Entry(self.install_frame, textvariable=self.install_var, width=40).pack(side=tk.LEFT, padx=5)
-        ttk.Button(self.install_frame, text="Install", command=self.install_package).pack(side=tk.LEFT, padx=5)
-        # (not packed by default)
-        
         # Categories Frame
         self.categories_frame = ttk.LabelFrame(self.packages_tab, text="Categories", padding=(16, 12))
         self.categories_frame.pack(fill=tk.X, padx=24, pady=(12, 0))
         
-        self.categories = {
-            "Browsers": [
-                ("Google Chrome", "Google.Chrome"),
-                ("Firefox", "Mozilla.Firefox"),
-                ("Microsoft Edge", "Microsoft.Edge"),
-                ("Brave Browser", "Brave.Brave"),
-                ("Zen Browser", "ZenBrowser.Zen"),
-            ],
-            "Development": [
-                ("Visual Studio Code", "Microsoft.VisualStudioCode"),
-                ("Git", "Git.Git"),
-                ("Node.js", "OpenJS.NodeJS"),
-                ("Python", "Python.Python.3.12"),
-                ("OpenJDK", "EclipseAdoptium.Temurin.21.JDK"),
-                (".NET SDK", "Microsoft.DotNet.SDK.8"),
-                ("Docker Desktop", "Docker.DockerDesktop"),
-                ("Postman", "Postman.Postman"),
-                ("GitHub Desktop", "GitHub.GitHubDesktop"),
-            ],
-            "Media": [
-                ("VLC", "VideoLAN.VLC"),
-                ("Spotify", "Spotify.Spotify"),
-            ],
-            "Gaming": [
-                ("Steam", "Valve.Steam"),
-                ("Epic Games Launcher", "EpicGames.EpicGameLauncher"),
-                ("GOG Galaxy", "GOG.Galaxy"),
-                ("Discord", "Discord.Discord"),
-                ("OBS Studio", "OBSProject.OBSStudio"),
-            ],
-            "Utilities": [
-                ("7-Zip", "7zip.7zip"),
-                ("Notepad++", "Notepad++.Notepad++"),
-                ("PowerToys", "Microsoft.PowerToys"),
-                ("Everything", "voidtools.Everything"),
-                ("CPU-Z", "CPUID.CPU-Z"),
-                ("HWMonitor", "CPUID.HWMonitor"),
-                ("Process Explorer", "Microsoft.Sysinternals.ProcessExplorer"),
-                ("Autoruns", "Microsoft.Sysinternals.Autoruns"),
-                ("WinRAR", "RARLab.WinRAR"),
-            ],
-        }
-        
+        # Only the catalog manifests are read here; category files load when first shown
         cat_buttons_frame = ttk.Frame(self.categories_frame)
         cat_buttons_frame.pack(fill=tk.X)
-        for cat in self.categories.keys():
-            ttk.Button(cat_buttons_frame, text=cat, command=lambda c=cat: self.show_category(c)).pack(side=tk.LEFT, padx=5, pady=2) 
+        category_names = self.categories.keys()
+        if len(category_names) <= CATEGORY_BUTTON_LIMIT:
+            for cat in category_names:
+                ttk.Button(cat_buttons_frame, text=cat, command=lambda c=cat: self.show_category(c)).pack(side=tk.LEFT, padx=5, pady=2)
+        else:
+            # Large (e.g. IT-curated) catalogs: a drop-down instead of a row of buttons
+            self.category_var = tk.StringVar()
+            chooser = ttk.Combobox(cat_buttons_frame, textvariable=self.category_var, state='readonly', width=36,
+                                   values=[f"{cat} ({self.categories.count(cat)})" for cat in category_names])
+            chooser.pack(side=tk.LEFT, padx=5, pady=2)
+            chooser.bind('<<ComboboxSelected>>', lambda e: self.show_category(category_names[chooser.current()]))
+        # Filter every category by app name or ID
+        self.catalog_filter_var = tk.StringVar()
+        self._catalog_filter_after_id = None
+        self.catalog_filter_var.trace_add('write', self._on_catalog_filter_typed)
+        filter_entry = ttk.Entry(cat_buttons_frame, textvariable=self.catalog_filter_var, width=24)
+        filter_entry.pack(side=tk.RIGHT, padx=5, pady=2)
+        # Loading every category for the filter index starts when the box is first focused
+        filter_entry.bind('<FocusIn>', lambda e: threading.Thread(target=self.engine.catalog.warm, daemon=True).start())
+        ttk.Label(cat_buttons_frame, text="Filter:").pack(side=tk.RIGHT)
         
         # Category Apps Frame (shows apps for selected category)
         category_list_frame = ttk.LabelFrame(self.packages_tab, text="Category Apps", padding=(16, 12))
@@ -171,139 +576,640 @@ class WinGetGUI:
         
         self.apps_container = ttk.Frame(category_list_frame)
         self.apps_container.pack(fill=tk.X)
+        # Category views are built on first display and then swapped in and out
+        self._category_views = {}
+        self._current_category_view = None
+        self._current_category = None
+        self._filter_view = None
+        # Install scheduler and per-package row status (kept across category switches)
+        self._row_status_vars = {}
+        self._notify_jobs = set()  # single installs that report their outcome as a notification
+        self._row_notes = {}  # package ID -> badge text not backed by a job (e.g. skipped by a profile)
+        self.engine.add_job_listener(lambda job: self.pump.coalesce(('job', job.id), self._on_job_change, job))
+        self.engine.add_inventory_listener(lambda: self.pump.post(self._update_rows))
+        self.engine.launcher.add_listener(lambda process: self.pump.coalesce(('launch', id(process)), self._on_launch_change, process))
         # Show first category by default
-        self.show_category(list(self.categories.keys())[0])
+        if category_names:
+            self.show_category(category_names[0])
+        for path, message in self.engine.catalog.errors:
+            self.notify(f"Catalog file skipped ({path}): {message}", 'warning')
         
-        # Shortcuts Tab Content
-        self.shortcuts = {
-            "System Tools": [
-                ("Control Panel", "control"),
-                ("Task Manager", "taskmgr"),
-                ("System Settings", "start ms-settings:"),
-                ("Device Manager", "devmgmt.msc"),
-                ("Event Viewer", "eventvwr"),
-                ("Services", "services.msc"),
-                ("Registry Editor", "regedit"),
-            ],
-            "File Explorer": [
-                ("File Explorer", "explorer"),
-                ("This PC", "explorer /e,::{20D04FE0-3AEA-1069-A2D8-08002B30309D}"),
-                ("Documents", "explorer " + str(Path.home() / "Documents")),
-                ("Downloads", "explorer " + str(Path.home() / "Downloads")),
-                ("Desktop", "explorer " + str(Path.home() / "Desktop")),
-                ("Recycle Bin", "explorer shell:RecycleBinFolder"),
-            ],
-            "Apps": [
-                ("Calculator", "calc"),
-                ("Notepad", "notepad"),
-                ("Command Prompt", "cmd"),
-                ("PowerShell", "powershell"),
-                ("Paint", "mspaint"),
-                ("Snipping Tool", "snippingtool"),
-                ("WordPad", "write"),
-            ],
-        }
+        # Shortcuts Tab Content (from the catalog, read when the tab is first shown)
+        self.shortcuts = None
+        self.launched_view = None
+        self._launch_failures = set()
         
-        shortcuts_frame = ttk.LabelFrame(self.shortcuts_tab, text="Windows Shortcuts", padding=(16, 12))
-        shortcuts_frame.pack(fill=tk.BOTH, expand=True, padx=24, pady=(12, 24))
-        
-        for cat in self.shortcuts.keys():
-            cat_frame = ttk.LabelFrame(shortcuts_frame, text=cat, padding=(12, 8))
-            cat_frame.pack(fill=tk.X, pady=(0, 12))
-            for name, cmd in self.shortcuts[cat]:
-                ttk.Button(cat_frame, text=name, command=lambda c=cmd: self.run_shortcut(c)).pack(side=tk.LEFT, padx=(0, 12), pady=6)
+        # Built when the tab is first shown
+        self._shortcuts_built = False
+        self._diagnostics_built = False
+        self._upgrades_built = False
+        self._logs_built = False
+        self._logs_after_id = None
+        self.log_text = None
+        self._log_job_id = None
+        self._log_index = 0
+        self._upgrade_items = {}  # "manager:id" (the row iid) -> UpgradeItem shown in the Upgrades view
+        self._upgrade_jobs = {}  # "manager:id" -> the upgrade job queued from the view
+        self._diagnostics_after_id = None
+        self.notebook.bind('<<NotebookTabChanged>>', self._on_tab_changed)
         
         # Status
         self.status_var = tk.StringVar(value="Ready")
         ttk.Label(self.packages_tab, textvariable=self.status_var).pack(padx=24, pady=(12, 24))
 
-        # Configuration path for storing user settings (per-user)
-        local_appdata = os.getenv('LOCALAPPDATA') or str(Path.home() / 'AppData' / 'Local')
-        config_dir = Path(local_appdata) / 'WinGet Package Installer'
-        config_dir.mkdir(parents=True, exist_ok=True)
-        self.config_path = config_dir / 'settings.json'
+        self.profiler.mark('widget build')
+
         # Load persisted settings and apply theme (or follow system if configured)
         self.load_settings()
+        self.profiler.mark('settings load')
         if getattr(self, 'follow_system_var', None) and self.follow_system_var.get():
             self.toggle_follow_system()
         else:
             self.apply_theme(self.dark_mode_var.get())
+        self.profiler.mark('theme apply')
+        # Load the installed-package snapshot (re-listing if stale) for the row badges
+        threading.Thread(target=self.engine.refresh_inventory, daemon=True).start()
+        # Build/refresh the local package index in the background, then hourly
+        self.root.after(2000, self._schedule_index_refresh)
+        self._check_interrupted_batches()
     
-    def search_package(self):
+    def search_package(self, refresh=False, live=False):
         query = self.search_var.get()
-        if not query:
-            messagebox.showwarning("Input Error", "Enter a package name")
+        if not query.strip():
+            if not live:
+                self.notify("Enter a package name", 'warning')
             return
         
-        self.status_var.set("Searching...")
-        threading.Thread(target=self._search_thread, args=(query,), daemon=True).start()
-    
-    def _search_thread(self, query):
+        self._set_status("Searching...")
         manager = self.package_manager_var.get()
-        try:
-            if manager == 'chocolatey':
-                result = subprocess.run(
-                    ["choco", "search", query],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-            else:  # winget
-                result = subprocess.run(
-                    ["winget", "search", query],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-            self.results_text.delete(1.0, tk.END)
-            self.results_text.insert(tk.END, result.stdout)
-            self.status_var.set("Search complete")
-        except Exception as e:
-            self.results_text.delete(1.0, tk.END)
-            self.results_text.insert(tk.END, f"Error: {str(e)}")
-            self.status_var.set("Error")
+        # A newer search supersedes the one in flight: kill its child and ignore its results
+        self.cancel_search()
+        self._search_generation += 1
+        threading.Thread(target=self._search_thread, args=(query, manager, refresh, self._search_generation), daemon=True).start()
+
+    def _on_search_typed(self, *args):
+        """Debounce edits of the search box into a single live search."""
+        if not self.live_search_var.get():
+            return
+        if self._search_after_id is not None:
+            try:
+                self.root.after_cancel(self._search_after_id)
+            except Exception:
+                pass
+        self._search_after_id = self.root.after(self.search_debounce_ms, self._run_live_search)
+
+    def _run_live_search(self):
+        self._search_after_id = None
+        self.search_package(live=True)
+
+    def cancel_search(self):
+        """Kill the running search child processes, keeping the rows already shown."""
+        self.engine.cancel_searches()
     
+    def _search_thread(self, query, manager=None, refresh=False, generation=None):
+        manager = manager or self.package_manager_var.get()
+        if manager == 'all':
+            self._search_all_thread(query, refresh, generation)
+            return
+
+        def on_records(records):
+            self.pump.post(self._show_search_results, generation, records, True)
+
+        self.pump.post(self._show_search_results, generation, [])
+        records, status, how, error = self.engine.search(
+            manager, query, refresh, on_records, lambda: self._is_current_search(generation))
+        if self._is_current_search(generation):
+            self._set_status(self._search_status_text(status, how, error, len(records)))
+
+    def _search_all_thread(self, query, refresh, generation):
+        """Search every manager concurrently and merge the results as each one reports."""
+        outcomes = {}
+        self.pump.post(self._show_search_results, generation, [])
+
+        def on_update(rows):
+            self.pump.coalesce(('search', generation), self._show_search_results, generation, rows)
+
+        def on_manager_done(manager, status, seconds, merger):
+            outcomes[manager] = (status, seconds)
+            if self._is_current_search(generation):
+                done = ", ".join(f"{m} {'✓' if st == 'complete' else st} {t:.1f}s" for m, (st, t) in outcomes.items())
+                pending = len(SEARCH_MANAGERS) - len(outcomes)
+                total = len(merger.rows())
+                suffix = f", waiting for {pending} more" if pending else ""
+                self._set_status(f"Search: {total} packages ({done}{suffix})")
+
+        self.engine.search_all(query, refresh, on_update, on_manager_done,
+                               lambda: self._is_current_search(generation))
+
+    @staticmethod
+    def _search_status_text(status, how, error, count):
+        if status == 'complete':
+            return f"Search complete ({how}): {count} packages" if how else f"Search complete: {count} packages"
+        if status == 'timeout':
+            return f"Search timed out after {SEARCH_TIMEOUT}s: showing {count} packages received"
+        if status == 'cancelled':
+            return f"Search cancelled: {count} packages received"
+        return f"Error: {error}"
+    
+    def _is_current_search(self, generation):
+        return generation is None or generation == self._search_generation
+
+    def _show_search_results(self, generation, records, append=False):
+        """Main-thread half of a search: drop results from superseded searches."""
+        if not self._is_current_search(generation):
+            return
+        if append:
+            self.results_view.append_records(records)
+        else:
+            self.results_view.set_records(records)
+
+    def _set_status(self, text):
+        """Thread-safe, coalesced status line update."""
+        self.pump.coalesce('status', self.status_var.set, text)
+
+    def notify(self, message, level='info'):
+        """Thread-safe, non-blocking notification (replaces message boxes)."""
+        self.pump.post(self.notifications.show, message, level)
+
+    def refresh_package_index(self, force=False):
+        """Rebuild stale manager catalogs in the local index on a background thread."""
+        self.engine.refresh_index(force)
+
+    def _schedule_index_refresh(self):
+        self.refresh_package_index()
+        threading.Thread(target=self.engine.warm_index, daemon=True).start()
+        try:
+            self.root.after(3600 * 1000, self._schedule_index_refresh)
+        except Exception:
+            pass
+
     def install_package(self):
         package = self.install_var.get()
         if not package:
-            messagebox.showwarning("Input Error", "Enter a package ID")
+            self.notify("Enter a package ID", 'warning')
             return
         
-        self.status_var.set(f"Installing {package}...")
-        threading.Thread(target=self._install_thread, args=(package,), daemon=True).start()
-    
-    def _install_thread(self, package):
+        self._set_status(f"Installing {package}...")
+        self._submit_install(package, PRIORITY_HIGH, notify=True)
+
+    def _install_manager(self):
+        """Manager used for installs; the "All" search mode installs through winget."""
         manager = self.package_manager_var.get()
+        return 'winget' if manager == 'all' else manager
+
+    def _submit_install(self, package, priority=PRIORITY_NORMAL, notify=False):
+        """Queue an install on the scheduler unless the package is already queued or running."""
+        self._row_notes.pop(package, None)
+        job = self.engine.submit_install(package, self._install_manager(), priority)
+        if notify:
+            self._notify_jobs.add(job.id)
+        return job
+
+    def _on_job_change(self, job):
+        """Scheduler callback (via the UI pump): update row badges and the aggregate status line."""
+        for package in job.packages:
+            self._update_row(package)
+            if job.kind == 'upgrade':
+                self._update_upgrade_row(job.manager, package)
+        if job.state in JOB_FINISHED_STATES and job.id in self._notify_jobs:
+            self._notify_jobs.discard(job.id)
+            if job.state == JOB_SUCCEEDED:
+                self.notify(f"{job.packages[0]} installed successfully!", 'success')
+            elif job.state == JOB_FAILED:
+                self.notify(f"Failed to install {job.packages[0]}", 'error')
+        active = self.scheduler.active_jobs()
+        if active:
+            running = sum(1 for j in active if j.state == JOB_RUNNING)
+            self._set_status(f"Installing: {running} running, {len(active) - running} queued")
+        elif job.state in JOB_FINISHED_STATES:
+            names = ", ".join(job.packages)
+            if job.state == JOB_SUCCEEDED:
+                self._set_status(f"✓ {names} installed successfully")
+            elif job.state == JOB_FAILED:
+                self._set_status(f"Installation failed: {names}")
+            else:
+                self._set_status("Ready")
+
+    def _update_row(self, package):
+        """Set a category row's badge from its job state, falling back to installed state."""
+        labels = {
+            JOB_QUEUED: "Queued",
+            PACKAGE_DOWNLOADING: "Downloading...",
+            PACKAGE_DOWNLOADED: "Downloaded",
+            JOB_RUNNING: "Installing...",
+            JOB_FAILED: "✗ Failed",
+            JOB_CANCELLED: "Cancelled",
+        }
+        job = self.engine.package_jobs.get(package)
+        state = job.package_state(package) if job is not None else None
+        info = self.inventory.get(job.manager if job is not None else self._install_manager(), package)
+        if package in self._row_notes:
+            text = self._row_notes[package]
+        elif state in labels:
+            text = labels[state]
+        elif info is not None and info.get("available"):
+            text = f"⬆ {info['version']} → {info['available']}"
+        elif info is not None:
+            text = f"✓ Installed {info['version']}".rstrip()
+        elif state == JOB_SUCCEEDED:
+            text = "✓ Installed"
+        else:
+            text = ""
+        var = self._row_status_var(package)
+        if var.get() != text:
+            var.set(text)
+
+    def _update_rows(self):
+        for package in list(self._row_status_vars):
+            self._update_row(package)
+
+    def refresh_inventory(self):
+        """Re-list installed packages for every manager in the background."""
+        threading.Thread(target=self.engine.refresh_inventory, kwargs={'force': True}, daemon=True).start()
+
+    def _row_status_var(self, package):
+        var = self._row_status_vars.get(package)
+        if var is None:
+            var = self._row_status_vars[package] = tk.StringVar(value="")
+        return var
+
+    def _set_choco_concurrency(self):
         try:
-            if manager == 'chocolatey':
-                subprocess.run(
-                    ["choco", "install", package, "-y"],
-                    check=True,
-                    timeout=300
-                )
-            else:  # winget
-                subprocess.run(
-                    ["winget", "install", "-e", "--id", package, "--accept-package-agreements", "--accept-source-agreements"],
-                    check=True,
-                    timeout=300
-                )
-            self.status_var.set(f"✓ {package} installed successfully")
-            messagebox.showinfo("Success", f"{package} installed successfully!")
-        except subprocess.CalledProcessError:
-            self.status_var.set("Installation failed")
-            messagebox.showerror("Error", f"Failed to install {package}")
+            self.scheduler.set_limit('chocolatey', self.choco_jobs_var.get())
+        except Exception:
+            return
+        self.save_settings()
+
+    def _build_advanced(self):
+        """Create the search, results and install-by-ID frames (first use of Advanced options)."""
+        self.search_frame = ttk.Frame(self.packages_tab, padding=(0, 12))
+        ttk.Label(self.search_frame, text="Package ID:").pack(side=tk.LEFT, padx=(0, 12))
+        ttk.Entry(self.search_frame, textvariable=self.search_var, width=40).pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.search_frame, text="Search", command=self.search_package).pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.search_frame, text="Refresh", command=lambda: self.search_package(refresh=True)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.search_frame, text="Cancel", command=self.cancel_search).pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.search_frame, text="Rebuild Index", command=lambda: self.refresh_package_index(force=True)).pack(side=tk.LEFT, padx=5)
+        # Live search: rerun the search shortly after the user stops typing
+        ttk.Checkbutton(self.search_frame, text="Search as you type", variable=self.live_search_var, command=self.save_settings).pack(side=tk.LEFT, padx=5)
+
+        self.results_frame = ttk.LabelFrame(self.packages_tab, text="Search Results", padding=(16, 12))
+        # Double-click a result to fill in the install box
+        self.results_view = VirtualTreeview(
+            self.results_frame,
+            columns=[('name', 'Name', 260), ('id', 'Id', 260), ('version', 'Version', 120),
+                     ('match', 'Match', 160), ('source', 'Source', 90)],
+            height=14,
+            on_activate=lambda record: self.install_var.set(record.id),
+        )
+        self.results_view.pack(fill=tk.BOTH, expand=True)
+
+        self.install_frame = ttk.Frame(self.packages_tab, padding=(0, 12))
+        ttk.Label(self.install_frame, text="Package ID to Install:").pack(side=tk.LEFT, padx=(0, 12))
+        ttk.Entry(self.install_frame, textvariable=self.install_var, width=40).pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.install_frame, text="Install", command=self.install_package).pack(side=tk.LEFT, padx=5)
+
+    def _on_tab_changed(self, event=None):
+        try:
+            selected = self.notebook.nametowidget(self.notebook.select())
+        except Exception:
+            return
+        if selected is self.shortcuts_tab and not self._shortcuts_built:
+            self._build_shortcuts_tab()
+        if selected is self.logs_tab:
+            if not self._logs_built:
+                self._build_logs_tab()
+            self._refresh_logs()
+        if selected is self.upgrades_tab and not self._upgrades_built:
+            self._build_upgrades_tab()
+            self.check_upgrades()
+        if selected is self.diagnostics_tab:
+            if not self._diagnostics_built:
+                self._build_diagnostics_tab()
+            self._refresh_diagnostics()
+
+    def _build_shortcuts_tab(self):
+        self._shortcuts_built = True
+        shortcuts_frame = ttk.LabelFrame(self.shortcuts_tab, text="Windows Shortcuts", padding=(16, 12))
+        shortcuts_frame.pack(fill=tk.BOTH, expand=True, padx=24, pady=(12, 24))
+        if self.shortcuts is None:
+            self.shortcuts = self.engine.catalog.shortcuts()
+        
+        for cat in self.shortcuts.keys():
+            cat_frame = ttk.LabelFrame(shortcuts_frame, text=cat, padding=(12, 8))
+            cat_frame.pack(fill=tk.X, pady=(0, 12))
+            for name, cmd in self.shortcuts[cat]:
+                ttk.Button(cat_frame, text=name, command=lambda c=cmd, n=name: self.run_shortcut(c, n)).pack(side=tk.LEFT, padx=(0, 12), pady=6)
+
+        # Processes started from this tab (running ones, then recent exits)
+        launched_frame = ttk.LabelFrame(self.shortcuts_tab, text="Launched", padding=(16, 12))
+        launched_frame.pack(fill=tk.X, padx=24, pady=(0, 24))
+        columns = [('name', 'Name', 160), ('pid', 'PID', 70), ('started', 'Started', 90),
+                   ('status', 'Status', 220), ('spawn_ms', 'Spawn (ms)', 90)]
+        self.launched_view = ttk.Treeview(launched_frame, columns=[c for c, _, _ in columns], show='headings', height=5)
+        for field, title, width in columns:
+            self.launched_view.heading(field, text=title)
+            self.launched_view.column(field, width=width, anchor=tk.W)
+        self.launched_view.pack(fill=tk.X)
+        self._refresh_launched()
+
+    def _build_logs_tab(self):
+        self._logs_built = True
+        pane = ttk.PanedWindow(self.logs_tab, orient=tk.HORIZONTAL)
+        pane.pack(fill=tk.BOTH, expand=True, padx=24, pady=12)
+        left = ttk.Frame(pane)
+        columns = [('id', '#', 45), ('kind', 'Kind', 60), ('packages', 'Packages', 200), ('state', 'State', 80)]
+        self.logs_jobs = ttk.Treeview(left, columns=[c for c, _, _ in columns], show='headings', selectmode='browse')
+        for field, title, width in columns:
+            self.logs_jobs.heading(field, text=title)
+            self.logs_jobs.column(field, width=width, anchor=tk.W)
+        self.logs_jobs.pack(fill=tk.BOTH, expand=True)
+        self.logs_jobs.bind('<<TreeviewSelect>>', lambda e: self._select_log_job())
+        pane.add(left, weight=1)
+
+        right = ttk.Frame(pane)
+        top = ttk.Frame(right)
+        top.pack(fill=tk.X, pady=(0, 6))
+        self.log_follow_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(top, text="Follow", variable=self.log_follow_var).pack(side=tk.LEFT)
+        ttk.Button(top, text="Open Log File", command=self.open_job_log_file).pack(side=tk.LEFT, padx=5)
+        self.log_path_var = tk.StringVar()
+        ttk.Label(top, textvariable=self.log_path_var).pack(side=tk.LEFT, padx=(10, 0))
+        colors = getattr(self, '_theme_colors', None) or {}
+        self.log_text = tk.Text(right, wrap=tk.NONE, height=20, font=('Consolas', 9),
+                                bg=colors.get('text_bg', 'white'), fg=colors.get('fg', 'black'))
+        scrollbar = ttk.Scrollbar(right, orient=tk.VERTICAL, command=self.log_text.yview)
+        self.log_text.configure(yscrollcommand=scrollbar.set, state=tk.DISABLED)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.log_text.pack(fill=tk.BOTH, expand=True)
+        pane.add(right, weight=3)
+
+    def _refresh_logs(self):
+        """Update the job list and append new lines of the followed job, every 500ms while the tab is shown."""
+        if self._logs_after_id is not None:
+            try:
+                self.root.after_cancel(self._logs_after_id)
+            except Exception:
+                pass
+            self._logs_after_id = None
+        try:
+            if self.notebook.nametowidget(self.notebook.select()) is not self.logs_tab:
+                return
+        except Exception:
+            return
+        jobs = self.scheduler.recent_jobs(100)
+        view = self.logs_jobs
+        wanted = [str(job.id) for job in jobs]
+        for iid in set(view.get_children()) - set(wanted):
+            view.delete(iid)
+        for index, job in enumerate(jobs):
+            values = [job.id, job.kind, ' '.join(job.packages), job.state]
+            if view.exists(str(job.id)):
+                if list(view.item(str(job.id), 'values')) != [str(v) for v in values]:
+                    view.item(str(job.id), values=values)
+            else:
+                view.insert('', index, iid=str(job.id), values=values)
+        if self._log_job_id is None and jobs:
+            view.selection_set(str(jobs[0].id))  # follow the newest job until one is picked
+        self._append_log_lines()
+        self._logs_after_id = self.root.after(500, self._refresh_logs)
+
+    def _select_log_job(self):
+        selection = self.logs_jobs.selection()
+        if not selection or selection[0] == str(self._log_job_id):
+            return
+        self._log_job_id = int(selection[0])
+        self._log_index = 0
+        self.log_text.configure(state=tk.NORMAL)
+        self.log_text.delete('1.0', tk.END)
+        self.log_text.configure(state=tk.DISABLED)
+        job = self.scheduler.jobs.get(self._log_job_id)
+        self.log_path_var.set(job.log_path if job is not None and job.log_path else '')
+        if self.engine.job_logs.get(self._log_job_id) is None and job is not None and job.log_path:
+            # No longer in memory: show the end of the file once
+            self._insert_log_lines(JobLogs.tail_file(job.log_path))
+        self._append_log_lines()
+
+    def _append_log_lines(self):
+        log = self.engine.job_logs.get(self._log_job_id) if self._log_job_id is not None else None
+        if log is None:
+            return
+        lines, self._log_index, skipped = log.read_since(self._log_index)
+        if skipped:
+            lines = [f"... {skipped} earlier lines in the log file ..."] + lines
+        self._insert_log_lines(lines)
+
+    def _insert_log_lines(self, lines):
+        if not lines:
+            return
+        text = self.log_text
+        text.configure(state=tk.NORMAL)
+        text.insert(tk.END, '\n'.join(lines) + '\n')
+        # Only the tail stays in the widget, however long the job runs
+        excess = int(text.index('end-1c').split('.')[0]) - 1 - JOB_LOG_TAIL_LINES
+        if excess > 0:
+            text.delete('1.0', f'{excess + 1}.0')
+        text.configure(state=tk.DISABLED)
+        if self.log_follow_var.get():
+            text.see(tk.END)
+
+    def open_job_log_file(self):
+        path = self.log_path_var.get()
+        if path:
+            self.engine.launcher.launch(Path(path).name, f'notepad "{path}"' if sys.platform == 'win32' else f'xdg-open "{path}"')
+
+    def _build_upgrades_tab(self):
+        self._upgrades_built = True
+        top = ttk.Frame(self.upgrades_tab, padding=(24, 12, 24, 0))
+        top.pack(fill=tk.X)
+        ttk.Button(top, text="Check Now", command=lambda: self.check_upgrades(refresh=True)).pack(side=tk.LEFT)
+        ttk.Button(top, text="Upgrade Selected", command=lambda: self.upgrade_packages(self.upgrades_view.selection())).pack(side=tk.LEFT, padx=5)
+        ttk.Button(top, text="Upgrade All", command=lambda: self.upgrade_packages(list(self._upgrade_items))).pack(side=tk.LEFT)
+        self.upgrades_status_var = tk.StringVar()
+        ttk.Label(top, textvariable=self.upgrades_status_var).pack(side=tk.LEFT, padx=(20, 0))
+
+        frame = ttk.Frame(self.upgrades_tab, padding=(24, 12, 24, 24))
+        frame.pack(fill=tk.BOTH, expand=True)
+        columns = [('manager', 'Manager', 100), ('id', 'Id', 300), ('version', 'Installed', 120),
+                   ('available', 'Available', 120), ('status', 'Status', 140)]
+        self.upgrades_view = ttk.Treeview(frame, columns=[c for c, _, _ in columns], show='headings', selectmode='extended')
+        for field, title, width in columns:
+            self.upgrades_view.heading(field, text=title)
+            self.upgrades_view.column(field, width=width, anchor=tk.W)
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.upgrades_view.yview)
+        self.upgrades_view.configure(yscrollcommand=scrollbar.set)
+        self.upgrades_view.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+    def check_upgrades(self, refresh=False):
+        """Plan upgrades off the UI thread (one outdated listing per manager when stale or ``refresh``)."""
+        self.upgrades_status_var.set("Checking for upgrades...")
+
+        def work():
+            plan = self.engine.plan_upgrades(refresh=refresh)
+            self.pump.post(self._show_upgrades, plan)
+
+        threading.Thread(target=work, daemon=True).start()
+
+    def _show_upgrades(self, plan):
+        # winget and Chocolatey can both report the same ID, so rows are keyed by manager too
+        self._upgrade_items = {self._upgrade_key(item.manager, item.id): item for item in plan}
+        view = self.upgrades_view
+        view.delete(*view.get_children())
+        for key, item in self._upgrade_items.items():
+            view.insert('', tk.END, iid=key, values=[item.manager, item.id, item.version, item.available, ''])
+            self._update_upgrade_row(item.manager, item.id)
+        checked = [t for t in (self.engine.upgrades.checked(m) for m in SEARCH_MANAGERS) if t]
+        when = time.strftime('%H:%M', time.localtime(min(checked))) if checked else "never"
+        self.upgrades_status_var.set(f"{len(plan)} upgrade(s) available (checked {when})" if plan
+                                     else f"Everything is up to date (checked {when})")
+
+    @staticmethod
+    def _upgrade_key(manager, package):
+        return f"{manager}:{package}"
+
+    def _update_upgrade_row(self, manager, package):
+        key = self._upgrade_key(manager, package)
+        if not self._upgrades_built or not self.upgrades_view.exists(key):
+            return
+        labels = {JOB_QUEUED: "Queued", JOB_RUNNING: "Upgrading...", JOB_SUCCEEDED: "✓ Upgraded",
+                  JOB_FAILED: "✗ Failed", JOB_CANCELLED: "Cancelled"}
+        # engine.package_jobs is keyed by ID alone, so look in the jobs this view queued first
+        job = self._upgrade_jobs.get(key) or self.engine.package_jobs.get(package)
+        upgrading = job is not None and job.kind == 'upgrade' and job.manager == manager
+        self.upgrades_view.set(key, 'status', labels.get(job.package_state(package), '') if upgrading else '')
+
+    def upgrade_packages(self, keys):
+        """Queue upgrades through the install scheduler (same per-manager limits as installs)."""
+        items = [self._upgrade_items[k] for k in keys if k in self._upgrade_items]
+        if not items:
+            return
+        jobs = self.engine.submit_upgrades(items)
+        for job in jobs:
+            self._upgrade_jobs[self._upgrade_key(job.manager, job.packages[0])] = job
+
+        def wait():
+            self.engine.wait(jobs)
+            failed = [job.packages[0] for job in jobs if job.state != JOB_SUCCEEDED]
+            if failed:
+                self.notify(f"{len(failed)} of {len(jobs)} upgrades failed ({', '.join(failed)})", 'error')
+            else:
+                self.notify(f"{len(jobs)} package(s) upgraded", 'success')
+
+        threading.Thread(target=wait, daemon=True).start()
+
+    def _build_diagnostics_tab(self):
+        self._diagnostics_built = True
+        top = ttk.Frame(self.diagnostics_tab, padding=(24, 12, 24, 0))
+        top.pack(fill=tk.X)
+        ttk.Button(top, text="Refresh", command=self._refresh_diagnostics).pack(side=tk.LEFT)
+        ttk.Button(top, text="Export...", command=self.export_diagnostics).pack(side=tk.LEFT, padx=5)
+        ttk.Label(top, text=f"Log: {self.engine.command_log.path}").pack(side=tk.LEFT, padx=(20, 0))
+        ttk.Button(top, text="Clear Installer Cache", command=self.clear_installer_cache).pack(side=tk.RIGHT)
+        self.diagnostics_cache_var = tk.StringVar()
+        ttk.Label(top, textvariable=self.diagnostics_cache_var).pack(side=tk.RIGHT, padx=(0, 10))
+
+        summary_frame = ttk.LabelFrame(self.diagnostics_tab, text="Latency by manager and operation (this session)", padding=(16, 12))
+        summary_frame.pack(fill=tk.X, padx=24, pady=(12, 0))
+        columns = [('manager', 'Manager', 100), ('operation', 'Operation', 120), ('count', 'Calls', 60),
+                   ('failed', 'Failed', 60), ('timeout', 'Timeouts', 70), ('cancelled', 'Cancelled', 70),
+                   ('p50_ms', 'p50 (ms)', 90), ('p95_ms', 'p95 (ms)', 90), ('max_ms', 'Max (ms)', 90)]
+        self.diagnostics_summary = ttk.Treeview(summary_frame, columns=[c for c, _, _ in columns], show='headings', height=6)
+        for field, title, width in columns:
+            self.diagnostics_summary.heading(field, text=title)
+            self.diagnostics_summary.column(field, width=width, anchor=tk.W)
+        self.diagnostics_summary.pack(fill=tk.X)
+
+        recent_frame = ttk.LabelFrame(self.diagnostics_tab, text="Recent commands", padding=(16, 12))
+        recent_frame.pack(fill=tk.BOTH, expand=True, padx=24, pady=(12, 24))
+        columns = [('time', 'Time', 110), ('operation', 'Operation', 100), ('duration_ms', 'ms', 80),
+                   ('returncode', 'Exit', 50), ('output_bytes', 'Bytes', 80), ('status', 'Status', 80),
+                   ('command', 'Command', 420)]
+        self.diagnostics_recent = ttk.Treeview(recent_frame, columns=[c for c, _, _ in columns], show='headings', height=12)
+        for field, title, width in columns:
+            self.diagnostics_recent.heading(field, text=title)
+            self.diagnostics_recent.column(field, width=width, anchor=tk.W)
+        self.diagnostics_recent.pack(fill=tk.BOTH, expand=True)
+
+    def _refresh_diagnostics(self):
+        """Redraw the Diagnostics tab, then again every 2s while it stays selected."""
+        if self._diagnostics_after_id is not None:
+            try:
+                self.root.after_cancel(self._diagnostics_after_id)
+            except Exception:
+                pass
+            self._diagnostics_after_id = None
+        try:
+            if self.notebook.nametowidget(self.notebook.select()) is not self.diagnostics_tab:
+                return
+        except Exception:
+            return
+        log = self.engine.command_log
+        cache = self.engine.artifact_cache.stats()
+        self.diagnostics_cache_var.set(f"Installer cache: {cache['entries']} packages, "
+                                       f"{cache['bytes'] / 1048576:.0f} / {cache['max_bytes'] / 1048576:.0f} MB"
+                                       + ("" if cache['enabled'] else " (off)"))
+        self.diagnostics_summary.delete(*self.diagnostics_summary.get_children())
+        for row in log.summary():
+            self.diagnostics_summary.insert('', tk.END, values=[row[c] for c in self.diagnostics_summary['columns']])
+        self.diagnostics_recent.delete(*self.diagnostics_recent.get_children())
+        for entry in reversed(log.recent(100)):
+            values = dict(entry, time=entry["time"][11:23], command=' '.join(entry["command"]))
+            self.diagnostics_recent.insert('', tk.END, values=[values[c] for c in self.diagnostics_recent['columns']])
+        self._diagnostics_after_id = self.root.after(2000, self._refresh_diagnostics)
+
+    def export_diagnostics(self):
+        """Save the latency summary and the retained command log as one JSON file."""
+        path = filedialog.asksaveasfilename(title="Export Diagnostics", defaultextension=".json",
+                                            initialfile="winget-installer-diagnostics.json",
+                                            filetypes=[("JSON", "*.json"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            self.engine.command_log.export(path)
+            self.notify(f"Diagnostics exported to {path}", 'success')
         except Exception as e:
-            self.status_var.set("Error")
-            messagebox.showerror("Error", str(e))
+            self.notify(f"Could not export diagnostics: {e}", 'error')
+
+    def choose_cache_folder(self):
+        """Point the installer cache at another folder, e.g. a share used by several machines."""
+        path = filedialog.askdirectory(title="Installer Cache Folder", initialdir=str(self.engine.artifact_cache.root))
+        if not path:
+            return
+        self.engine.artifact_cache.root = Path(path)
+        self.save_settings()
+        self.notify(f"Installers are now cached in {path}", 'info')
+
+    def clear_installer_cache(self):
+        threading.Thread(target=self.engine.artifact_cache.clear, daemon=True).start()
+        self.notify("Installer cache cleared", 'info')
+
+    def finish_startup_profile(self):
+        """Close the 'first paint' phase and report the startup breakdown."""
+        self.root.update_idletasks()
+        self.profiler.mark('first paint')
+        report = self.profiler.report()
+        try:
+            print(report)
+        except Exception:
+            pass  # no console in the --noconsole build
+        try:
+            self.config_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.config_dir / 'startup_profile.json', "w", encoding="utf-8") as f:
+                json.dump(self.profiler.as_dict(), f, indent=2)
+        except Exception:
+            pass
+        self.notify(f"Startup: {self.profiler.total_ms():.0f} ms to first frame (details in startup_profile.json)")
 
     def toggle_advanced(self):
         # Show or hide advanced controls: manual ID install, search, and results
+        if self.advanced_var.get() and self.search_frame is None:
+            self._build_advanced()
         if self.advanced_var.get():
             # pack search and results before categories frame to keep order
             self.search_frame.pack(fill=tk.X, before=self.categories_frame)
             self.results_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5, before=self.categories_frame)
             self.install_frame.pack(fill=tk.X)
-        else:
+        elif self.search_frame is not None:
             self.install_frame.pack_forget()
             self.search_frame.pack_forget()
             self.results_frame.pack_forget()
@@ -316,65 +1222,258 @@ class WinGetGUI:
             pass
 
     def save_settings(self):
-        try:
-            data = {"dark_mode": bool(self.dark_mode_var.get()), "follow_system": bool(getattr(self, 'follow_system_var', tk.BooleanVar(value=False)).get())}
-            with open(self.config_path, "w", encoding="utf-8") as f:
-                json.dump(data, f)
-        except Exception:
-            pass
+        """Record the current settings; the store writes them in the background."""
+        data = {"dark_mode": bool(self.dark_mode_var.get()), "follow_system": bool(getattr(self, 'follow_system_var', tk.BooleanVar(value=False)).get())}
+        data["batch_mode"] = bool(self.batch_mode_var.get())
+        data["pipeline_mode"] = bool(self.pipeline_mode_var.get())
+        data["live_search"] = bool(self.live_search_var.get())
+        data["search_debounce_ms"] = self.search_debounce_ms
+        data.update(self.engine.settings_values())
+        self.settings.update(data)
 
     def load_settings(self):
+        settings = self.settings
         try:
-            if self.config_path.exists():
-                with open(self.config_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                dark = data.get("dark_mode", False)
-                follow = data.get("follow_system", False)
-                self.dark_mode_var.set(dark)
-                try:
-                    self.theme_var.set('dark' if dark else 'light')
-                except Exception:
-                    pass
-                # follow_system_var should exist already; set it if present
-                if getattr(self, 'follow_system_var', None) is not None:
-                    self.follow_system_var.set(follow)
-        except Exception:
-            pass
+            self.engine.apply_settings()
+            dark = settings.get("dark_mode", False)
+            follow = settings.get("follow_system", False)
+            self.dark_mode_var.set(dark)
+            try:
+                self.theme_var.set('dark' if dark else 'light')
+            except Exception:
+                pass
+            # follow_system_var should exist already; set it if present
+            if getattr(self, 'follow_system_var', None) is not None:
+                self.follow_system_var.set(follow)
+            self.choco_jobs_var.set(self.scheduler.get_limit('chocolatey'))
+            self.batch_mode_var.set(bool(settings.get("batch_mode", False)))
+            self.pipeline_mode_var.set(bool(settings.get("pipeline_mode", False)))
+            self.live_search_var.set(bool(settings.get("live_search", True)))
+            self.search_debounce_ms = int(settings.get("search_debounce_ms", self.search_debounce_ms))
+        except Exception as e:
+            self.notify(f"Some settings could not be applied: {e}", 'warning')
+        if settings.last_error:
+            self.notify(f"{settings.last_error}; using defaults", 'warning')
 
     def show_category(self, category_name):
-        # Clear previous
-        for widget in self.apps_container.winfo_children():
-            widget.destroy()
+        if self._filter_view is not None and self.catalog_filter_var.get():
+            self.catalog_filter_var.set("")  # clears the filter view via the trace
+        self._current_category = category_name
+        view = self._category_views.get(category_name)
+        if view is None:
+            view = self._category_views[category_name] = self._build_category_view(category_name)
+        self._show_apps_view(view)
+
+    def _show_apps_view(self, view):
+        if view is not self._current_category_view:
+            if self._current_category_view is not None:
+                self._current_category_view.pack_forget()
+            view.pack(fill=tk.X)
+            self._current_category_view = view
+        if self._filter_view is not None and view is not self._filter_view:
+            self._filter_view.destroy()
+            self._filter_view = None
+
+    def _build_category_view(self, category_name):
+        view = ttk.Frame(self.apps_container)
         apps = self.categories.get(category_name, [])
         if not apps:
-            ttk.Label(self.apps_container, text="No apps in this category").pack()
-            return
-        top_frame = ttk.Frame(self.apps_container)
+            ttk.Label(view, text="No apps in this category").pack()
+            return view
+        top_frame = ttk.Frame(view)
         top_frame.pack(fill=tk.X)
         ttk.Label(top_frame, text=f"Apps in {category_name}:").pack(side=tk.LEFT)
         ttk.Button(top_frame, text="Install All", command=lambda: self.install_category_all(category_name)).pack(side=tk.RIGHT)
-        for name, pkgid in apps:
-            row = ttk.Frame(self.apps_container)
+        ttk.Button(top_frame, text="Cancel Queued", command=lambda: self.cancel_category(category_name)).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(top_frame, text="Refresh Installed", command=self.refresh_inventory).pack(side=tk.RIGHT, padx=5)
+        self._add_app_rows(view, [(app.name, app.id) for app in apps])
+        return view
+
+    def _add_app_rows(self, view, items):
+        """Rows of (display name, package ID) with status badge and Install button."""
+        for name, pkgid in items:
+            self._update_row(pkgid)
+        if len(items) > VIRTUAL_LIST_THRESHOLD:
+            VirtualRowList(view, items, self._row_status_var, self._install_from_category).pack(fill=tk.BOTH, expand=True)
+            return
+        for name, pkgid in items:
+            row = ttk.Frame(view)
             row.pack(fill=tk.X, pady=2)
             ttk.Label(row, text=name).pack(side=tk.LEFT, padx=5)
             ttk.Button(row, text="Install", command=lambda p=pkgid, n=name: self._install_from_category(p, n)).pack(side=tk.RIGHT, padx=5)
+            ttk.Label(row, textvariable=self._row_status_var(pkgid)).pack(side=tk.RIGHT, padx=5)
+
+    def _on_catalog_filter_typed(self, *args):
+        if self._catalog_filter_after_id is not None:
+            try:
+                self.root.after_cancel(self._catalog_filter_after_id)
+            except Exception:
+                pass
+        self._catalog_filter_after_id = self.root.after(self.search_debounce_ms, self._apply_catalog_filter)
+
+    def _apply_catalog_filter(self):
+        """Show catalog apps matching the filter text across all categories."""
+        self._catalog_filter_after_id = None
+        text = self.catalog_filter_var.get().strip()
+        if not text:
+            if self._current_category is not None:
+                self.show_category(self._current_category)
+            return
+
+        def run():
+            self.pump.post(self._show_catalog_matches, text, self.engine.catalog.search(text))
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _show_catalog_matches(self, text, matches):
+        if text != self.catalog_filter_var.get().strip():
+            return  # superseded by further typing
+        view = ttk.Frame(self.apps_container)
+        suffix = "" if len(matches) < 200 else " (first 200)"
+        ttk.Label(view, text=f"{len(matches)} apps matching \"{text}\"{suffix}:").pack(anchor=tk.W)
+        self._add_app_rows(view, [(f"{app.name}  ·  {category}", app.id) for category, app in matches])
+        previous = self._filter_view
+        self._filter_view = view
+        self._show_apps_view(view)
+        if previous is not None:
+            previous.destroy()
 
     def install_category_all(self, category_name):
-        apps = self.categories.get(category_name, [])
+        apps = self.categories.get(category_name)
         if not apps:
             return
-        for name, pkgid in apps:
-            threading.Thread(target=self._install_thread, args=(pkgid,), daemon=True).start()
-
-    def _install_from_category(self, package, display_name):
-        self.status_var.set(f"Installing {display_name}...")
-        threading.Thread(target=self._install_thread, args=(package,), daemon=True).start()
+        # Already-installed packages are skipped; use the row's Install button to force one
+        manager = self._install_manager()
+        if self.batch_mode_var.get() or self.pipeline_mode_var.get():
+            # Pipelined mode still installs dependencies first (within the job)
+            jobs, skipped = self.engine.install_category(category_name, manager, batch=True,
+                                                         pipeline=self.pipeline_mode_var.get())
+            if not jobs and skipped:
+                self._set_status(f"All apps in {category_name} are already installed")
+            return
+        # Otherwise install as a profile so dependencies (e.g. Git before GitHub Desktop) go first
+        try:
+            profile = Profile.from_category(apps, manager)
+        except ValueError as e:
+            # A catalog override can introduce a dependency cycle
+            self.notify(f"Cannot install {category_name}: {e}", 'error')
+            return
+        self._run_profile(profile, category_name)
 
-    def run_shortcut(self, command):
+    def apply_profile_file(self):
+        """Load a JSON provisioning profile and install it in dependency order."""
+        path = filedialog.askopenfilename(title="Apply Profile", filetypes=[("Profiles", "*.json"), ("All files", "*.*")])
+        if not path:
+            return
         try:
-            subprocess.run(command, shell=True)
+            profile = Profile.load(path)
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to run shortcut: {str(e)}")
+            self.notify(f"Could not load profile: {e}", 'error')
+            return
+        self._run_profile(profile, profile.name or Path(path).stem)
+
+    def _run_profile(self, profile, title, batch_id=None):
+        for pkgid in profile.entries:
+            self._row_notes.pop(pkgid, None)
+        executor = self.engine.apply_profile(profile, on_update=self._profile_update, title=title, batch_id=batch_id)
+        self._watch_profile(executor, title)
+
+    def _profile_update(self, pkgid, outcome):
+        """ProfileExecutor callback (worker thread): note skipped dependents on their rows."""
+        if outcome == PROFILE_SKIPPED:
+            self._row_notes[pkgid] = "Skipped (dependency failed)"
+            self.pump.post(self._update_row, pkgid)
+
+    def _watch_profile(self, executor, title):
+        profile = executor.profile
+
+        def wait():
+            executor.wait()
+            failed = executor.failed
+            if all(outcome == PROFILE_ALREADY_INSTALLED for outcome in executor.outcomes.values()):
+                self._set_status(f"All apps in {title} are already installed")
+            elif failed:
+                self.notify(f"{title}: {len(failed)} of {len(profile.entries)} packages not installed ({', '.join(failed)})", 'error')
+            else:
+                self.notify(f"{title}: all {len(profile.entries)} packages installed in {executor.finished - executor.started:.0f}s", 'success')
+
+        threading.Thread(target=wait, daemon=True).start()
+
+    def _check_interrupted_batches(self):
+        """Offer to resume batches the journal shows were cut short (crash, reboot, closed window)."""
+        def work():
+            for batch in self.engine.journal.interrupted():
+                self.pump.post(self._offer_resume, batch)
+
+        threading.Thread(target=work, daemon=True).start()
+
+    def _offer_resume(self, batch):
+        left = len(batch["remaining"])
+        message = f"{batch['title']} was interrupted: {batch['done']} of {batch['total']} done, {left} left."
+        self.notifications.show(message, 'warning', timeout_ms=0, actions=[
+            ("Resume", lambda: self.resume_batch(batch)),
+            ("Discard", lambda: self.engine.journal.dismiss(batch["batch"])),
+        ])
+
+    def resume_batch(self, batch):
+        """Install what an interrupted batch did not finish; packages that succeeded are skipped."""
+        self._set_status(f"Resuming {batch['title']}...")
+
+        def work():
+            # Packages installed before the interruption are skipped, so check the inventory first
+            self.engine.refresh_inventory(force=True)
+            jobs, _, executor = self.engine.resume(batch["batch"], on_update=self._profile_update)
+            if executor is not None:
+                self._watch_profile(executor, batch["title"])
+                return
+            self.engine.wait(jobs)
+            failed = [p for job in jobs for p in job.packages if job.package_state(p) != JOB_SUCCEEDED]
+            if failed:
+                self.notify(f"{batch['title']}: {len(failed)} packages still not installed ({', '.join(failed)})", 'error')
+            else:
+                self.notify(f"{batch['title']}: finished", 'success')
+
+        threading.Thread(target=work, daemon=True).start()
+
+    def cancel_category(self, category_name):
+        """Cancel every queued (not yet running) install in a category."""
+        self.engine.cancel_packages([app.id for app in self.categories.get(category_name, [])])
+
+    def _install_from_category(self, package, display_name):
+        self._set_status(f"Installing {display_name}...")
+        self._submit_install(package, PRIORITY_HIGH)
+
+    def run_shortcut(self, command, name=None):
+        """Start a shortcut in the background; failures are reported when the launcher sees them."""
+        self.engine.launcher.launch(name or command, command)
+        self._set_status(f"Launching {name or command}...")
+
+    def _on_launch_change(self, process):
+        if process.failed and id(process) not in self._launch_failures:
+            self._launch_failures.add(id(process))
+            self.notify(f"Failed to run {process.name}: {process.error}", 'error')
+        elif process.running:
+            self._set_status(f"Started {process.name} (PID {process.pid}, {process.spawn_ms:.0f} ms)")
+        self._refresh_launched()
+
+    def _refresh_launched(self):
+        if self.launched_view is None:
+            return
+        view = self.launched_view
+        view.delete(*view.get_children())
+        processes = self.engine.launcher.processes()
+        for process in sorted(processes, key=lambda p: not p.running):
+            if process.running:
+                status = "Running"
+            elif process.failed:
+                status = f"Failed: {process.error}"
+            elif process.ended is not None:
+                status = f"Exited ({process.returncode}) after {process.ended - process.started:.0f}s"
+            else:
+                status = "Starting..."
+            started = time.strftime('%H:%M:%S', time.localtime(process.started))
+            spawn = '' if process.spawn_ms is None else process.spawn_ms
+            view.insert('', tk.END, values=[process.name, process.pid or '', started, status, spawn])
 
     def toggle_dark_mode(self):
         # Manual toggle disables following the system theme
@@ -407,93 +1506,65 @@ class WinGetGUI:
         self.dark_mode_var.set(not self.dark_mode_var.get())
         self.toggle_dark_mode()
 
-    def apply_theme(self, dark):
+    def _register_themes(self):
+        """Create the light and dark ttk themes once; switching is then a single theme_use."""
         style = ttk.Style()
+        existing = set(style.theme_names())
+        for name, palette in THEME_PALETTES.items():
+            theme = f"winget-{name}"
+            if theme not in existing:
+                style.theme_create(theme, parent='clam', settings=build_theme_settings(palette, name == 'dark'))
+        # Ensure consistent border/paddings for frames and container widgets (Windows 11 spacing)
         try:
-            # Use the same base theme for both light and dark so widget metrics stay consistent
-            try:
-                style.theme_use('clam')
-            except Exception:
-                pass
-
-            if dark:
-                # Windows 11 Dark Mica theme colors (more translucent)
-                bg = '#1F1F1F'  # More transparent dark background
-                fg = '#FFFFFF'
-                entry_bg = '#2A2A2A'  # Lighter card background
-                text_bg = '#151515'  # Darker text areas
-                pressed = '#333333'
-                accent = '#60CDFF'
-                border = '#333333'
-            else:
-                # Windows 11 Light Mica theme colors (more translucent)
-                bg = '#FCFCFC'  # Very light, almost transparent
-                fg = '#000000'
-                entry_bg = '#FFFFFF'  # Pure white cards
-                text_bg = '#FFFFFF'
-                pressed = '#F0F0F0'
-                accent = '#005FB8'
-                border = '#F0F0F0'
-
-            # Base widget colors and fonts
-            style.configure('.', background=bg, foreground=fg, font=('Segoe UI', 10))
-            style.configure('TFrame', background=bg)
-            style.configure('TLabelframe', background=entry_bg, foreground=fg, borderwidth=1, relief='solid', labelmargins=12)
-            style.configure('TLabelframe.Label', background=entry_bg, foreground=accent if dark else fg, font=('Segoe UI', 12, 'bold'))
-            style.configure('TLabel', background=bg, foreground=fg, font=('Segoe UI', 10))
-
-            # Buttons (modern Mica-style with subtle borders)
-            style.configure('TButton', background=entry_bg, foreground=fg, relief='solid', padding=(20, 10), borderwidth=1, font=('Segoe UI', 10))
-            style.map('TButton',
-                      background=[('active', accent), ('pressed', pressed)],
-                      foreground=[('active', '#FFFFFF' if dark else '#FFFFFF'), ('pressed', fg)])
-
-            # App-style menu bar and modern popup menu button styles
-            style.configure('App.TButton', background=entry_bg, foreground=fg, font=('Segoe UI', 9))
-            style.configure('Menu.TButton', background=entry_bg, foreground=fg, relief='flat', font=('Segoe UI', 9))
-            style.configure('Menu.TFrame', background=entry_bg)
-
-            # Entries / Combobox (modern rounded look)
-            style.configure('TEntry', fieldbackground=entry_bg, foreground=fg, borderwidth=0, relief='flat', font=('Segoe UI', 10), padding=(12, 6))
-            style.configure('TCombobox', fieldbackground=entry_bg, foreground=fg, borderwidth=0, font=('Segoe UI', 10))
-            style.map('TCombobox', fieldbackground=[('readonly', entry_bg)])
-
-            # Checkbuttons
-            style.configure('TCheckbutton', background=bg, foreground=fg, font=('Segoe UI', 10))
-            style.map('TCheckbutton', background=[('active', bg)], foreground=[('active', fg)])
-
-            # Radiobuttons
-            style.configure('TRadiobutton', background=bg, foreground=fg, font=('Segoe UI', 10))
-            style.map('TRadiobutton', background=[('active', bg)], foreground=[('active', fg)])
-
-            # Scrollbars (modern thin design)
-            style.configure('Vertical.TScrollbar', background=entry_bg, troughcolor=bg, borderwidth=0, width=12)
-            style.configure('Horizontal.TScrollbar', background=entry_bg, troughcolor=bg, borderwidth=0, width=12)
-
-            # Notebook tabs (Windows 11 Mica style)
-            style.configure('TNotebook', background=bg, borderwidth=0)
-            style.configure('TNotebook.Tab', background=entry_bg, foreground=fg, padding=(24, 12), borderwidth=1, font=('Segoe UI', 11, 'bold'))
-            style.map('TNotebook.Tab',
-                      background=[('selected', accent), ('active', pressed)],
-                      foreground=[('selected', '#FFFFFF' if dark else '#FFFFFF'), ('active', fg)])
-
-            # Root and ScrolledText widget - modern styling
-            self.root.configure(bg=bg)
-            self.results_text.configure(bg=text_bg, fg=fg, insertbackground=fg, highlightbackground=border, relief='flat', bd=0, font=('Consolas', 10))
-
-            # Ensure consistent border/paddings for frames and container widgets (Windows 11 spacing)
-            try:
-                for w in self.root.winfo_children():
-                    if isinstance(w, ttk.Frame) or isinstance(w, ttk.LabelFrame):
-                        w.configure(padding=(24, 16))
-            except Exception:
-                pass
+            for w in self.root.winfo_children():
+                if isinstance(w, ttk.Frame) or isinstance(w, ttk.LabelFrame):
+                    w.configure(padding=(24, 16))
+        except Exception:
+            pass
+        self._style = style
 
+    def apply_theme(self, dark):
+        try:
+            if getattr(self, '_style', None) is None:
+                self._register_themes()
+            name = 'dark' if dark else 'light'
+            palette = THEME_PALETTES[name]
+            if self._style.theme_use() != f"winget-{name}":
+                self._style.theme_use(f"winget-{name}")
+            # Non-ttk widgets are not covered by the theme
+            self.root.configure(bg=palette['bg'])
             # Save colors for dialogs (e.g., About) and other transient windows
-            self._theme_colors = {'bg': bg, 'fg': fg, 'entry_bg': entry_bg, 'text_bg': text_bg, 'pressed': pressed} 
+            self._theme_colors = {k: palette[k] for k in ('bg', 'fg', 'entry_bg', 'text_bg', 'pressed')}
+            if getattr(self, 'log_text', None) is not None:
+                self.log_text.configure(bg=palette['text_bg'], fg=palette['fg'], insertbackground=palette['fg'])
+        except Exception:
+            pass
+
+    def benchmark_theme_switch(self, iterations=20):
+        """Time light/dark switches including the redraw; returns latency stats in ms."""
+        original = bool(self.dark_mode_var.get())
+        samples = []
+        for i in range(iterations):
+            start = time.perf_counter()
+            self.apply_theme(i % 2 == (0 if original else 1))
+            self.root.update_idletasks()
+            samples.append((time.perf_counter() - start) * 1000.0)
+        self.apply_theme(original)
+        samples.sort()
+        return {
+            "iterations": iterations,
+            "p50_ms": round(samples[len(samples) // 2], 2),
+            "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2),
+            "max_ms": round(samples[-1], 2),
+        }
 
+    def _run_theme_benchmark(self):
+        result = self.benchmark_theme_switch()
+        try:
+            print(json.dumps({"theme_switch": result}))
         except Exception:
             pass
+        self.notify(f"Theme switch: p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms")
 
     # Legacy modern menu removed; using native menubar for File/Window/Help actions
 
@@ -608,7 +1679,7 @@ class WinGetGUI:
         if not response:
             return
         
-        self.status_var.set("Installing Chocolatey...")
+        self._set_status("Installing Chocolatey...")
         threading.Thread(target=self._install_chocolatey_thread, daemon=True).start()
     
     def _install_chocolatey_thread(self):
@@ -620,19 +1691,20 @@ class WinGetGUI:
                 "[System.Net.ServicePointManager]::SecurityProtocol -bor 3072; "
                 "iex ((New-Object System.Net.WebClient).DownloadString('https://community.chocolatey.org/install.ps1'))"
             )
-            subprocess.run(
+            run_command(
+                self.engine.command_log, 'bootstrap',
                 ["powershell", "-Command", ps_command],
                 check=True,
                 timeout=600
             )
-            self.status_var.set("✓ Chocolatey installed successfully")
-            messagebox.showinfo("Success", "Chocolatey installed successfully!\n\nPlease restart the application for changes to take effect.")
+            self._set_status("✓ Chocolatey installed successfully")
+            self.notify("Chocolatey installed successfully! Please restart the application for changes to take effect.", 'success')
         except subprocess.CalledProcessError:
-            self.status_var.set("Installation failed")
-            messagebox.showerror("Error", "Failed to install Chocolatey. Make sure you have administrator privileges.")
+            self._set_status("Installation failed")
+            self.notify("Failed to install Chocolatey. Make sure you have administrator privileges.", 'error')
         except Exception as e:
-            self.status_var.set("Error")
-            messagebox.showerror("Error", f"Error installing Chocolatey: {str(e)}")
+            self._set_status("Error")
+            self.notify(f"Error installing Chocolatey: {str(e)}", 'error')
 
     def exit_app(self):
         # Graceful exit
@@ -640,6 +1712,8 @@ class WinGetGUI:
             self.stop_system_watch()
         except Exception:
             pass
+        self.pump.stop()
+        self.settings.flush()
         try:
             self.root.quit()
         except Exception:
@@ -677,7 +1751,21 @@ class WinGetGUI:
 # Removed legacy _ModernMenu class and duplicate method definitions; using native menubar for File/Window/Help actions
 
 if __name__ == "__main__":
+    # Subcommands run headless through the shared engine (see cli.py)
+    import cli
+    if any(arg in cli.COMMANDS for arg in sys.argv[1:]):
+        sys.exit(cli.main(sys.argv[1:]))
 
+    profiler = StartupProfiler(_STARTUP_T0)
+    profiler.mark('imports')
     root = tk.Tk()
-    app = WinGetGUI(root)
+    profiler.mark('tk init')
+    app = WinGetGUI(root, profiler=profiler)
+    if '--profile-startup' in sys.argv[1:]:
+        root.after(0, app.finish_startup_profile)
+    if '--benchmark-theme' in sys.argv[1:]:
+        root.after(500, app._run_theme_benchmark)
+    root.protocol("WM_DELETE_WINDOW", app.exit_app)
     root.mainloop()
+    # Anything changed in the last debounce window
+    app.settings.flush()
@@ -5,7 +5,7 @@ a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    datas=[('catalog', 'catalog')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},